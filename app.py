@@ -1,5 +1,10 @@
 import streamlit as st
 
+from src.eventos.transporte import iniciar_replicacion
+
+# Los cambios hechos desde las páginas se comparten con los demás procesos
+iniciar_replicacion()
+
 st.set_page_config(page_title="Clínica Veterinaria - Inicio", page_icon="🐾")
 
 st.title("🐾 Sistema de Gestión de Clínica Veterinaria")
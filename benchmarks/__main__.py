@@ -0,0 +1,47 @@
+"""
+Suite de benchmarks de la clínica.
+
+Uso:
+    python -m benchmarks [--escala 1k|100k|1m] [--grupo entidades] [-k filtro]
+                         [--json salida.json] [--comparar base.json] [--umbral 0.10]
+
+Con --comparar, termina con código 1 si algún benchmark es más lento que la
+base en más de --umbral (por defecto 10 %).
+"""
+import argparse
+import sys
+
+from benchmarks import (  # noqa: F401 (registran benchmarks)
+    bench_concurrencia, bench_db, bench_entidades, bench_fechas, bench_paginas,
+)
+from benchmarks.harness import ESCALAS, Contexto, comparar, ejecutar, formatear, guardar_json
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Suite de benchmarks de la clínica.")
+    parser.add_argument("--escala", choices=ESCALAS, default="1k")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--rondas", type=int, default=3)
+    parser.add_argument("--grupo", action="append", help="Limitar a uno o varios grupos")
+    parser.add_argument("-k", dest="filtro", help="Subcadena de 'grupo.nombre' a ejecutar")
+    parser.add_argument("--json", dest="ruta_json", help="Guardar resultados en JSON")
+    parser.add_argument("--comparar", dest="ruta_base", help="JSON de una ejecución anterior")
+    parser.add_argument("--umbral", type=float, default=0.10, help="Regresión tolerada (0.10 = 10 %%)")
+    args = parser.parse_args(argv)
+
+    contexto = Contexto(escala=args.escala, semilla=args.semilla, rondas=args.rondas)
+    resultados = ejecutar(contexto, args.grupo, args.filtro)
+    print(formatear(resultados, args.ruta_base))
+
+    if args.ruta_json:
+        guardar_json(resultados, contexto, args.ruta_json)
+    if args.ruta_base:
+        regresiones = comparar(resultados, args.ruta_base, args.umbral)
+        for clave, ratio in regresiones.items():
+            print(f"REGRESIÓN {clave}: x{ratio:.2f}", file=sys.stderr)
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
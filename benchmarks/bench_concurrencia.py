@@ -0,0 +1,131 @@
+"""
+Benchmarks de contención sobre la agenda persistida con control optimista.
+
+Usan un fichero SQLite temporal (modo WAL) compartido por varios hilos, cada uno con su
+propia conexión. Las operaciones se limitan a `MAX_OPERACIONES` por ronda
+porque cada escritura es una transacción confirmada en disco.
+"""
+import os
+import random
+import tempfile
+import threading
+from datetime import date, timedelta
+
+from benchmarks.harness import benchmark
+from src.database_conn.db_conn import DatabaseConnection
+from src.database_conn.esquema import crear_esquema
+
+MAX_OPERACIONES = 2_000
+HILOS = 8
+CITAS_CALIENTES = 4
+
+
+def _preparar_bd():
+    fd, ruta = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    def crear_conexion():
+        db = DatabaseConnection.sqlite(ruta)
+        db.connect()
+        return db
+
+    db = crear_conexion()
+    crear_esquema(db)
+    db.disconnect()
+    return ruta, crear_conexion
+
+
+def _borrar_bd(ruta):
+    for fichero in (ruta, f"{ruta}-wal", f"{ruta}-shm"):
+        if os.path.exists(fichero):
+            os.remove(fichero)
+
+
+@benchmark("concurrencia")
+def bench_reservas_y_completados(medidor, ctx):
+    from src.simulacion.carga import AgendaBaseDatos, SimuladorCarga
+
+    ruta, crear_conexion = _preparar_bd()
+    por_sesion = max(1, min(ctx.n, MAX_OPERACIONES) // HILOS)
+    informes = []
+    agendas = []
+
+    def ejecutar():
+        agenda = AgendaBaseDatos(crear_conexion, primer_id=len(agendas) * 10 ** 7 + 1)
+        agendas.append(agenda)
+        # Cada ronda reserva sobre una semana distinta para no heredar franjas ocupadas
+        desde = (date(2025, 1, 1) + timedelta(weeks=len(agendas))).isoformat()
+        simulador = SimuladorCarga(agenda, n_recepcionistas=HILOS, n_veterinarios=4,
+                                   operaciones_por_sesion=por_sesion, dias=5,
+                                   desde=desde, semilla=ctx.semilla)
+        informes.append(simulador.ejecutar())
+
+    try:
+        medidor(ejecutar, n=por_sesion * HILOS)
+    finally:
+        for agenda in agendas:
+            agenda.cerrar()
+        _borrar_bd(ruta)
+    reservas = informes[-1].operaciones["reservar"]
+    medidor.anotar(reservas_ok=len(reservas.latencias), franjas_ocupadas=reservas.conflictos,
+                   p95_ms=round(reservas.percentil(95), 3), p99_ms=round(reservas.percentil(99), 3))
+
+
+@benchmark("concurrencia")
+def bench_reprogramar_citas_calientes(medidor, ctx):
+    """Muchas sesiones reprogramando las mismas pocas citas: mide conflictos y reintentos."""
+    from src.database_conn.repositorios import RepositorioCitas, reintentar_si_conflicto
+    from src.entidades.administrativo.cita import Cita
+    from src.excepciones.excepciones import ConflictoConcurrenciaError, FranjaOcupadaError
+
+    ruta, crear_conexion = _preparar_bd()
+    repositorio = RepositorioCitas(crear_conexion())
+    for id_cita in range(1, CITAS_CALIENTES + 1):
+        repositorio.crear(Cita(id_cita, "2025-01-01", "08:00", "Revisión", 1, id_cita))
+    por_hilo = max(1, min(ctx.n, MAX_OPERACIONES) // HILOS)
+    contadores = {"intentos": 0, "agotados": 0, "franjas": 0}
+    lock = threading.Lock()
+
+    def sesion(indice):
+        rnd = random.Random(ctx.semilla + indice)
+        repo = RepositorioCitas(crear_conexion())
+        intentos = agotados = franjas = 0
+        for _ in range(por_hilo):
+            id_cita = rnd.randint(1, CITAS_CALIENTES)
+            nueva_fecha = f"2025-02-{rnd.randint(1, 28):02d}"
+            nueva_hora = f"{rnd.randint(8, 19):02d}:{rnd.choice((0, 30)):02d}"
+
+            def reprogramar():
+                nonlocal intentos
+                intentos += 1
+                cita = repo.obtener(id_cita)
+                cita.reprogramar(nueva_fecha, nueva_hora)
+                repo.guardar(cita)
+
+            try:
+                reintentar_si_conflicto(reprogramar)
+            except ConflictoConcurrenciaError:
+                agotados += 1
+            except FranjaOcupadaError:
+                franjas += 1
+        repo.db.disconnect()
+        with lock:
+            contadores["intentos"] += intentos
+            contadores["agotados"] += agotados
+            contadores["franjas"] += franjas
+
+    def ejecutar():
+        hilos = [threading.Thread(target=sesion, args=(i,)) for i in range(HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+    try:
+        medidor(ejecutar, n=por_hilo * HILOS)
+    finally:
+        repositorio.db.disconnect()
+        _borrar_bd(ruta)
+    operaciones = por_hilo * HILOS * ctx.rondas
+    medidor.anotar(reintentos_por_op=round(contadores["intentos"] / operaciones - 1, 3),
+                   agotados=contadores["agotados"], franjas_ocupadas=contadores["franjas"])
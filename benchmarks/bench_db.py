@@ -0,0 +1,73 @@
+"""Benchmarks de lectura y escritura de `DatabaseConnection` sobre el backend SQLite embebido."""
+from benchmarks import generadores
+from benchmarks.harness import benchmark
+from src.database_conn.db_conn import DatabaseConnection
+from src.database_conn.esquema import COLUMNAS, crear_esquema, sentencia_insert
+
+INSERTAR_CITA = sentencia_insert("citas")
+
+
+def _conexion(filas=None):
+    db = DatabaseConnection.sqlite(":memory:")
+    db.connect()
+    crear_esquema(db)
+    if filas:
+        db.execute_many(INSERTAR_CITA, [tuple(f[c] for c in COLUMNAS["citas"]) for f in filas])
+    return db
+
+
+def _citas(ctx):
+    return list(generadores.generar_citas(ctx.n, ctx.n, 50, ctx.semilla))
+
+
+@benchmark("db")
+def bench_insertar_citas(medidor, ctx):
+    filas = [tuple(f[c] for c in COLUMNAS["citas"]) for f in _citas(ctx)]
+    estado = {}
+
+    def preparar():
+        if "db" in estado:
+            estado["db"].disconnect()
+        estado["db"] = _conexion()
+
+    def insertar():
+        db = estado["db"]
+        for fila in filas:
+            db.execute_query(INSERTAR_CITA, fila)
+
+    medidor(insertar, n=len(filas), preparar=preparar)
+    estado["db"].disconnect()
+
+
+@benchmark("db")
+def bench_fetch_one_por_clave(medidor, ctx):
+    db = _conexion(_citas(ctx))
+    ids = list(range(1, ctx.n + 1))
+
+    def leer():
+        for id_cita in ids:
+            db.fetch_one("SELECT * FROM citas WHERE id_cita = %s", (id_cita,))
+
+    medidor(leer, n=len(ids))
+    db.disconnect()
+
+
+@benchmark("db")
+def bench_fetch_all_por_estado(medidor, ctx):
+    db = _conexion(_citas(ctx))
+    medidor(db.fetch_all, "SELECT * FROM citas WHERE estado = %s", ("completada",), n=ctx.n)
+    db.disconnect()
+
+
+@benchmark("db")
+def bench_execute_many_citas(medidor, ctx):
+    filas = [tuple(f[c] for c in COLUMNAS["citas"]) for f in _citas(ctx)]
+    estado = {}
+
+    def preparar():
+        if "db" in estado:
+            estado["db"].disconnect()
+        estado["db"] = _conexion()
+
+    medidor(lambda: estado["db"].execute_many(INSERTAR_CITA, filas), n=len(filas), preparar=preparar)
+    estado["db"].disconnect()
@@ -0,0 +1,111 @@
+"""Benchmarks de construcción y métodos calientes de las entidades."""
+from benchmarks import generadores
+from benchmarks.harness import benchmark
+from src.entidades.administrativo.cita import Cita
+from src.entidades.administrativo.consulta import Consulta
+from src.entidades.administrativo.factura import Factura
+from src.entidades.mascotas.mascota import Mascota
+from src.entidades.personas.duenos.dueno import Dueño
+from src.entidades.personas.empleados.veterinario import Veterinario
+
+
+def _dueño_base() -> Dueño:
+    return Dueño(1, "Ana García", "00000001R", "600000000", "ana@example.com", "1985-05-20", "Calle Mayor 1")
+
+
+@benchmark("entidades")
+def bench_construir_duenos(medidor, ctx):
+    filas = list(generadores.generar_duenos(ctx.n, ctx.semilla))
+
+    def construir():
+        for f in filas:
+            Dueño(f["id_dueno"], f["nombre"], f["dni"], f["telefono"], f["email"],
+                  f["fecha_nacimiento"], f["direccion"])
+
+    medidor(construir, n=len(filas))
+
+
+@benchmark("entidades")
+def bench_construir_mascotas(medidor, ctx):
+    filas = list(generadores.generar_mascotas(ctx.n, ctx.n, ctx.semilla))
+    dueño = _dueño_base()
+
+    def construir():
+        for f in filas:
+            Mascota(f["id_mascota"], f["nombre"], f["especie"], f["raza"],
+                    f["fecha_nacimiento"], f["peso"], f["sexo"], dueño)
+
+    medidor(construir, n=len(filas))
+
+
+@benchmark("entidades")
+def bench_construir_veterinarios(medidor, ctx):
+    filas = list(generadores.generar_empleados(ctx.n, ctx.semilla))
+
+    def construir():
+        for f in filas:
+            Veterinario(f["id_empleado"], f["nombre"], f["dni"], f["telefono"], f["email"],
+                        f["fecha_nacimiento"], f["salario"], "General", f"COL-{f['id_empleado']}", f["horario"])
+
+    medidor(construir, n=len(filas))
+
+
+@benchmark("entidades")
+def bench_construir_citas(medidor, ctx):
+    filas = list(generadores.generar_citas(ctx.n, ctx.n, 50, ctx.semilla))
+
+    def construir():
+        for f in filas:
+            Cita(f["id_cita"], f["fecha"], f["hora"], f["motivo"], f["id_mascota"], f["id_empleado"], f["estado"])
+
+    medidor(construir, n=len(filas))
+
+
+@benchmark("entidades")
+def bench_construir_consultas(medidor, ctx):
+    filas = list(generadores.generar_consultas(ctx.n, ctx.semilla))
+
+    def construir():
+        for f in filas:
+            Consulta(f["id_consulta"], f["id_cita"], f["diagnostico"], f["tratamiento"], f["observaciones"])
+
+    medidor(construir, n=len(filas))
+
+
+@benchmark("entidades")
+def bench_construir_facturas(medidor, ctx):
+    filas = list(generadores.generar_facturas(ctx.n, ctx.semilla))
+
+    def construir():
+        for f in filas:
+            factura = Factura(f["id_factura"], f["id_consulta"])
+            factura.registrar_pago(f["metodo_pago"], f["fecha"])
+
+    medidor(construir, n=len(filas))
+
+
+@benchmark("entidades")
+def bench_factura_calcular_total(medidor, ctx):
+    filas = list(generadores.generar_facturas(ctx.n, ctx.semilla))
+    facturas = [Factura(f["id_factura"], f["id_consulta"]) for f in filas]
+
+    def calcular():
+        for factura, f in zip(facturas, filas):
+            factura.calcular_total(f["servicios"], descuentos=5.0, impuestos=0.21)
+
+    medidor(calcular, n=len(filas))
+
+
+@benchmark("entidades")
+def bench_dueno_buscar_mascota_por_nombre(medidor, ctx):
+    # Un único dueño con n mascotas: mide el coste de la búsqueda lineal
+    dueño = _dueño_base()
+    for f in generadores.generar_mascotas(ctx.n, 1, ctx.semilla):
+        dueño.agregar_mascota(f)
+    consultas = [m.lower()[:3] for m in generadores.MASCOTAS]
+
+    def buscar():
+        for nombre in consultas:
+            dueño.buscar_mascota_por_nombre(nombre)
+
+    medidor(buscar, n=ctx.n * len(consultas))
@@ -0,0 +1,128 @@
+"""
+Microbenchmark del parseo de fechas/horas en los constructores de entidades.
+
+Compara la construcción de objetos con `src.utils.fechas` frente a la
+implementación previa basada en `datetime.strptime`, y comprueba que ambos
+caminos lanzan exactamente los mismos errores de validación.
+
+Uso:
+    python -m benchmarks.bench_fechas [--n 20000]
+
+También registra los benchmarks del grupo "fechas" de `python -m benchmarks`.
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime
+
+import src.entidades.administrativo.cita as mod_cita
+import src.entidades.mascotas.mascota as mod_mascota
+from src.entidades.administrativo.cita import Cita
+from src.entidades.mascotas.mascota import Mascota
+from src.entidades.personas.duenos.dueno import Dueño
+from benchmarks.harness import benchmark
+from src.utils import fechas
+
+ENTRADAS_INVALIDAS = [
+    ("2024-02-30", "%Y-%m-%d"), ("2024-13-01", "%Y-%m-%d"), ("24-01-01", "%Y-%m-%d"),
+    ("2024/01/01", "%Y-%m-%d"), ("", "%Y-%m-%d"), ("2024-01-01 ", "%Y-%m-%d"),
+    ("25:00", "%H:%M"), ("12:60", "%H:%M"), ("1200", "%H:%M"), ("ab:cd", "%H:%M"),
+]
+
+
+def _strptime(valor, formato):
+    parsed = datetime.strptime(valor, formato)
+    return parsed.date() if formato == "%Y-%m-%d" else parsed.time()
+
+
+def _rapido(valor, formato):
+    return fechas.parsear_fecha(valor) if formato == "%Y-%m-%d" else fechas.parsear_hora(valor)
+
+
+def verificar_errores_identicos():
+    """Comprueba que el parser rápido y strptime fallan con el mismo mensaje."""
+    for valor, formato in ENTRADAS_INVALIDAS:
+        errores = []
+        for funcion in (_strptime, _rapido):
+            try:
+                funcion(valor, formato)
+                errores.append(None)
+            except ValueError as e:
+                errores.append(str(e))
+        if errores[0] != errores[1]:
+            raise AssertionError(f"Errores distintos para {valor!r}: {errores}")
+
+
+def generar_filas(n: int, semilla: int = 42):
+    """Filas de citas con la repetición típica de una agenda (pocos días, franjas de 30 min)."""
+    rnd = random.Random(semilla)
+    dias = [f"2025-{m:02d}-{d:02d}" for m in range(1, 13) for d in range(1, 29)]
+    franjas = [f"{h:02d}:{m:02d}" for h in range(8, 20) for m in (0, 30)]
+    return [(i, rnd.choice(dias), rnd.choice(franjas)) for i in range(n)]
+
+
+def construir_citas(filas):
+    for id_cita, fecha, hora in filas:
+        Cita(id_cita, fecha, hora, "Revisión", 1, 1)
+
+
+def construir_mascotas(filas, dueño):
+    for id_mascota, fecha, _ in filas:
+        Mascota(id_mascota, "Luna", "Perro", "Mestizo", fecha, 10.0, "H", dueño)
+
+
+@benchmark("fechas")
+def bench_parsear_fecha_strptime(medidor, ctx):
+    filas = generar_filas(ctx.n, ctx.semilla)
+    medidor(lambda: [_strptime(f, "%Y-%m-%d") for _, f, _ in filas], n=len(filas))
+
+
+@benchmark("fechas")
+def bench_parsear_fecha_cacheada(medidor, ctx):
+    filas = generar_filas(ctx.n, ctx.semilla)
+    medidor(lambda: [fechas.parsear_fecha(f) for _, f, _ in filas], n=len(filas),
+            preparar=fechas.limpiar_cache)
+
+
+def _medir(funcion, repeticiones=5) -> float:
+    return min(timeit.repeat(funcion, number=1, repeat=repeticiones))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=20000, help="Objetos por ronda")
+    args = parser.parse_args()
+
+    verificar_errores_identicos()
+    filas = generar_filas(args.n)
+    dueño = Dueño(1, "Ana", "00000000A", "600000000", "ana@example.com", "1990-01-01", "C/ Mayor 1")
+
+    originales = (fechas.parsear_fecha, fechas.parsear_hora)
+    resultados = {}
+    for nombre, funcion in (
+        ("Cita", lambda: construir_citas(filas)),
+        ("Mascota", lambda: construir_mascotas(filas, dueño)),
+    ):
+        # Línea base: se sustituye temporalmente el parser por strptime
+        mod_cita.parsear_fecha = mod_mascota.parsear_fecha = lambda v: _strptime(v, "%Y-%m-%d")
+        mod_cita.parsear_hora = lambda v: _strptime(v, "%H:%M")
+        try:
+            base = _medir(funcion)
+        finally:
+            mod_cita.parsear_fecha = mod_mascota.parsear_fecha = originales[0]
+            mod_cita.parsear_hora = originales[1]
+        fechas.limpiar_cache()
+        rapido = _medir(funcion)
+        resultados[nombre] = (base, rapido)
+
+    print(f"Construcción de {args.n} objetos (mejor de 5 rondas)")
+    for nombre, (base, rapido) in resultados.items():
+        print(
+            f"  {nombre:<8} strptime: {base / args.n * 1e6:7.2f} µs/obj   "
+            f"fechas: {rapido / args.n * 1e6:7.2f} µs/obj   x{base / rapido:4.1f}"
+        )
+    print("Errores de validación idénticos: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Tiempo de ejecución de los scripts de Streamlit (app.py y pages/*.py) con `AppTest`."""
+import os
+
+from benchmarks.harness import BenchmarkOmitido, benchmark
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SCRIPTS = ["app.py"] + sorted(
+    os.path.join("pages", f) for f in os.listdir(os.path.join(RAIZ, "pages"))
+    if f.endswith(".py") and not f.startswith("__")
+)
+
+
+def _registrar(script: str):
+    nombre = os.path.splitext(os.path.basename(script))[0]
+
+    @benchmark("paginas", nombre=nombre)
+    def bench_pagina(medidor, ctx):
+        try:
+            from streamlit.testing.v1 import AppTest
+        except ImportError as e:
+            raise BenchmarkOmitido(f"streamlit no disponible ({e})")
+
+        def ejecutar():
+            app = AppTest.from_file(os.path.join(RAIZ, script), default_timeout=30).run()
+            if app.exception:
+                raise RuntimeError(f"{script}: {app.exception[0].message}")
+
+        # Las páginas no dependen de la escala: n=1 ejecución por ronda
+        medidor(ejecutar, n=1)
+
+
+for _script in SCRIPTS:
+    _registrar(_script)
@@ -0,0 +1,134 @@
+"""
+Generadores sintéticos y deterministas (con semilla) de filas para benchmarks.
+
+Devuelven iteradores de diccionarios con las mismas claves que las columnas de
+la base de datos, para poder usarlos tanto para construir entidades como para
+insertarlos directamente. Son perezosos: a escala 1M no se materializa nada
+que el benchmark no pida.
+"""
+import random
+from datetime import date, timedelta
+from typing import Iterator
+
+from src.entidades.administrativo.cita import Cita
+from src.entidades.administrativo.factura import Factura
+
+NOMBRES = ("Ana", "Luis", "Marta", "Jorge", "Lucía", "Pablo", "Elena", "Sergio", "Carmen", "Diego")
+APELLIDOS = ("García", "López", "Martín", "Sánchez", "Pérez", "Gómez", "Ruiz", "Díaz", "Moreno", "Álvarez")
+MASCOTAS = ("Luna", "Max", "Coco", "Rocky", "Nala", "Toby", "Kira", "Simba", "Lola", "Bruno")
+ESPECIES = {
+    "Perro": ("Labrador", "Pastor Alemán", "Beagle", "Mestizo"),
+    "Gato": ("Europeo", "Siamés", "Persa"),
+    "Conejo": ("Belier", "Enano"),
+    "Ave": ("Periquito", "Canario"),
+}
+MOTIVOS = ("Vacunación", "Revisión", "Desparasitación", "Cojera", "Vómitos", "Control de peso")
+SERVICIOS = (("Consulta general", 35.0), ("Vacuna", 25.0), ("Analítica", 60.0),
+             ("Radiografía", 80.0), ("Desparasitación", 15.0))
+
+_LETRAS_DNI = "TRWAGMYFPDXBNJZSQVHLCKE"
+_INICIO = date(2020, 1, 1)
+
+
+def _dni(numero: int) -> str:
+    return f"{numero:08d}{_LETRAS_DNI[numero % 23]}"
+
+
+def _fecha(rnd: random.Random, desde: date, dias: int) -> str:
+    return (desde + timedelta(days=rnd.randrange(dias))).isoformat()
+
+
+def generar_duenos(n: int, semilla: int = 42) -> Iterator[dict]:
+    rnd = random.Random(semilla)
+    for i in range(1, n + 1):
+        nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}"
+        yield {
+            "id_dueno": i,
+            "nombre": nombre,
+            "dni": _dni(i),
+            "telefono": f"6{rnd.randrange(10**8):08d}",
+            "email": f"cliente{i}@example.com",
+            "fecha_nacimiento": _fecha(rnd, date(1950, 1, 1), 365 * 55),
+            "direccion": f"Calle {rnd.choice(APELLIDOS)} {rnd.randrange(1, 200)}",
+        }
+
+
+def generar_mascotas(n: int, n_duenos: int, semilla: int = 42) -> Iterator[dict]:
+    rnd = random.Random(semilla + 1)
+    for i in range(1, n + 1):
+        especie = rnd.choice(tuple(ESPECIES))
+        yield {
+            "id_mascota": i,
+            "nombre": rnd.choice(MASCOTAS),
+            "especie": especie,
+            "raza": rnd.choice(ESPECIES[especie]),
+            "fecha_nacimiento": _fecha(rnd, date(2008, 1, 1), 365 * 16),
+            "peso": round(rnd.uniform(0.5, 45.0), 1),
+            "sexo": rnd.choice(("M", "H")),
+            "id_dueno": rnd.randrange(1, n_duenos + 1),
+        }
+
+
+def generar_empleados(n: int, semilla: int = 42) -> Iterator[dict]:
+    """Aproximadamente la mitad son veterinarios; el resto, enfermeros, recepcionistas y conserjes."""
+    rnd = random.Random(semilla + 2)
+    tipos = ("Veterinario", "Veterinario", "Enfermero", "Recepcionista", "Conserje")
+    for i in range(1, n + 1):
+        yield {
+            "id_empleado": i,
+            "nombre": f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}",
+            "dni": _dni(50_000_000 + i),
+            "telefono": f"7{rnd.randrange(10**8):08d}",
+            "email": f"empleado{i}@clinica.example.com",
+            "fecha_nacimiento": _fecha(rnd, date(1960, 1, 1), 365 * 40),
+            "salario": float(rnd.randrange(1_300, 3_500, 50)),
+            "tipo_empleado": tipos[i % len(tipos)],
+            "turno": rnd.choice(("diurno", "nocturno")),
+            "horario": rnd.choice(("08:00-15:00", "15:00-22:00")),
+        }
+
+
+def generar_citas(n: int, n_mascotas: int, n_empleados: int, semilla: int = 42) -> Iterator[dict]:
+    rnd = random.Random(semilla + 3)
+    for i in range(1, n + 1):
+        hora = rnd.randrange(8, 20)
+        minuto = rnd.choice((0, 30))
+        estado = rnd.choices(Cita.ESTADOS_VALIDOS, weights=(2, 7, 1))[0]
+        hora_fin = f"{hora:02d}:{minuto + rnd.randrange(10, 30):02d}" if estado == "completada" else None
+        yield {
+            "id_cita": i,
+            "fecha": _fecha(rnd, _INICIO, 365 * 5),
+            "hora": f"{hora:02d}:{minuto:02d}",
+            "motivo": rnd.choice(MOTIVOS),
+            "id_mascota": rnd.randrange(1, n_mascotas + 1),
+            "id_empleado": rnd.randrange(1, n_empleados + 1),
+            "estado": estado,
+            "hora_fin": hora_fin,
+        }
+
+
+def generar_consultas(n: int, semilla: int = 42) -> Iterator[dict]:
+    rnd = random.Random(semilla + 4)
+    for i in range(1, n + 1):
+        yield {
+            "id_consulta": i,
+            "id_cita": i,
+            "diagnostico": rnd.choice(("Sano", "Otitis", "Gastroenteritis", "Dermatitis")),
+            "tratamiento": rnd.choice(("Ninguno", "Antibiótico", "Dieta blanda", "Antiinflamatorio")),
+            "observaciones": "",
+        }
+
+
+def generar_facturas(n: int, semilla: int = 42) -> Iterator[dict]:
+    rnd = random.Random(semilla + 5)
+    for i in range(1, n + 1):
+        servicios = [
+            {"descripcion": d, "precio": p} for d, p in rnd.sample(SERVICIOS, rnd.randrange(1, 4))
+        ]
+        yield {
+            "id_factura": i,
+            "id_consulta": i,
+            "servicios": servicios,
+            "metodo_pago": rnd.choice(Factura.METODOS_PAGO_VALIDOS),
+            "fecha": _fecha(rnd, _INICIO, 365 * 5),
+        }
@@ -0,0 +1,202 @@
+"""
+Arnés mínimo de benchmarks al estilo de pytest-benchmark, sin dependencias.
+
+Cada benchmark es una función registrada con `@benchmark(grupo)` que recibe un
+`Medidor` y el `Contexto` de la ejecución (escala, semilla...). Dentro llama a
+`medidor(funcion, *args, n=...)`, donde `n` es el número de elementos que
+procesa cada llamada, para poder comparar tiempos por elemento entre escalas.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+ESCALAS = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+class BenchmarkOmitido(Exception):
+    """Se lanza desde un benchmark cuando falta una dependencia opcional."""
+
+
+@dataclass
+class Contexto:
+    escala: str = "1k"
+    semilla: int = 42
+    rondas: int = 3
+
+    @property
+    def n(self) -> int:
+        return ESCALAS[self.escala]
+
+
+@dataclass
+class Resultado:
+    grupo: str
+    nombre: str
+    n: int
+    rondas: int
+    minimo: float
+    media: float
+    mediana: float
+    desviacion: float
+    omitido: Optional[str] = None
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def por_elemento_us(self) -> float:
+        return self.minimo / self.n * 1e6 if self.n else 0.0
+
+
+@dataclass
+class _Registro:
+    grupo: str
+    nombre: str
+    funcion: Callable
+
+
+_REGISTRO: List[_Registro] = []
+
+
+def benchmark(grupo: str, nombre: Optional[str] = None):
+    """Decorador que registra una función de benchmark en `grupo`."""
+    def decorador(funcion):
+        _REGISTRO.append(_Registro(grupo, nombre or funcion.__name__.replace("bench_", "", 1), funcion))
+        return funcion
+    return decorador
+
+
+class Medidor:
+    """Cronometra una función varias rondas y guarda el resultado."""
+
+    def __init__(self, registro: _Registro, contexto: Contexto):
+        self._registro = registro
+        self._contexto = contexto
+        self.resultado: Optional[Resultado] = None
+        self._extra: Dict[str, float] = {}
+
+    def anotar(self, **valores: float):
+        """Añade métricas propias del benchmark (conflictos, percentiles...) al resultado."""
+        self._extra.update(valores)
+        if self.resultado:
+            self.resultado.extra.update(valores)
+
+    def __call__(self, funcion: Callable, *args, n: int = 1, preparar: Optional[Callable] = None, **kwargs):
+        """
+        Ejecuta `funcion(*args, **kwargs)` `contexto.rondas` veces.
+        `preparar`, si se indica, se llama antes de cada ronda fuera del cronómetro.
+        """
+        tiempos = []
+        valor = None
+        for _ in range(self._contexto.rondas):
+            if preparar:
+                preparar()
+            inicio = time.perf_counter()
+            valor = funcion(*args, **kwargs)
+            tiempos.append(time.perf_counter() - inicio)
+        self.resultado = Resultado(
+            grupo=self._registro.grupo,
+            nombre=self._registro.nombre,
+            n=n,
+            rondas=len(tiempos),
+            minimo=min(tiempos),
+            media=statistics.fmean(tiempos),
+            mediana=statistics.median(tiempos),
+            desviacion=statistics.stdev(tiempos) if len(tiempos) > 1 else 0.0,
+            extra=dict(self._extra),
+        )
+        return valor
+
+
+def ejecutar(contexto: Contexto, grupos: Optional[List[str]] = None,
+             filtro: Optional[str] = None) -> List[Resultado]:
+    """Ejecuta los benchmarks registrados que coincidan con `grupos` y `filtro`."""
+    resultados = []
+    for registro in _REGISTRO:
+        if grupos and registro.grupo not in grupos:
+            continue
+        if filtro and filtro not in f"{registro.grupo}.{registro.nombre}":
+            continue
+        medidor = Medidor(registro, contexto)
+        try:
+            registro.funcion(medidor, contexto)
+        except BenchmarkOmitido as e:
+            resultados.append(Resultado(registro.grupo, registro.nombre, 0, 0, 0, 0, 0, 0, omitido=str(e)))
+            continue
+        if medidor.resultado is None:
+            raise RuntimeError(f"El benchmark {registro.nombre} no llamó al medidor.")
+        resultados.append(medidor.resultado)
+    return resultados
+
+
+# ------------------------------
+# Salida y comparación
+# ------------------------------
+
+def _commit_actual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def guardar_json(resultados: List[Resultado], contexto: Contexto, ruta: str):
+    """Escribe los resultados y los metadatos de la ejecución en JSON."""
+    datos = {
+        "meta": {
+            "commit": _commit_actual(),
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            **asdict(contexto),
+        },
+        "resultados": [asdict(r) for r in resultados],
+    }
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+
+
+def comparar(resultados: List[Resultado], ruta_base: str, umbral: float) -> Dict[str, float]:
+    """
+    Compara con una ejecución anterior guardada en JSON.
+    Devuelve {grupo.nombre: ratio} de los benchmarks más lentos que `1 + umbral`.
+    """
+    with open(ruta_base, encoding="utf-8") as f:
+        base = {f"{r['grupo']}.{r['nombre']}": r for r in json.load(f)["resultados"]}
+    regresiones = {}
+    for r in resultados:
+        clave = f"{r.grupo}.{r.nombre}"
+        anterior = base.get(clave)
+        if r.omitido or not anterior or anterior.get("omitido") or not anterior["minimo"]:
+            continue
+        ratio = r.minimo / anterior["minimo"]
+        if ratio > 1 + umbral:
+            regresiones[clave] = ratio
+    return regresiones
+
+
+def formatear(resultados: List[Resultado], ruta_base: Optional[str] = None) -> str:
+    """Tabla de texto con los resultados (y el ratio frente a la base, si se indica)."""
+    base = {}
+    if ruta_base:
+        with open(ruta_base, encoding="utf-8") as f:
+            base = {f"{r['grupo']}.{r['nombre']}": r for r in json.load(f)["resultados"]}
+    lineas = [f"{'benchmark':<40} {'n':>9} {'mín (s)':>10} {'media (s)':>10} {'µs/elem':>9} {'vs base':>8}"]
+    for r in resultados:
+        clave = f"{r.grupo}.{r.nombre}"
+        if r.omitido:
+            lineas.append(f"{clave:<40} omitido: {r.omitido}")
+            continue
+        anterior = base.get(clave)
+        ratio = f"x{r.minimo / anterior['minimo']:.2f}" if anterior and anterior.get("minimo") else ""
+        extra = "  ".join(f"{k}={v:g}" for k, v in r.extra.items())
+        lineas.append(
+            f"{clave:<40} {r.n:>9} {r.minimo:>10.4f} {r.media:>10.4f} {r.por_elemento_us:>9.2f} {ratio:>8}"
+            + (f"  {extra}" if extra else "")
+        )
+    return "\n".join(lineas)
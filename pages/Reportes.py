@@ -0,0 +1,69 @@
+import streamlit as st
+
+from src.database_conn.db_conn import DatabaseConnection
+from src.reportes.kpis import obtener_kpis
+from src.utils.perfilado import pagina_perfilada, perfilar
+
+with pagina_perfilada("Reportes"):
+    st.title("Reportes")
+
+    try:
+        kpis = obtener_kpis()
+    except ConnectionError as e:
+        st.error(f"{e} Se volverá a intentar al recargar la página.")
+        st.stop()
+    granularidad = st.radio("Periodo", ("mes", "dia"), horizontal=True,
+                            format_func=lambda g: "Mensual" if g == "mes" else "Diario")
+
+    with st.sidebar:
+        if kpis.ultima_reconstruccion:
+            st.caption(f"Última reconstrucción: {kpis.ultima_reconstruccion:%Y-%m-%d %H:%M}")
+        if st.button("Reconstruir agregados"):
+            db = DatabaseConnection.from_env()
+            if db.connect():
+                try:
+                    kpis.reconstruir(db)
+                    st.success("Agregados reconstruidos.")
+                finally:
+                    db.disconnect()
+            else:
+                st.error("No se pudo conectar a la base de datos.")
+
+    with perfilar("ingresos"):
+        st.subheader("Ingresos")
+        ingresos = kpis.ingresos(granularidad)
+        if ingresos:
+            st.metric("Total del periodo más reciente", f"{list(ingresos.values())[-1]:.2f} €")
+            st.bar_chart(ingresos)
+        else:
+            st.info("Sin facturas pagadas.")
+
+    with perfilar("citas por estado"):
+        st.subheader("Citas por estado")
+        citas = kpis.citas_por_estado(granularidad)
+        if citas:
+            st.bar_chart({estado: {p: c.get(estado, 0) for p, c in citas.items()}
+                          for estado in ("pendiente", "completada", "cancelada")})
+        else:
+            st.info("Sin citas registradas.")
+
+    with perfilar("duración por veterinario"):
+        st.subheader("Duración media por veterinario")
+        duraciones = kpis.duracion_media_por_veterinario()
+        if duraciones:
+            st.table({"Veterinario (ID)": list(duraciones),
+                      "Duración media (min)": [round(d.total_seconds() / 60, 1) for d in duraciones.values()]})
+        else:
+            st.info("Sin citas completadas.")
+
+    with perfilar("consultas por especie"):
+        st.subheader("Consultas por especie")
+        especies = kpis.consultas_por_especie(granularidad)
+        if especies:
+            totales = {}
+            for conteo in especies.values():
+                for especie, n in conteo.items():
+                    totales[especie] = totales.get(especie, 0) + n
+            st.bar_chart(totales)
+        else:
+            st.info("Sin consultas registradas.")
@@ -0,0 +1,509 @@
+"""
+Archivo histórico de citas, consultas y facturas.
+
+Las citas completadas o canceladas anteriores al horizonte configurado salen de
+las tablas vivas junto con sus consultas y facturas (siempre que cada consulta
+tenga factura y todas estén pagadas), de modo que las consultas del día a día recorren menos filas. El
+archivo se particiona por año de la cita, en uno de dos destinos:
+
+- `DestinoTablas`: tablas `<tabla>_archivo_<año>` en la misma base de datos.
+- `DestinoParquet`: ficheros Parquet comprimidos `<directorio>/<tabla>/año=<año>/*.parquet`.
+
+El registro `particiones_archivo` enumera las particiones (o ficheros) que se
+han confirmado; `VistaHistorica` lo usa para leer a la vez las tablas vivas y
+el archivo, y así el historial de las mascotas y la reconstrucción de los KPIs
+siguen viéndolo todo.
+
+El archivado avanza en lotes acotados, cada uno en una transacción corta, con
+una pausa entre lotes para no bloquear a la clínica:
+
+    python -m src.database_conn.archivado --horizonte 365 --lote 500
+"""
+import argparse
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.database_conn.esquema import COLUMNAS, ddl_tabla
+from src.database_conn.repositorios import reintentar_si_conflicto
+from src.eventos import cambios
+from src.eventos.bus import BusCambios, obtener_bus
+from src.excepciones.excepciones import ConflictoConcurrenciaError
+from src.utils.fechas import a_texto_fecha, a_texto_hora, parsear_fecha, parsear_hora
+from src.utils.perfilado import perfilar
+
+TABLAS_ARCHIVABLES = ("citas", "consultas", "facturas")
+CLAVES = {"citas": "id_cita", "consultas": "id_consulta", "facturas": "id_factura"}
+ENTIDADES = {"citas": cambios.CITA, "consultas": cambios.CONSULTA, "facturas": cambios.FACTURA}
+ESTADOS_ARCHIVABLES = ("completada", "cancelada")
+
+DDL_REGISTRO = """
+    CREATE TABLE IF NOT EXISTS particiones_archivo (
+        tabla VARCHAR(20) NOT NULL,
+        ubicacion VARCHAR(255) NOT NULL,
+        año INTEGER NOT NULL,
+        destino VARCHAR(10) NOT NULL,
+        filas INTEGER NOT NULL,
+        actualizada DATETIME NOT NULL,
+        PRIMARY KEY (tabla, ubicacion)
+    )
+"""
+
+
+def _columnas(tabla: str) -> tuple:
+    # El archivo conserva la versión con la que se archivó cada fila
+    return COLUMNAS[tabla] + ("version",)
+
+
+def _marcadores(n: int) -> str:
+    return ", ".join(["%s"] * n)
+
+
+def _donde(igual: Optional[Dict[str, Any]], en: Optional[Dict[str, Iterable]]) -> tuple:
+    """Cláusula WHERE (vacía si no hay condiciones) y parámetros de `igual` y `en`."""
+    condiciones, parametros = [], []
+    for columna, valor in (igual or {}).items():
+        condiciones.append(f"{columna} = %s")
+        parametros.append(valor)
+    for columna, valores in (en or {}).items():
+        valores = list(valores)
+        # IN () no es SQL válido: un conjunto vacío no cumple ninguna fila
+        condiciones.append(f"{columna} IN ({_marcadores(len(valores))})" if valores else "1 = 0")
+        parametros.extend(valores)
+    return (" WHERE " + " AND ".join(condiciones) if condiciones else ""), tuple(parametros)
+
+
+@dataclass(frozen=True)
+class Particion:
+    tabla: str
+    año: int
+    destino: str
+    ubicacion: str  # Nombre de la tabla o ruta del fichero
+    filas: int = 0
+
+
+# ------------------------------
+# Destinos
+# ------------------------------
+
+class DestinoArchivo(ABC):
+    """
+    Clase Abstracta DestinoArchivo
+    Propósito: Guardar y leer las filas archivadas de un año.
+
+    Principio SOLID:
+    - OCP (Abierto/Cerrado): El archivador y la vista histórica no cambian al
+      añadir un destino nuevo.
+    """
+
+    nombre: str = ""
+
+    def preparar(self, db, tabla: str, año: int) -> None:
+        """Se llama fuera de la transacción del lote (p. ej. para crear tablas)."""
+
+    @abstractmethod
+    def escribir(self, db, tabla: str, año: int, filas: List[dict]) -> Particion:
+        """Guarda `filas` y devuelve la partición que debe registrarse."""
+
+    def descartar(self, particion: Particion) -> None:
+        """Deshace `escribir` si la transacción del lote no se confirma."""
+
+    @abstractmethod
+    def leer(self, db, particion: Particion, columnas: Iterable[str],
+             igual: Optional[Dict[str, Any]] = None, en: Optional[Dict[str, Iterable]] = None) -> List[dict]:
+        """
+        Columnas `columnas` de las filas de la partición que cumplen las igualdades
+        de `igual` y cuyo valor de cada columna de `en` está entre los indicados.
+        """
+
+
+class DestinoTablas(DestinoArchivo):
+    """Tablas `<tabla>_archivo_<año>` con la misma estructura que las vivas."""
+
+    nombre = "tablas"
+
+    @staticmethod
+    def tabla_archivo(tabla: str, año: int) -> str:
+        return f"{tabla}_archivo_{año}"
+
+    def preparar(self, db, tabla, año):
+        nombre = self.tabla_archivo(tabla, año)
+        db.execute_query(ddl_tabla(tabla, nombre))
+        if tabla == "citas":
+            # Índice del historial por mascota; si ya existe la sentencia falla sin más
+            db.execute_query(f"CREATE INDEX idx_{nombre}_mascota ON {nombre} (id_mascota)")
+        elif tabla == "consultas":
+            db.execute_query(f"CREATE INDEX idx_{nombre}_cita ON {nombre} (id_cita)")
+
+    def escribir(self, db, tabla, año, filas):
+        nombre = self.tabla_archivo(tabla, año)
+        columnas = _columnas(tabla)
+        db.execute_many(
+            f"INSERT INTO {nombre} ({', '.join(columnas)}) VALUES ({_marcadores(len(columnas))})",
+            [tuple(f[c] for c in columnas) for f in filas],
+        )
+        return Particion(tabla, año, self.nombre, nombre, len(filas))
+
+    def leer(self, db, particion, columnas, igual=None, en=None):
+        donde, parametros = _donde(igual, en)
+        return db.fetch_all(f"SELECT {', '.join(columnas)} FROM {particion.ubicacion}{donde}", parametros)
+
+
+class DestinoParquet(DestinoArchivo):
+    """
+    Un fichero Parquet comprimido por tabla, año y lote. Requiere pyarrow.
+    Los ficheros de lotes que no llegaron a confirmarse no están en el registro
+    y nunca se leen.
+    """
+
+    nombre = "parquet"
+
+    def __init__(self, directorio: str, compresion: str = "zstd"):
+        self.directorio = directorio
+        self.compresion = compresion
+
+    @staticmethod
+    def _pyarrow():
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("El archivo en Parquet requiere pyarrow.") from e
+        return pyarrow, pyarrow.parquet
+
+    @staticmethod
+    def _tipo(pa, columna: str):
+        """Tipo Parquet y conversión de cada valor (DECIMAL, DATE y TIME llegan como objetos)."""
+        if columna.startswith("id_") or columna == "version":
+            return pa.int64(), int
+        if columna == "total":
+            return pa.float64(), float
+        return pa.string(), DestinoParquet._a_texto(columna)
+
+    @staticmethod
+    def _a_texto(columna: str):
+        """
+        Conversión a texto con el formato de las tablas vivas: MySQL devuelve las
+        horas como `timedelta` y las fechas como `date`/`datetime`.
+        """
+        if columna in ("hora", "hora_fin"):
+            return a_texto_hora
+        if columna == "fecha":
+            return a_texto_fecha
+        if columna == "fecha_registro":
+            return lambda v: v.strftime("%Y-%m-%d %H:%M:%S") if isinstance(v, datetime) else str(v)
+        return str
+
+    def escribir(self, db, tabla, año, filas):
+        pa, pq = self._pyarrow()
+        columnas = _columnas(tabla)
+        tipos = {c: self._tipo(pa, c) for c in columnas}
+        esquema = pa.schema([(c, tipos[c][0]) for c in columnas])
+        datos = {c: [None if f[c] is None else tipos[c][1](f[c]) for f in filas] for c in columnas}
+        directorio = os.path.join(self.directorio, tabla, f"año={año}")
+        os.makedirs(directorio, exist_ok=True)
+        ruta = os.path.join(directorio, f"{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.parquet")
+        pq.write_table(pa.table(datos, schema=esquema), ruta, compression=self.compresion)
+        return Particion(tabla, año, self.nombre, ruta, len(filas))
+
+    def descartar(self, particion):
+        if os.path.exists(particion.ubicacion):
+            os.remove(particion.ubicacion)
+
+    def leer(self, db, particion, columnas, igual=None, en=None):
+        _, pq = self._pyarrow()
+        filtros = [(c, "==", v) for c, v in (igual or {}).items()]
+        filtros += [(c, "in", list(v)) for c, v in (en or {}).items()]
+        return pq.read_table(particion.ubicacion, columns=list(columnas), filters=filtros or None).to_pylist()
+
+
+DESTINOS = {"tablas": DestinoTablas, "parquet": DestinoParquet}
+
+
+# ------------------------------
+# Lectura conjunta de tablas vivas y archivo
+# ------------------------------
+
+class VistaHistorica:
+    """
+    Clase VistaHistorica
+    Propósito: Leer citas, consultas y facturas sin importar si siguen en las
+    tablas vivas o ya se archivaron.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def particiones(self, tabla: Optional[str] = None) -> List[Particion]:
+        """Particiones registradas; ninguna si nunca se ha archivado."""
+        try:
+            filas = self.db.fetch_all(
+                "SELECT tabla, año, destino, ubicacion, filas FROM particiones_archivo ORDER BY año, ubicacion"
+            )
+        except self.db.backend.Error as e:
+            if not self.db.backend.tabla_inexistente(e):
+                raise
+            return []  # La tabla de registro aún no existe
+        return [Particion(f["tabla"], f["año"], f["destino"], f["ubicacion"], f["filas"])
+                for f in filas if tabla is None or f["tabla"] == tabla]
+
+    def _destino(self, particion: Particion) -> DestinoArchivo:
+        if particion.destino == DestinoParquet.nombre:
+            return DestinoParquet(os.path.dirname(particion.ubicacion))
+        return DestinoTablas()
+
+    def leer(self, particion: Particion, columnas: Iterable[str], igual: Optional[Dict[str, Any]] = None,
+             en: Optional[Dict[str, Iterable]] = None) -> List[dict]:
+        return self._destino(particion).leer(self.db, particion, list(columnas), igual, en)
+
+    def archivadas(self, tabla: str, columnas: Iterable[str], igual: Optional[Dict[str, Any]] = None) -> Iterator[dict]:
+        """Filas archivadas de `tabla`, partición a partición."""
+        for particion in self.particiones(tabla):
+            yield from self.leer(particion, columnas, igual)
+
+    def filas(self, tabla: str, columnas: Iterable[str], igual: Optional[Dict[str, Any]] = None) -> Iterator[dict]:
+        """Filas vivas y archivadas de `tabla` que cumplen las igualdades de `igual`."""
+        columnas = list(columnas)
+        donde, parametros = _donde(igual, None)
+        yield from self.db.fetch_all(f"SELECT {', '.join(columnas)} FROM {tabla}{donde}", parametros)
+        yield from self.archivadas(tabla, columnas, igual)
+
+    def citas_de_mascota(self, id_mascota: int) -> List[dict]:
+        citas = list(self.filas("citas", _columnas("citas"), {"id_mascota": id_mascota}))
+        # Las horas de MySQL son timedelta y las de SQLite texto: '9:00:00' iría tras '10:00'
+        return sorted(citas, key=lambda c: (a_texto_fecha(c["fecha"]), parsear_hora(a_texto_hora(c["hora"]))))
+
+    def consultas_de_mascota(self, id_mascota: int) -> List[int]:
+        """IDs de todas las consultas de la mascota, vivas y archivadas, por ID."""
+        ids = [f["id_consulta"] for f in self.db.fetch_all(
+            "SELECT co.id_consulta FROM consultas co JOIN citas ci ON ci.id_cita = co.id_cita "
+            "WHERE ci.id_mascota = %s", (id_mascota,))]
+        # Una cita y sus consultas se archivan juntas, en la partición del mismo año:
+        # de cada partición de consultas solo se leen las de las citas de la mascota
+        particiones = self.particiones()
+        for año in sorted({p.año for p in particiones if p.tabla == "consultas"}):
+            citas = {c["id_cita"] for p in particiones if p.tabla == "citas" and p.año == año
+                     for c in self.leer(p, ("id_cita",), {"id_mascota": id_mascota})}
+            if not citas:
+                continue
+            for p in particiones:
+                if p.tabla == "consultas" and p.año == año:
+                    ids.extend(f["id_consulta"] for f in self.leer(p, ("id_consulta",), en={"id_cita": citas}))
+        return sorted(ids)
+
+    def consultas_archivadas_con_especie(self) -> Iterator[dict]:
+        """Consultas archivadas con la especie de la mascota, como la consulta de los KPIs."""
+        particiones = self.particiones()
+        if not particiones:
+            return
+        especies = {f["id_mascota"]: f["especie"]
+                    for f in self.db.fetch_all("SELECT id_mascota, especie FROM mascotas")}
+        for año in sorted({p.año for p in particiones if p.tabla == "consultas"}):
+            mascota_de_cita = {c["id_cita"]: c["id_mascota"]
+                               for p in particiones if p.tabla == "citas" and p.año == año
+                               for c in self.leer(p, ("id_cita", "id_mascota"))}
+            for p in particiones:
+                if p.tabla == "consultas" and p.año == año:
+                    for fila in self.leer(p, ("id_consulta", "id_cita", "fecha_registro")):
+                        especie = especies.get(mascota_de_cita.get(fila["id_cita"]))
+                        if especie is not None:
+                            yield {"id_consulta": fila["id_consulta"], "fecha_registro": fila["fecha_registro"],
+                                   "especie": especie}
+
+
+# ------------------------------
+# Archivador
+# ------------------------------
+
+@dataclass
+class ResultadoArchivado:
+    lotes: int = 0
+    citas: int = 0
+    consultas: int = 0
+    facturas: int = 0
+    conflictos: int = 0
+    duracion: float = 0.0
+
+    def __str__(self):
+        return (f"{self.lotes} lotes: {self.citas} citas, {self.consultas} consultas y "
+                f"{self.facturas} facturas archivadas en {self.duracion:.2f} s "
+                f"({self.conflictos} lotes reintentados por conflicto)")
+
+
+class Archivador:
+    """
+    Clase Archivador
+    Propósito: Mover a un destino de archivo las citas cerradas antiguas con
+    sus consultas y facturas pagadas, por lotes acotados.
+
+    Principio SOLID:
+    - SRP (Responsabilidad Única): Solo decide qué se archiva y cuándo; dónde
+      se guarda lo resuelve el `DestinoArchivo`.
+
+    Cada lote borra las filas vivas con compare-and-swap sobre `version`: si
+    otra sesión modificó alguna entre la lectura y el borrado, el lote entero se
+    deshace y se vuelve a seleccionar.
+    """
+
+    def __init__(self, db, destino: Optional[DestinoArchivo] = None, horizonte_dias: int = 365,
+                 tam_lote: int = 500, pausa: float = 0.05, hoy: Optional[date] = None,
+                 bus: Optional[BusCambios] = None):
+        self.db = db
+        self.destino = destino or DestinoTablas()
+        self.horizonte_dias = horizonte_dias
+        self.tam_lote = tam_lote
+        self.pausa = pausa
+        self.hoy = hoy
+        self.bus = bus or obtener_bus()
+
+    @property
+    def corte(self) -> date:
+        """Se archivan las citas anteriores a esta fecha."""
+        return (self.hoy or date.today()) - timedelta(days=self.horizonte_dias)
+
+    def preparar(self) -> None:
+        self.db.execute_query(DDL_REGISTRO)
+
+    def ejecutar(self, max_lotes: Optional[int] = None) -> ResultadoArchivado:
+        """Archiva lotes hasta que no quede nada por archivar (o hasta `max_lotes`)."""
+        self.preparar()
+        resultado = ResultadoArchivado()
+        inicio = time.perf_counter()
+        while max_lotes is None or resultado.lotes < max_lotes:
+            intentos = []
+
+            def lote():
+                intentos.append(1)
+                return self.archivar_lote()
+
+            movidas = reintentar_si_conflicto(lote)
+            resultado.conflictos += len(intentos) - 1
+            if not movidas["citas"]:
+                break
+            resultado.lotes += 1
+            for tabla in TABLAS_ARCHIVABLES:
+                setattr(resultado, tabla, getattr(resultado, tabla) + movidas[tabla])
+            if self.pausa:
+                time.sleep(self.pausa)  # Deja pasar las escrituras de la clínica entre lotes
+        resultado.duracion = time.perf_counter() - inicio
+        return resultado
+
+    def _candidatas(self) -> List[dict]:
+        # Cada consulta de la cita debe estar facturada y sin facturas pendientes de pago
+        return self.db.fetch_all(
+            "SELECT ci.* FROM citas ci "
+            f"WHERE ci.estado IN ({_marcadores(len(ESTADOS_ARCHIVABLES))}) AND ci.fecha < %s "
+            "AND NOT EXISTS (SELECT 1 FROM consultas co WHERE co.id_cita = ci.id_cita AND ("
+            "NOT EXISTS (SELECT 1 FROM facturas f WHERE f.id_consulta = co.id_consulta "
+            "AND f.metodo_pago IS NOT NULL) "
+            "OR EXISTS (SELECT 1 FROM facturas f WHERE f.id_consulta = co.id_consulta "
+            "AND f.metodo_pago IS NULL))) "
+            "ORDER BY ci.fecha, ci.id_cita LIMIT %s",
+            ESTADOS_ARCHIVABLES + (self.corte.isoformat(), self.tam_lote),
+        )
+
+    @perfilar()
+    def archivar_lote(self) -> Dict[str, int]:
+        """Archiva un lote. Devuelve las filas movidas por tabla (0 citas: no queda nada)."""
+        citas = self._candidatas()
+        if not citas:
+            return dict.fromkeys(TABLAS_ARCHIVABLES, 0)
+        ids_citas = [c["id_cita"] for c in citas]
+        consultas = self.db.fetch_all(
+            f"SELECT * FROM consultas WHERE id_cita IN ({_marcadores(len(ids_citas))})", tuple(ids_citas))
+        ids_consultas = [c["id_consulta"] for c in consultas]
+        facturas = self.db.fetch_all(
+            f"SELECT * FROM facturas WHERE id_consulta IN ({_marcadores(len(ids_consultas))})",
+            tuple(ids_consultas)) if ids_consultas else []
+
+        # Todo el grupo de una cita va a la partición del año de la cita
+        año_cita = {c["id_cita"]: parsear_fecha(a_texto_fecha(c["fecha"])).year for c in citas}
+        año_consulta = {c["id_consulta"]: año_cita[c["id_cita"]] for c in consultas}
+        grupos: Dict[tuple, List[dict]] = {}
+        for tabla, filas, año in (("citas", citas, lambda f: año_cita[f["id_cita"]]),
+                                  ("consultas", consultas, lambda f: año_cita[f["id_cita"]]),
+                                  ("facturas", facturas, lambda f: año_consulta[f["id_consulta"]])):
+            for fila in filas:
+                grupos.setdefault((tabla, año(fila)), []).append(fila)
+
+        for tabla, año in grupos:
+            self.destino.preparar(self.db, tabla, año)  # DDL fuera de la transacción
+        escritas: List[Particion] = []
+        try:
+            with self.db.transaction():
+                for (tabla, año), filas in grupos.items():
+                    particion = self.destino.escribir(self.db, tabla, año, filas)
+                    escritas.append(particion)
+                    self._registrar(particion)
+                # Primero las que referencian a las demás
+                self._borrar("facturas", facturas)
+                self._borrar("consultas", consultas)
+                self.db.execute_query(
+                    f"DELETE FROM franjas_agenda WHERE id_cita IN ({_marcadores(len(ids_citas))})", tuple(ids_citas))
+                self._borrar("citas", citas)
+        except BaseException:
+            for particion in escritas:
+                self.destino.descartar(particion)
+            raise
+
+        with self.bus.agrupar():
+            for tabla, filas in (("citas", citas), ("consultas", consultas), ("facturas", facturas)):
+                for fila in filas:
+                    self.bus.emitir(ENTIDADES[tabla], cambios.ELIMINAR, fila[CLAVES[tabla]],
+                                   {cambios.ARCHIVADO: True})
+        return {"citas": len(citas), "consultas": len(consultas), "facturas": len(facturas)}
+
+    def _borrar(self, tabla: str, filas: List[dict]) -> None:
+        clave = CLAVES[tabla]
+        for fila in filas:
+            if self.db.execute_update(f"DELETE FROM {tabla} WHERE {clave} = %s AND version = %s",
+                                      (fila[clave], fila["version"])) != 1:
+                raise ConflictoConcurrenciaError(ENTIDADES[tabla], fila[clave], fila["version"])
+
+    def _registrar(self, particion: Particion) -> None:
+        ahora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        actualizadas = self.db.execute_update(
+            "UPDATE particiones_archivo SET filas = filas + %s, actualizada = %s "
+            "WHERE tabla = %s AND ubicacion = %s",
+            (particion.filas, ahora, particion.tabla, particion.ubicacion),
+        )
+        if actualizadas == 0:
+            self.db.execute_query(
+                "INSERT INTO particiones_archivo (tabla, ubicacion, año, destino, filas, actualizada) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                (particion.tabla, particion.ubicacion, particion.año, particion.destino, particion.filas, ahora),
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archiva citas, consultas y facturas antiguas.")
+    parser.add_argument("--horizonte", type=int, default=365, help="Días que se mantienen en las tablas vivas")
+    parser.add_argument("--lote", type=int, default=500, help="Citas por lote")
+    parser.add_argument("--pausa", type=float, default=0.05, help="Segundos de pausa entre lotes")
+    parser.add_argument("--max-lotes", type=int, default=None)
+    parser.add_argument("--destino", choices=tuple(DESTINOS), default="tablas")
+    parser.add_argument("--directorio", default="archivo", help="Directorio de los Parquet (destino parquet)")
+    args = parser.parse_args(argv)
+
+    from src.database_conn.db_conn import DatabaseConnection
+    from src.eventos.transporte import detener_replicacion, iniciar_replicacion
+
+    db = DatabaseConnection.from_env()
+    if not db.connect():
+        raise SystemExit("No se pudo conectar a la base de datos.")
+    iniciar_replicacion(en_segundo_plano=False)
+    destino = DestinoParquet(args.directorio) if args.destino == "parquet" else DestinoTablas()
+    try:
+        archivador = Archivador(db, destino, args.horizonte, args.lote, args.pausa)
+        print(archivador.ejecutar(args.max_lotes))
+    finally:
+        detener_replicacion()
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Motores de base de datos intercambiables detrás de `DatabaseConnection`.
+
+Un backend sabe abrir una conexión con la interfaz que usa `DatabaseConnection`
+(la de `mysql.connector`: is_connected, cursor(dictionary=...), commit,
+rollback, close) y expone en `Error` la excepción base de su driver.
+
+- `MySQLBackend`: servidor MySQL mediante mysql-connector (importado bajo demanda).
+- `SQLiteBackend`: fichero SQLite embebido, sin servidor ni salto de red, para
+  clínicas pequeñas, demos sin conexión, tests y benchmarks.
+"""
+import sqlite3
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence
+
+
+class Backend(ABC):
+    """
+    Clase Abstracta Backend
+    Propósito: Abrir conexiones a un motor de base de datos concreto.
+
+    Principio SOLID:
+    - DIP (Inversión de Dependencias): `DatabaseConnection` depende de esta
+      abstracción y no de un driver concreto.
+    """
+
+    nombre: str = ""
+
+    @property
+    @abstractmethod
+    def Error(self) -> type:
+        """Excepción base de los errores del driver."""
+
+    @abstractmethod
+    def connect(self) -> Any:
+        """Abre y devuelve una conexión nueva."""
+
+    def tabla_inexistente(self, error: Exception) -> bool:
+        """Si `error` se debe a que la tabla consultada no existe."""
+        return False
+
+
+class _SinDriverMySQL(Exception):
+    """Nunca se lanza: ocupa el lugar de `mysql.connector.Error` si el driver no está instalado."""
+
+
+class MySQLBackend(Backend):
+    nombre = "mysql"
+
+    def __init__(self, host: str, user: str, password: str, database: str):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        # Se resuelve una sola vez: importar dentro de un `except self.backend.Error`
+        # sin el driver lanzaría ImportError y ocultaría el error original
+        try:
+            from mysql.connector import Error
+        except ImportError:
+            Error = _SinDriverMySQL  # connect() avisará de que falta el driver
+        self._error = Error
+
+    @property
+    def Error(self) -> type:
+        return self._error
+
+    def tabla_inexistente(self, error: Exception) -> bool:
+        return getattr(error, "errno", None) == 1146  # ER_NO_SUCH_TABLE
+
+    def connect(self):
+        import mysql.connector
+        return mysql.connector.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database
+        )
+
+
+# ------------------------------
+# SQLite
+# ------------------------------
+
+@lru_cache(maxsize=512)
+def traducir_marcadores(query: str) -> str:
+    """
+    Convierte los marcadores `%s` (estilo MySQL) en `?` (estilo SQLite), sin
+    tocar los que aparezcan dentro de literales entre comillas. Se cachea porque
+    las mismas sentencias se repiten constantemente.
+    """
+    resultado = []
+    comilla: Optional[str] = None
+    i = 0
+    while i < len(query):
+        caracter = query[i]
+        if comilla:
+            if caracter == comilla:
+                comilla = None
+        elif caracter in ("'", '"', "`"):
+            comilla = caracter
+        elif caracter == "%" and query[i + 1:i + 2] == "s":
+            resultado.append("?")
+            i += 2
+            continue
+        elif caracter == "%" and query[i + 1:i + 2] == "%":
+            resultado.append("%")
+            i += 2
+            continue
+        resultado.append(caracter)
+        i += 1
+    return "".join(resultado)
+
+
+def _fila_como_dict(cursor: sqlite3.Cursor, fila: tuple) -> dict:
+    return {descripcion[0]: valor for descripcion, valor in zip(cursor.description, fila)}
+
+
+class CursorSQLite:
+    """Cursor con la interfaz de `mysql.connector` sobre un cursor de sqlite3."""
+
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool = False):
+        self._cursor = cursor
+        if dictionary:
+            self._cursor.row_factory = _fila_como_dict
+
+    def execute(self, query: str, params: Optional[Sequence] = None):
+        self._cursor.execute(traducir_marcadores(query), params or ())
+
+    def executemany(self, query: str, params_seq):
+        self._cursor.executemany(traducir_marcadores(query), params_seq)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int = 1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexionSQLite:
+    """Conexión con la interfaz de `mysql.connector` sobre sqlite3."""
+
+    def __init__(self, conexion: sqlite3.Connection):
+        self._conexion = conexion
+        self._abierta = True
+
+    def is_connected(self) -> bool:
+        return self._abierta
+
+    def cursor(self, dictionary: bool = False) -> CursorSQLite:
+        return CursorSQLite(self._conexion.cursor(), dictionary)
+
+    def commit(self):
+        self._conexion.commit()
+
+    def rollback(self):
+        self._conexion.rollback()
+
+    def close(self):
+        self._conexion.close()
+        self._abierta = False
+
+
+class SQLiteBackend(Backend):
+    """
+    Backend SQLite embebido.
+
+    - Modo WAL: los lectores no bloquean al escritor ni al revés.
+    - synchronous=NORMAL: seguro con WAL y evita un fsync por transacción.
+    - Caché de páginas, tablas temporales en memoria y lectura por mmap.
+    - `cached_statements`: sentencias preparadas reutilizadas por conexión.
+    """
+
+    nombre = "sqlite"
+
+    PRAGMAS: Dict[str, Any] = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -20000,        # ~20 MB
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024,
+    }
+
+    def __init__(self, ruta: str, pragmas: Optional[Dict[str, Any]] = None, cached_statements: int = 256):
+        self.ruta = ruta
+        self.pragmas = {**self.PRAGMAS, **(pragmas or {})}
+        self.cached_statements = cached_statements
+
+    @property
+    def Error(self) -> type:
+        return sqlite3.Error
+
+    def tabla_inexistente(self, error: Exception) -> bool:
+        return isinstance(error, sqlite3.OperationalError) and "no such table" in str(error)
+
+    def connect(self) -> ConexionSQLite:
+        conexion = sqlite3.connect(
+            self.ruta,
+            timeout=self.pragmas["busy_timeout"] / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        for nombre, valor in self.pragmas.items():
+            if nombre == "journal_mode" and self.ruta == ":memory:":
+                continue  # Las bases en memoria no admiten WAL
+            conexion.execute(f"PRAGMA {nombre} = {valor}")
+        return ConexionSQLite(conexion)
@@ -1,51 +1,138 @@
-import mysql.connector 
-from mysql.connector import Error
 import sys
 import os
-from typing import Optional, Any
+from contextlib import contextmanager
+from typing import Optional, Any, Iterator, List
+
+from src.database_conn.backends import Backend, MySQLBackend, SQLiteBackend
+from src.utils.perfilado import perfilar
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..\..')))
 
 
 
 class DatabaseConnection:
-    def __init__(self, host: str, user: str, password: str, database: str):
+    def __init__(self, host: str, user: str, password: str, database: str,
+                 backend: Optional[Backend] = None):
         self.host = host
         self.user = user
         self.password = password
         self.database = database
-        self.connection: Optional[mysql.connector.connection.MySQLConnection] = None
+        # Por defecto MySQL; cualquier otro motor se inyecta como backend
+        self.backend = backend or MySQLBackend(host, user, password, database)
+        self.connection: Optional[Any] = None
+        self._in_transaction = False
+
+    @classmethod
+    def sqlite(cls, ruta: str, **opciones) -> "DatabaseConnection":
+        """Crea una conexión a una base de datos SQLite embebida en `ruta`."""
+        return cls("", "", "", ruta, backend=SQLiteBackend(ruta, **opciones))
+
+    @classmethod
+    def from_env(cls) -> "DatabaseConnection":
+        """
+        Crea la conexión a partir de las variables CLINICA_DB_HOST/USER/PASSWORD/NAME.
+        Con CLINICA_DB_BACKEND=sqlite usa el fichero CLINICA_DB_PATH (clinica.db por defecto).
+        """
+        if os.environ.get("CLINICA_DB_BACKEND", "mysql").lower() == "sqlite":
+            return cls.sqlite(os.environ.get("CLINICA_DB_PATH", "clinica.db"))
+        return cls(
+            host=os.environ.get("CLINICA_DB_HOST", "localhost"),
+            user=os.environ.get("CLINICA_DB_USER", "root"),
+            password=os.environ.get("CLINICA_DB_PASSWORD", ""),
+            database=os.environ.get("CLINICA_DB_NAME", "clinicadb"),
+        )
 
     def connect(self) -> bool:
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
+            self.connection = self.backend.connect()
             return self.connection.is_connected()
-        except Error:
+        except self.backend.Error:
             return False
 
     def disconnect(self) -> None:
         if self.connection and self.connection.is_connected():
             self.connection.close()
 
+    @perfilar("db.execute_query")
     def execute_query(self, query: str, params: Optional[tuple] = None) -> bool:
         if not self.connection or not self.connection.is_connected():
             raise ConnectionError("Database not connected")
         cursor = self.connection.cursor()
         try:
             cursor.execute(query, params)
-            self.connection.commit()
+            self._commit()
             return True
-        except Error:
+        except self.backend.Error:
+            if self._in_transaction:
+                raise
             self.connection.rollback()
             return False
         finally:
             cursor.close()
 
+    @perfilar("db.execute_many")
+    def execute_many(self, query: str, params_seq: List[tuple]) -> bool:
+        if not self.connection or not self.connection.is_connected():
+            raise ConnectionError("Database not connected")
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(query, params_seq)
+            self._commit()
+            return True
+        except self.backend.Error:
+            if self._in_transaction:
+                raise
+            self.connection.rollback()
+            return False
+        finally:
+            cursor.close()
+
+    @perfilar("db.execute_update")
+    def execute_update(self, query: str, params: Optional[tuple] = None) -> int:
+        """Ejecuta un UPDATE/DELETE y devuelve las filas afectadas (-1 si falla)."""
+        if not self.connection or not self.connection.is_connected():
+            raise ConnectionError("Database not connected")
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, params)
+            rowcount = cursor.rowcount
+            self._commit()
+            return rowcount
+        except self.backend.Error:
+            if self._in_transaction:
+                raise
+            self.connection.rollback()
+            return -1
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupa varias sentencias en una única transacción.
+        Dentro del bloque los errores de la base de datos se propagan (en lugar de
+        devolver False) y provocan un rollback de todo el bloque.
+        """
+        if not self.connection or not self.connection.is_connected():
+            raise ConnectionError("Database not connected")
+        if self._in_transaction:
+            yield self
+            return
+        self._in_transaction = True
+        try:
+            yield self
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+
+    def _commit(self) -> None:
+        if not self._in_transaction:
+            self.connection.commit()
+
+    @perfilar("db.fetch_one")
     def fetch_one(self, query: str, params: Optional[tuple] = None) -> Optional[Any]:
         if not self.connection or not self.connection.is_connected():
             raise ConnectionError("Database not connected")
@@ -55,6 +142,34 @@ class DatabaseConnection:
         cursor.close()
         return result
 
+    @perfilar("db.fetch_all")
+    def fetch_all(self, query: str, params: Optional[tuple] = None) -> List[dict]:
+        if not self.connection or not self.connection.is_connected():
+            raise ConnectionError("Database not connected")
+        cursor = self.connection.cursor(dictionary=True)
+        cursor.execute(query, params)
+        result = cursor.fetchall()
+        cursor.close()
+        return result
+
+    def fetch_iter(self, query: str, params: Optional[tuple] = None, tam_lote: int = 1000) -> Iterator[dict]:
+        """
+        Recorre el resultado en bloques de `tam_lote` filas sin cargarlo entero.
+        No se deben lanzar otras consultas por esta conexión hasta agotar el iterador.
+        """
+        if not self.connection or not self.connection.is_connected():
+            raise ConnectionError("Database not connected")
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            while True:
+                filas = cursor.fetchmany(tam_lote)
+                if not filas:
+                    return
+                yield from filas
+        finally:
+            cursor.close()
+
     def validate_user(self, username: str, password: str) -> bool:
         if not self.connection or not self.connection.is_connected():
             raise ConnectionError("Database not connected")
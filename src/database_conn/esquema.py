@@ -0,0 +1,153 @@
+"""
+Esquema de la base de datos de la clínica.
+
+Las sentencias usan tipos comunes a MySQL y SQLite para poder crear las mismas
+tablas en ambos motores. `COLUMNAS` fija el orden de columnas que usan las
+cargas masivas (INSERT con executemany).
+"""
+import re
+
+COLUMNAS = {
+    "duenos": ("id_dueno", "nombre", "dni", "telefono", "email", "fecha_nacimiento", "direccion"),
+    "mascotas": ("id_mascota", "nombre", "especie", "raza", "fecha_nacimiento", "peso", "sexo", "id_dueno"),
+    "empleados": (
+        "id_empleado", "nombre", "dni", "telefono", "email", "fecha_nacimiento", "salario",
+        "tipo_empleado", "usuario", "contraseña", "especialidad", "num_colegiado", "horario",
+        "turno", "area_asignada",
+    ),
+    "citas": ("id_cita", "fecha", "hora", "motivo", "id_mascota", "id_empleado", "estado", "hora_fin"),
+    "consultas": ("id_consulta", "id_cita", "diagnostico", "tratamiento", "observaciones",
+                  "id_factura", "fecha_registro"),
+    "facturas": ("id_factura", "id_consulta", "total", "fecha", "metodo_pago"),
+    "franjas_agenda": ("id_empleado", "fecha", "hora", "id_cita"),
+}
+
+# Orden en el que deben insertarse las tablas para respetar las claves foráneas.
+# `franjas_agenda` no aparece: se deriva de `citas` (una fila por cita no cancelada).
+ORDEN_TABLAS = ("duenos", "mascotas", "empleados", "citas", "consultas", "facturas")
+
+# Tablas con control de concurrencia optimista (columna `version`)
+TABLAS_VERSIONADAS = ("duenos", "mascotas", "citas", "consultas", "facturas")
+
+DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS duenos (
+        id_dueno INTEGER PRIMARY KEY,
+        nombre VARCHAR(120) NOT NULL,
+        dni VARCHAR(20) NOT NULL UNIQUE,
+        telefono VARCHAR(20),
+        email VARCHAR(120),
+        fecha_nacimiento DATE,
+        direccion VARCHAR(200),
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS mascotas (
+        id_mascota INTEGER PRIMARY KEY,
+        nombre VARCHAR(80) NOT NULL,
+        especie VARCHAR(40) NOT NULL,
+        raza VARCHAR(60),
+        fecha_nacimiento DATE,
+        peso DECIMAL(6, 2),
+        sexo VARCHAR(1),
+        id_dueno INTEGER NOT NULL REFERENCES duenos (id_dueno),
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS empleados (
+        id_empleado INTEGER PRIMARY KEY,
+        nombre VARCHAR(120) NOT NULL,
+        dni VARCHAR(20) NOT NULL UNIQUE,
+        telefono VARCHAR(20),
+        email VARCHAR(120),
+        fecha_nacimiento DATE,
+        salario DECIMAL(10, 2),
+        tipo_empleado VARCHAR(20) NOT NULL,
+        usuario VARCHAR(60),
+        contraseña VARCHAR(120),
+        especialidad VARCHAR(80),
+        num_colegiado VARCHAR(40),
+        horario VARCHAR(20),
+        turno VARCHAR(20),
+        area_asignada VARCHAR(80)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS citas (
+        id_cita INTEGER PRIMARY KEY,
+        fecha DATE NOT NULL,
+        hora TIME NOT NULL,
+        motivo VARCHAR(200),
+        id_mascota INTEGER NOT NULL REFERENCES mascotas (id_mascota),
+        id_empleado INTEGER NOT NULL REFERENCES empleados (id_empleado),
+        estado VARCHAR(12) NOT NULL,
+        hora_fin TIME,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS consultas (
+        id_consulta INTEGER PRIMARY KEY,
+        id_cita INTEGER NOT NULL REFERENCES citas (id_cita),
+        diagnostico TEXT,
+        tratamiento TEXT,
+        observaciones TEXT,
+        id_factura INTEGER,
+        fecha_registro DATETIME,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS facturas (
+        id_factura INTEGER PRIMARY KEY,
+        id_consulta INTEGER NOT NULL REFERENCES consultas (id_consulta),
+        total DECIMAL(10, 2) NOT NULL,
+        fecha DATE,
+        metodo_pago VARCHAR(20),
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS franjas_agenda (
+        id_empleado INTEGER NOT NULL,
+        fecha DATE NOT NULL,
+        hora TIME NOT NULL,
+        id_cita INTEGER NOT NULL UNIQUE,
+        PRIMARY KEY (id_empleado, fecha, hora)
+    )
+    """,
+    "CREATE INDEX idx_citas_empleado_fecha ON citas (id_empleado, fecha)",
+    "CREATE INDEX idx_citas_mascota ON citas (id_mascota)",
+    "CREATE INDEX idx_citas_fecha ON citas (fecha)",
+    "CREATE INDEX idx_consultas_cita ON consultas (id_cita)",
+    "CREATE INDEX idx_facturas_consulta ON facturas (id_consulta)",
+)
+
+
+def ddl_tabla(tabla: str, nombre: str) -> str:
+    """
+    CREATE TABLE de `tabla` con otro `nombre` y sin claves foráneas, para copias
+    con la misma estructura (por ejemplo, las particiones del archivo histórico).
+    """
+    cabecera = f"CREATE TABLE IF NOT EXISTS {tabla} ("
+    sentencia = next(s for s in DDL if cabecera in s)
+    sentencia = sentencia.replace(cabecera, f"CREATE TABLE IF NOT EXISTS {nombre} (")
+    return re.sub(r"\s+REFERENCES \w+ \(\w+\)", "", sentencia)
+
+
+def sentencia_insert(tabla: str) -> str:
+    """INSERT parametrizado (%s) con todas las columnas de `tabla`."""
+    columnas = COLUMNAS[tabla]
+    return (
+        f"INSERT INTO {tabla} ({', '.join(columnas)}) "
+        f"VALUES ({', '.join(['%s'] * len(columnas))})"
+    )
+
+
+def crear_esquema(db) -> None:
+    """Crea las tablas de la clínica si no existen."""
+    for sentencia in DDL:
+        # Los índices ya creados hacen fallar la sentencia: execute_query devuelve False y seguimos
+        db.execute_query(sentencia)
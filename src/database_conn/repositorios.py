@@ -0,0 +1,354 @@
+"""
+Persistencia de Dueño, Mascota, Cita, Consulta y Factura con control de
+concurrencia optimista.
+
+Cada fila lleva una columna `version`. Al guardar se hace un UPDATE
+condicionado (compare-and-swap) a que la versión siga siendo la leída; si otra
+sesión se adelantó no se actualiza ninguna fila y se lanza
+`ConflictoConcurrenciaError`. Así no se mantienen bloqueos de fila mientras el
+usuario piensa en el formulario. Para reintentar la operación completa
+(releer, aplicar el cambio y guardar) se usa `reintentar_si_conflicto`:
+
+    def reprogramar():
+        cita = repo.obtener(id_cita)
+        cita.reprogramar("2025-05-02", "10:30")
+        repo.guardar(cita)
+
+    reintentar_si_conflicto(reprogramar)
+
+Las franjas de agenda ocupadas se registran en `franjas_agenda`, cuya clave
+primaria (id_empleado, fecha, hora) impide reservar dos veces la misma franja.
+
+Cada escritura confirmada se publica como `EventoCambio` en el bus de cambios
+(`src.eventos`), del que se alimentan las cachés de este y de otros procesos.
+"""
+import random
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, List, Optional, TypeVar
+
+from src.database_conn.esquema import COLUMNAS, sentencia_insert
+from src.entidades.administrativo.cita import Cita
+from src.entidades.administrativo.consulta import Consulta
+from src.entidades.administrativo.factura import Factura
+from src.entidades.mascotas.mascota import Mascota
+from src.entidades.personas.duenos.dueno import Dueño
+from src.eventos import cambios
+from src.eventos.bus import BusCambios, obtener_bus
+from src.excepciones.excepciones import ConflictoConcurrenciaError, FranjaOcupadaError
+from src.utils.fechas import a_texto_fecha, a_texto_hora, parsear_fecha, parsear_hora
+from src.utils.perfilado import perfilar
+
+T = TypeVar("T")
+
+
+def reintentar_si_conflicto(operacion: Callable[[], T], intentos: int = 5, espera: float = 0.005) -> T:
+    """
+    Ejecuta `operacion` y la repite si lanza ConflictoConcurrenciaError, con
+    espera exponencial aleatoria entre intentos. `operacion` debe releer la
+    entidad antes de modificarla; si se agotan los intentos se propaga el conflicto.
+
+    Como la modificación puede ejecutarse varias veces, no debe tener efectos
+    fuera de la entidad: quien necesite enterarse del cambio se suscribe al bus,
+    que solo lo publica una vez confirmada la escritura.
+    """
+    for intento in range(1, intentos + 1):
+        try:
+            return operacion()
+        except ConflictoConcurrenciaError:
+            if intento == intentos:
+                raise
+            time.sleep(random.uniform(0, espera * 2 ** (intento - 1)))
+
+
+class RepositorioVersionado(ABC):
+    """
+    Clase Abstracta RepositorioVersionado
+    Propósito: Leer y escribir una entidad en su tabla con control de versión.
+
+    Principio SOLID:
+    - OCP (Abierto/Cerrado): Cada repositorio concreto solo declara su tabla,
+      sus columnas modificables y cómo convertir filas en entidades.
+    """
+
+    TABLA: str = ""
+    CLAVE: str = ""
+    ENTIDAD: str = ""
+    COLUMNAS_MODIFICABLES: tuple = ()
+
+    def __init__(self, db, bus: Optional[BusCambios] = None):
+        self.db = db
+        self.bus = bus or obtener_bus()
+
+    # ------------------------------
+    # A implementar por cada repositorio
+    # ------------------------------
+
+    @abstractmethod
+    def _hidratar(self, fila: dict):
+        """Construye la entidad a partir de una fila de la tabla."""
+
+    @abstractmethod
+    def _valores(self, entidad) -> dict:
+        """Valores de todas las columnas de la tabla para `entidad`."""
+
+    def _despues_de_escribir(self, entidad) -> None:
+        """Se ejecuta dentro de la misma transacción tras insertar o actualizar."""
+
+    def _despues_de_eliminar(self, entidad) -> None:
+        """Se ejecuta dentro de la misma transacción tras eliminar."""
+
+    def _traducir_error(self, entidad, error: Exception) -> None:
+        """Permite convertir un error de integridad en una excepción de dominio."""
+
+    def _clave(self, entidad):
+        return getattr(entidad, self.CLAVE)
+
+    # ------------------------------
+    # Operaciones
+    # ------------------------------
+
+    @perfilar()
+    def obtener(self, clave: int):
+        """Devuelve la entidad con su versión actual, o None si no existe."""
+        fila = self.db.fetch_one(f"SELECT * FROM {self.TABLA} WHERE {self.CLAVE} = %s", (clave,))
+        return self._hidratar(fila) if fila else None
+
+    @perfilar()
+    def crear(self, entidad) -> None:
+        """Inserta la entidad con versión 0."""
+        valores = self._valores(entidad)
+        try:
+            with self.db.transaction():
+                self.db.execute_query(sentencia_insert(self.TABLA),
+                                      tuple(valores[c] for c in COLUMNAS[self.TABLA]))
+                self._despues_de_escribir(entidad)
+        except Exception as e:
+            self._traducir_error(entidad, e)
+            raise
+        entidad.version = 0
+        self.bus.emitir(self.ENTIDAD, cambios.INSERTAR, valores[self.CLAVE], valores, 0)
+
+    @perfilar()
+    def guardar(self, entidad) -> None:
+        """
+        Actualiza la entidad solo si nadie la ha modificado desde que se leyó.
+        Lanza ConflictoConcurrenciaError en caso contrario.
+        """
+        clave = self._clave(entidad)
+        valores = self._valores(entidad)
+        asignaciones = ", ".join(f"{c} = %s" for c in self.COLUMNAS_MODIFICABLES)
+        sentencia = (
+            f"UPDATE {self.TABLA} SET {asignaciones}, version = version + 1 "
+            f"WHERE {self.CLAVE} = %s AND version = %s"
+        )
+        parametros = tuple(valores[c] for c in self.COLUMNAS_MODIFICABLES) + (clave, entidad.version)
+        try:
+            with self.db.transaction():
+                if self.db.execute_update(sentencia, parametros) == 0:
+                    raise ConflictoConcurrenciaError(self.ENTIDAD, clave, entidad.version)
+                self._despues_de_escribir(entidad)
+        except ConflictoConcurrenciaError:
+            raise
+        except Exception as e:
+            self._traducir_error(entidad, e)
+            raise
+        entidad.version += 1
+        self.bus.emitir(self.ENTIDAD, cambios.ACTUALIZAR, clave, valores, entidad.version)
+
+    @perfilar()
+    def eliminar(self, entidad) -> None:
+        """Elimina la entidad si su versión no ha cambiado desde que se leyó."""
+        clave = self._clave(entidad)
+        with self.db.transaction():
+            filas = self.db.execute_update(
+                f"DELETE FROM {self.TABLA} WHERE {self.CLAVE} = %s AND version = %s",
+                (clave, entidad.version),
+            )
+            if filas == 0:
+                raise ConflictoConcurrenciaError(self.ENTIDAD, clave, entidad.version)
+            self._despues_de_eliminar(entidad)
+        self.bus.emitir(self.ENTIDAD, cambios.ELIMINAR, clave)
+
+
+class RepositorioDueños(RepositorioVersionado):
+    TABLA = "duenos"
+    CLAVE = "id_dueno"
+    ENTIDAD = cambios.DUENO
+    COLUMNAS_MODIFICABLES = ("nombre", "telefono", "email", "direccion")
+
+    def _clave(self, dueño: Dueño) -> int:
+        return dueño.id_dueño
+
+    def _hidratar(self, fila: dict) -> Dueño:
+        dueño = Dueño(fila["id_dueno"], fila["nombre"], fila["dni"], fila["telefono"], fila["email"],
+                      a_texto_fecha(fila["fecha_nacimiento"]), fila["direccion"])
+        dueño.version = fila["version"]
+        return dueño
+
+    def _valores(self, dueño: Dueño) -> dict:
+        return {
+            "id_dueno": dueño.id_dueño,
+            "nombre": dueño.nombre,
+            "dni": dueño.dni,
+            "telefono": dueño.telefono,
+            "email": dueño.email,
+            "fecha_nacimiento": dueño.fecha_nacimiento.isoformat(),
+            "direccion": dueño.direccion,
+        }
+
+
+class RepositorioMascotas(RepositorioVersionado):
+    TABLA = "mascotas"
+    CLAVE = "id_mascota"
+    ENTIDAD = cambios.MASCOTA
+    COLUMNAS_MODIFICABLES = ("nombre", "especie", "raza", "peso", "sexo", "id_dueno")
+
+    def __init__(self, db, bus: Optional[BusCambios] = None):
+        super().__init__(db, bus)
+        self.dueños = RepositorioDueños(db, self.bus)
+
+    def _hidratar(self, fila: dict) -> Mascota:
+        mascota = Mascota(fila["id_mascota"], fila["nombre"], fila["especie"], fila["raza"],
+                          a_texto_fecha(fila["fecha_nacimiento"]), float(fila["peso"]), fila["sexo"],
+                          self.dueños.obtener(fila["id_dueno"]))
+        mascota.version = fila["version"]
+        return mascota
+
+    def _valores(self, mascota: Mascota) -> dict:
+        return {
+            "id_mascota": mascota.id_mascota,
+            "nombre": mascota.nombre,
+            "especie": mascota.especie,
+            "raza": mascota.raza,
+            "fecha_nacimiento": mascota.fecha_nacimiento.isoformat(),
+            "peso": mascota.peso,
+            "sexo": mascota.sexo,
+            "id_dueno": mascota.dueño.id_dueño,
+        }
+
+    @perfilar()
+    def cargar_historial(self, mascota: Mascota) -> Mascota:
+        """Rellena el historial de consultas de la mascota, incluidas las ya archivadas."""
+        from src.database_conn.archivado import VistaHistorica
+
+        for id_consulta in VistaHistorica(self.db).consultas_de_mascota(mascota.id_mascota):
+            mascota.registrar_consulta(id_consulta)
+        return mascota
+
+
+class RepositorioCitas(RepositorioVersionado):
+    """Persistencia de Cita; mantiene la franja de agenda ocupada por cada cita no cancelada."""
+
+    TABLA = "citas"
+    CLAVE = "id_cita"
+    ENTIDAD = cambios.CITA
+    COLUMNAS_MODIFICABLES = ("fecha", "hora", "motivo", "estado", "hora_fin")
+
+    def _hidratar(self, fila: dict) -> Cita:
+        cita = Cita(fila["id_cita"], a_texto_fecha(fila["fecha"]), a_texto_hora(fila["hora"]),
+                    fila["motivo"], fila["id_mascota"], fila["id_empleado"], fila["estado"])
+        if fila["hora_fin"] is not None:
+            cita._hora_fin = parsear_hora(a_texto_hora(fila["hora_fin"]))
+        cita.version = fila["version"]
+        return cita
+
+    def _valores(self, cita: Cita) -> dict:
+        return {
+            "id_cita": cita.id_cita,
+            "fecha": cita.fecha.isoformat(),
+            "hora": cita.hora.strftime("%H:%M"),
+            "motivo": cita.motivo,
+            "id_mascota": cita.id_mascota,
+            "id_empleado": cita.id_empleado,
+            "estado": cita.estado,
+            "hora_fin": cita._hora_fin.strftime("%H:%M") if cita._hora_fin else None,
+        }
+
+    def _despues_de_escribir(self, cita: Cita) -> None:
+        # La franja se recoloca siempre: cubre reprogramaciones y cancelaciones
+        self.db.execute_query("DELETE FROM franjas_agenda WHERE id_cita = %s", (cita.id_cita,))
+        if cita.estado != "cancelada":
+            self.db.execute_query(
+                sentencia_insert("franjas_agenda"),
+                (cita.id_empleado, cita.fecha.isoformat(), cita.hora.strftime("%H:%M"), cita.id_cita),
+            )
+
+    def _despues_de_eliminar(self, cita: Cita) -> None:
+        self.db.execute_query("DELETE FROM franjas_agenda WHERE id_cita = %s", (cita.id_cita,))
+
+    def _traducir_error(self, cita: Cita, error: Exception) -> None:
+        if cita.estado == "cancelada":
+            return
+        ocupante = self.db.fetch_one(
+            "SELECT id_cita FROM franjas_agenda WHERE id_empleado = %s AND fecha = %s AND hora = %s",
+            (cita.id_empleado, cita.fecha.isoformat(), cita.hora.strftime("%H:%M")),
+        )
+        if ocupante and ocupante["id_cita"] != cita.id_cita:
+            raise FranjaOcupadaError(cita.id_empleado, cita.fecha, cita.hora.strftime("%H:%M")) from error
+
+    @perfilar()
+    def pendientes_de(self, id_empleado: int, limite: int = 10) -> List[Cita]:
+        """Citas pendientes de un empleado, por fecha y hora."""
+        filas = self.db.fetch_all(
+            "SELECT * FROM citas WHERE id_empleado = %s AND estado = 'pendiente' "
+            "ORDER BY fecha, hora LIMIT %s",
+            (id_empleado, limite),
+        )
+        return [self._hidratar(f) for f in filas]
+
+
+class RepositorioConsultas(RepositorioVersionado):
+    TABLA = "consultas"
+    CLAVE = "id_consulta"
+    ENTIDAD = cambios.CONSULTA
+    COLUMNAS_MODIFICABLES = ("diagnostico", "tratamiento", "observaciones", "id_factura")
+
+    def _hidratar(self, fila: dict) -> Consulta:
+        consulta = Consulta(fila["id_consulta"], fila["id_cita"], fila["diagnostico"],
+                            fila["tratamiento"], fila["observaciones"])
+        consulta.id_factura = fila["id_factura"]
+        registro = fila["fecha_registro"]
+        if registro is not None:
+            consulta.fecha_registro = registro if isinstance(registro, datetime) \
+                else datetime.fromisoformat(str(registro))
+        consulta.version = fila["version"]
+        return consulta
+
+    def _valores(self, consulta: Consulta) -> dict:
+        return {
+            "id_consulta": consulta.id_consulta,
+            "id_cita": consulta.id_cita,
+            "diagnostico": consulta.diagnostico,
+            "tratamiento": consulta.tratamiento,
+            "observaciones": consulta.observaciones,
+            "id_factura": consulta.id_factura,
+            "fecha_registro": consulta.fecha_registro.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+
+class RepositorioFacturas(RepositorioVersionado):
+    TABLA = "facturas"
+    CLAVE = "id_factura"
+    ENTIDAD = cambios.FACTURA
+    COLUMNAS_MODIFICABLES = ("total", "fecha", "metodo_pago")
+
+    def _hidratar(self, fila: dict) -> Factura:
+        factura = Factura(fila["id_factura"], fila["id_consulta"])
+        # Se asignan los atributos directamente: hidratar no es registrar un pago nuevo
+        factura.total = float(fila["total"])
+        factura.metodo_pago = fila["metodo_pago"]
+        if fila["fecha"] is not None:
+            factura.fecha = datetime.combine(parsear_fecha(a_texto_fecha(fila["fecha"])), datetime.min.time())
+        factura.version = fila["version"]
+        return factura
+
+    def _valores(self, factura: Factura) -> dict:
+        return {
+            "id_factura": factura.id_factura,
+            "id_consulta": factura.id_consulta,
+            "total": round(factura.total, 2),
+            "fecha": factura.fecha.strftime("%Y-%m-%d") if factura.fecha else None,
+            "metodo_pago": factura.metodo_pago,
+        }
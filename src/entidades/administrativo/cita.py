@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from src.utils.fechas import parsear_fecha, parsear_hora
 
 
 class Cita:
@@ -15,8 +16,8 @@ class Cita:
     def __init__(self, id_cita: int, fecha: str, hora: str, motivo: str,
                  id_mascota: int, id_empleado: int, estado: str = "pendiente"):
         self.id_cita = id_cita
-        self.fecha = datetime.strptime(fecha, "%Y-%m-%d").date()
-        self.hora = datetime.strptime(hora, "%H:%M").time()
+        self.fecha = parsear_fecha(fecha)
+        self.hora = parsear_hora(hora)
         self.motivo = motivo
         self.id_mascota = id_mascota
         self.id_empleado = id_empleado
@@ -26,6 +27,7 @@ class Cita:
         self.estado = estado
 
         self._hora_fin = None  # Se calculará si se usa obtener_duracion()
+        self.version = 0  # Versión persistida, para el control de concurrencia optimista
 
     # ------------------------------
     # Métodos de gestión
@@ -35,8 +37,8 @@ class Cita:
         """Cambia la fecha y hora de la cita (solo si está pendiente)."""
         if self.estado != "pendiente":
             raise ValueError("Solo se pueden reprogramar citas pendientes.")
-        self.fecha = datetime.strptime(nueva_fecha, "%Y-%m-%d").date()
-        self.hora = datetime.strptime(nueva_hora, "%H:%M").time()
+        fecha, hora = parsear_fecha(nueva_fecha), parsear_hora(nueva_hora)
+        self.fecha, self.hora = fecha, hora
 
     def cancelar(self):
         """Marca la cita como cancelada."""
@@ -48,8 +50,9 @@ class Cita:
         """Marca la cita como completada y registra la hora de finalización."""
         if self.estado == "cancelada":
             raise ValueError("No se puede completar una cita cancelada.")
+        nueva_hora_fin = parsear_hora(hora_fin)
         self.estado = "completada"
-        self._hora_fin = datetime.strptime(hora_fin, "%H:%M").time()
+        self._hora_fin = nueva_hora_fin
 
     def obtener_duracion(self) -> timedelta:
         """Devuelve la duración estimada de la cita si tiene hora de fin registrada."""
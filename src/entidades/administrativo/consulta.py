@@ -26,6 +26,7 @@ class Consulta:
         self.observaciones = observaciones or ""
         self.id_factura: Optional[int] = None
         self.fecha_registro = datetime.now()
+        self.version = 0  # Versión persistida, para el control de concurrencia optimista
 
     # ------------------------------
     # Métodos principales
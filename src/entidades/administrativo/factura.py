@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, time
+from src.utils.fechas import parsear_fecha
 from typing import List, Optional
 
 
@@ -20,6 +21,7 @@ class Factura:
         self.fecha: Optional[datetime] = None
         self.metodo_pago: Optional[str] = None
         self._detalle_servicios: List[dict] = []
+        self.version = 0  # Versión persistida, para el control de concurrencia optimista
 
     # ------------------------------
     # Métodos de gestión de la factura
@@ -44,8 +46,9 @@ class Factura:
         """Registra el método de pago y la fecha de la factura."""
         if metodo.lower() not in Factura.METODOS_PAGO_VALIDOS:
             raise ValueError(f"Método de pago inválido. Debe ser uno de {Factura.METODOS_PAGO_VALIDOS}.")
+        nueva_fecha = datetime.combine(parsear_fecha(fecha), time()) if fecha else datetime.now()
         self.metodo_pago = metodo.lower()
-        self.fecha = datetime.strptime(fecha, "%Y-%m-%d") if fecha else datetime.now()
+        self.fecha = nueva_fecha
 
     def generar_pdf(self, ruta: Optional[str] = None):
         """
@@ -1,6 +1,7 @@
-from datetime import datetime, date
+from datetime import date
 from typing import List, Optional
 from src.entidades.personas.duenos.dueno import Dueño
+from src.utils.fechas import parsear_fecha
 
 
 class Mascota:
@@ -19,11 +20,12 @@ class Mascota:
         self.especie = especie
         self.raza = raza
         # Se espera formato YYYY-MM-DD
-        self.fecha_nacimiento = datetime.strptime(fecha_nacimiento, "%Y-%m-%d").date()
+        self.fecha_nacimiento = parsear_fecha(fecha_nacimiento)
         self.peso = peso
         self.sexo = sexo
         self.dueño = dueño
         self.historial_consultas: List[int] = []  # lista de IDs de consultas
+        self.version = 0  # Versión persistida, para el control de concurrencia optimista
 
     # ------------------------------
     # Métodos principales
@@ -18,6 +18,7 @@ class Dueño(Persona):
         self.id_dueño = id_dueño
         self.direccion = direccion
         self.mascotas: List[dict] = [] 
+        self.version = 0  # Versión persistida, para el control de concurrencia optimista
 
     # ------------------------------
     # Métodos propios del dueño
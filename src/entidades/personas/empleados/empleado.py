@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from datetime import datetime, date
 from typing import List, Optional, Tuple
 from src.entidades.personas.persona import Persona
+from src.utils.fechas import parsear_hora
 
 
 class Empleado(Persona, ABC):
@@ -51,8 +52,8 @@ class Empleado(Persona, ABC):
         Formato de hora: "HH:MM".
         """
         try:
-            hora_entrada = datetime.strptime(entrada, "%H:%M").time()
-            hora_salida = datetime.strptime(salida, "%H:%M").time()
+            hora_entrada = parsear_hora(entrada)
+            hora_salida = parsear_hora(salida)
             self.registro_horario.append((hora_entrada, hora_salida))
         except ValueError:
             raise ValueError("Formato de hora incorrecto. Use 'HH:MM'.")
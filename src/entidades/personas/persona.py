@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from datetime import date, datetime
+from datetime import date
+from src.utils.fechas import parsear_fecha
 
 
 class Persona(ABC):
@@ -18,7 +19,7 @@ class Persona(ABC):
         self.dni = dni
         self.telefono = telefono
         self.email = email
-        self.fecha_nacimiento = datetime.strptime(fecha_nacimiento, "%Y-%m-%d").date()
+        self.fecha_nacimiento = parsear_fecha(fecha_nacimiento)
 
     @abstractmethod
     def mostrar_info(self) -> str:
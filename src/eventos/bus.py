@@ -0,0 +1,171 @@
+"""
+Bus de publicación/suscripción de cambios de datos dentro del proceso.
+
+    bus = obtener_bus()
+    bus.suscribir(lambda eventos: ..., entidades=[CITA])
+
+    with bus.agrupar():          # una carga masiva llega como una sola ráfaga
+        for cita in citas:
+            repo.crear(cita)
+
+Los cambios de una misma fila dentro de una ráfaga se funden en su cambio neto
+(`combinar`), de modo que los consumidores reciben como mucho un evento por
+fila y por entrega. Con `ventana` > 0 las ráfagas se cierran solas tras esa
+cantidad de segundos; con 0 (por defecto) cada evento se entrega al momento
+salvo los que publique un hilo dentro de `agrupar()`.
+"""
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.eventos.cambios import EventoCambio, combinar
+
+# Firma de los consumidores: reciben la ráfaga ya fundida, en orden de publicación
+Consumidor = Callable[[List[EventoCambio]], None]
+
+logger = logging.getLogger(__name__)
+
+
+class BusCambios:
+    """
+    Clase BusCambios
+    Propósito: Repartir los eventos de cambio entre los consumidores interesados,
+    agrupando las ráfagas de cambios de una misma fila.
+
+    Principio SOLID:
+    - DIP (Inversión de Dependencias): Los repositorios publican sin saber quién
+      escucha; cachés, reportes y transportes entre procesos se suscriben desde fuera.
+    """
+
+    def __init__(self, ventana: float = 0.0, origen: Optional[str] = None):
+        self.ventana = ventana
+        self.origen = origen or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.RLock()
+        # Serializa las entregas para que las ráfagas lleguen en orden de publicación
+        self._entrega = threading.RLock()
+        self._consumidores: List[Tuple[Consumidor, Optional[frozenset]]] = []
+        self._pendientes: "OrderedDict[tuple, EventoCambio]" = OrderedDict()
+        self._hilo = threading.local()
+        self._temporizador: Optional[threading.Timer] = None
+        self.publicados = 0
+        self.entregados = 0
+
+    # ------------------------------
+    # Suscripción
+    # ------------------------------
+
+    def suscribir(self, consumidor: Consumidor, entidades: Optional[Iterable[str]] = None) -> Consumidor:
+        """Registra un consumidor para todas las entidades o solo para las indicadas."""
+        filtro = frozenset(entidades) if entidades is not None else None
+        with self._lock:
+            self._consumidores.append((consumidor, filtro))
+        return consumidor
+
+    def desuscribir(self, consumidor: Consumidor) -> None:
+        with self._lock:
+            self._consumidores = [(c, f) for c, f in self._consumidores if c != consumidor]
+
+    # ------------------------------
+    # Publicación
+    # ------------------------------
+
+    def emitir(self, entidad: str, operacion: str, clave, datos: Optional[Dict] = None,
+               version: Optional[int] = None) -> None:
+        """Publica un cambio originado en este proceso."""
+        self.publicar(EventoCambio(entidad, operacion, clave, dict(datos or {}), version, self.origen))
+
+    def publicar(self, evento: EventoCambio) -> None:
+        """Añade el evento a la ráfaga en curso y la entrega si no hay que esperar."""
+        retenidos = getattr(self._hilo, "pendientes", None)
+        with self._lock:
+            self.publicados += 1
+            if retenidos is not None:
+                # Dentro de agrupar(): solo se retienen los cambios de este hilo
+                _fundir(retenidos, evento)
+                return
+            _fundir(self._pendientes, evento)
+            if self.ventana > 0:
+                if self._temporizador is None:
+                    self._temporizador = threading.Timer(self.ventana, self.vaciar)
+                    self._temporizador.daemon = True
+                    self._temporizador.start()
+                return
+        self.vaciar()
+
+    @contextmanager
+    def agrupar(self):
+        """
+        Retiene los cambios que publique este hilo hasta el final del bloque y los
+        entrega en una sola ráfaga. Las demás sesiones siguen recibiendo los suyos al momento.
+        """
+        if getattr(self._hilo, "pendientes", None) is not None:
+            yield self  # Bloque anidado: lo entrega el más externo
+            return
+        self._hilo.pendientes = OrderedDict()
+        try:
+            yield self
+        finally:
+            retenidos, self._hilo.pendientes = self._hilo.pendientes, None
+            with self._lock:
+                for evento in retenidos.values():
+                    _fundir(self._pendientes, evento)
+            self.vaciar()
+
+    def vaciar(self) -> int:
+        """Entrega la ráfaga pendiente a los consumidores. Devuelve el número de eventos."""
+        with self._entrega:
+            return self._entregar()
+
+    def _entregar(self) -> int:
+        with self._lock:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            if not self._pendientes:
+                return 0
+            eventos = list(self._pendientes.values())
+            self._pendientes.clear()
+            consumidores = list(self._consumidores)
+        # Se entrega fuera del lock: un consumidor puede publicar a su vez
+        for consumidor, filtro in consumidores:
+            propios = eventos if filtro is None else [e for e in eventos if e.entidad in filtro]
+            if not propios:
+                continue
+            try:
+                consumidor(propios)
+            except Exception:
+                # Un consumidor defectuoso no debe impedir que los demás se actualicen
+                logger.exception("Error en un consumidor de cambios")
+        with self._lock:
+            self.entregados += len(eventos)
+        return len(eventos)
+
+
+def _fundir(pendientes: "OrderedDict[tuple, EventoCambio]", evento: EventoCambio) -> None:
+    """Añade `evento` a `pendientes` fundiéndolo con el cambio anterior de la misma fila."""
+    clave = evento.id_entidad
+    anterior = pendientes.pop(clave, None)
+    neto = combinar(anterior, evento) if anterior else evento
+    if neto is not None:
+        pendientes[clave] = neto
+
+
+# ------------------------------
+# Bus del proceso
+# ------------------------------
+
+_bus: Optional[BusCambios] = None
+_bus_lock = threading.Lock()
+
+
+def obtener_bus() -> BusCambios:
+    """Devuelve el bus de cambios compartido por todas las sesiones del proceso."""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = BusCambios()
+        return _bus
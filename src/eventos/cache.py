@@ -0,0 +1,140 @@
+"""
+Caché de lecturas invalidada por los eventos de cambio.
+
+Las entradas por fila (`obtener`) solo se descartan cuando cambia esa fila; las
+consultas derivadas (`consulta`: listados, búsquedas...) cuando cambia alguna
+fila de las entidades de las que dependen. El resto de la caché sobrevive.
+
+Cada lector recibe su propia copia: las sesiones modifican las entidades (y su
+`version`) antes de guardarlas, y no deben verse entre sí ni dejar en la caché
+cambios que luego no se confirmaron.
+
+    cache = CacheEntidades()
+    cache.conectar()
+    cita = cache.obtener(CITA, 7, lambda: repo.obtener(7))
+    hoy = cache.consulta("citas_hoy", [CITA], lambda: repo.del_dia(hoy))
+"""
+import copy
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from src.eventos.bus import BusCambios, obtener_bus
+from src.eventos.cambios import EventoCambio
+
+T = TypeVar("T")
+
+_AUSENTE = object()
+
+
+class CacheEntidades:
+    """
+    Clase CacheEntidades
+    Propósito: Guardar entidades y resultados de consultas leídos de la base de
+    datos y descartar solo los afectados por cada cambio publicado en el bus.
+
+    Principio SOLID:
+    - SRP (Responsabilidad Única): Solo cachea; quién cambia los datos lo
+      anuncia el bus, que también trae los cambios de otros procesos.
+    """
+
+    def __init__(self, bus: Optional[BusCambios] = None, capacidad: int = 10_000):
+        self.bus = bus or obtener_bus()
+        self.capacidad = capacidad
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[tuple, Any]" = OrderedDict()
+        # Lecturas en curso y las invalidadas mientras tanto: su resultado ya no se guarda
+        self._en_curso: Dict[tuple, Tuple[int, Tuple[str, ...]]] = {}
+        self._sucias: Set[tuple] = set()
+        self._dependientes: Dict[str, Set[tuple]] = defaultdict(set)
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def conectar(self) -> None:
+        self.bus.suscribir(self.aplicar)
+
+    def desconectar(self) -> None:
+        self.bus.desuscribir(self.aplicar)
+
+    # ------------------------------
+    # Lectura
+    # ------------------------------
+
+    def obtener(self, entidad: str, clave, cargar: Callable[[], T]) -> T:
+        """Devuelve la entidad cacheada o la carga con `cargar` y la guarda."""
+        return self._leer(("fila", entidad, clave), (entidad,), cargar)
+
+    def consulta(self, nombre: str, entidades: Iterable[str], cargar: Callable[[], T]) -> T:
+        """Devuelve el resultado cacheado de una consulta que depende de `entidades`."""
+        return self._leer(("consulta", nombre), tuple(entidades), cargar)
+
+    def _leer(self, clave: tuple, entidades: Tuple[str, ...], cargar: Callable[[], T]) -> T:
+        with self._lock:
+            guardado = self._entradas.get(clave, _AUSENTE)
+            if guardado is not _AUSENTE:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+                lecturas, _ = self._en_curso.get(clave, (0, entidades))
+                self._en_curso[clave] = (lecturas + 1, entidades)
+        if guardado is not _AUSENTE:
+            # Lo guardado nunca se modifica, así que se puede copiar fuera del lock
+            return copy.deepcopy(guardado)
+        try:
+            valor = cargar()
+        except BaseException:
+            with self._lock:
+                self._terminar_lectura(clave)
+            raise
+        copia = copy.deepcopy(valor)
+        with self._lock:
+            if clave not in self._sucias:
+                self._guardar(clave, entidades, copia)
+            self._terminar_lectura(clave)
+        return valor
+
+    def _terminar_lectura(self, clave: tuple) -> None:
+        lecturas, entidades = self._en_curso.pop(clave)
+        if lecturas > 1:
+            self._en_curso[clave] = (lecturas - 1, entidades)
+        else:
+            self._sucias.discard(clave)
+
+    def _guardar(self, clave: tuple, entidades: Tuple[str, ...], valor) -> None:
+        self._entradas[clave] = valor
+        if clave[0] == "consulta":
+            for entidad in entidades:
+                self._dependientes[entidad].add(clave)
+        while len(self._entradas) > self.capacidad:
+            self._entradas.popitem(last=False)
+
+    # ------------------------------
+    # Invalidación
+    # ------------------------------
+
+    def aplicar(self, eventos: List[EventoCambio]) -> None:
+        """Consumidor del bus: descarta las entradas afectadas por `eventos`."""
+        with self._lock:
+            afectadas = {("fila", e.entidad, e.clave) for e in eventos}
+            entidades = {e.entidad for e in eventos}
+            for entidad in entidades:
+                afectadas |= self._dependientes.pop(entidad, set())
+            afectadas |= {clave for clave, (_, dependencias) in self._en_curso.items()
+                          if clave[0] == "consulta" and entidades.intersection(dependencias)}
+            for clave in afectadas:
+                if clave in self._en_curso:
+                    self._sucias.add(clave)
+                if clave in self._entradas:
+                    del self._entradas[clave]
+                    self.invalidaciones += 1
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._dependientes.clear()
+            self._sucias.update(self._en_curso)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
@@ -0,0 +1,85 @@
+"""
+Eventos de cambio de datos (insert/update/delete) de las entidades persistidas.
+
+Los repositorios publican un `EventoCambio` por cada fila escrita; cachés,
+reportes y otros procesos los consumen para actualizarse de forma incremental
+en lugar de vaciarlo todo.
+"""
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Optional
+
+INSERTAR = "insert"
+ACTUALIZAR = "update"
+ELIMINAR = "delete"
+OPERACIONES = (INSERTAR, ACTUALIZAR, ELIMINAR)
+
+# Nombres de entidad usados en los eventos
+CITA = "Cita"
+CONSULTA = "Consulta"
+FACTURA = "Factura"
+MASCOTA = "Mascota"
+DUENO = "Dueño"
+
+# Marca en `datos` de una eliminación que solo mueve la fila al archivo histórico
+ARCHIVADO = "archivado"
+
+
+@dataclass(frozen=True)
+class EventoCambio:
+    """
+    Cambio de una fila de una entidad.
+
+    `datos` contiene los valores de las columnas tras el cambio (vacío en las
+    eliminaciones) y `version` la versión resultante. `origen` identifica al
+    proceso que lo publicó, para que un transporte no reenvíe sus propios eventos.
+    """
+
+    entidad: str
+    operacion: str
+    clave: Any
+    datos: Dict[str, Any] = field(default_factory=dict)
+    version: Optional[int] = None
+    origen: str = ""
+    marca: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        if self.operacion not in OPERACIONES:
+            raise ValueError(f"Operación de cambio no válida: {self.operacion}")
+
+    @property
+    def id_entidad(self) -> tuple:
+        return self.entidad, self.clave
+
+    def a_dict(self) -> dict:
+        return {
+            "entidad": self.entidad, "operacion": self.operacion, "clave": self.clave,
+            "datos": self.datos, "version": self.version, "origen": self.origen, "marca": self.marca,
+        }
+
+    @classmethod
+    def desde_dict(cls, valores: dict) -> "EventoCambio":
+        return cls(**valores)
+
+
+def combinar(anterior: EventoCambio, nuevo: EventoCambio) -> Optional[EventoCambio]:
+    """
+    Funde dos cambios consecutivos de la misma fila en el cambio neto equivalente.
+    Devuelve None si se anulan (una fila insertada y eliminada en la misma ráfaga).
+
+    Archivar no es eliminar: la fila sigue contando en el histórico, así que se
+    conservan sus últimos datos junto con la marca `ARCHIVADO`.
+    """
+    if nuevo.operacion == ELIMINAR and nuevo.datos.get(ARCHIVADO) and anterior.operacion != ELIMINAR:
+        if anterior.operacion == INSERTAR:
+            return replace(anterior, datos={**anterior.datos, ARCHIVADO: True})
+        return replace(nuevo, datos={**anterior.datos, ARCHIVADO: True})
+    if anterior.operacion == INSERTAR:
+        if nuevo.operacion == ELIMINAR:
+            return None
+        # insertar + actualizar = insertar con los datos finales
+        return replace(nuevo, operacion=INSERTAR)
+    if anterior.operacion == ELIMINAR and nuevo.operacion == INSERTAR:
+        # La fila sigue existiendo para los consumidores, con otros datos
+        return replace(nuevo, operacion=ACTUALIZAR)
+    return nuevo
@@ -0,0 +1,224 @@
+"""
+Transporte de cambios entre procesos de la misma máquina.
+
+Cada proceso (servidor de Streamlit, workers, tareas programadas) tiene su
+propio `BusCambios`. `ReplicadorCambios` anexa los cambios locales a un registro
+compartido en un fichero SQLite (modo WAL: escritores y lectores no se
+bloquean) y publica en el bus local los que anexan los demás procesos:
+
+    registro = RegistroCambiosSQLite("cambios.db")
+    replicador = ReplicadorCambios(obtener_bus(), registro)
+    replicador.iniciar()
+
+Los procesos de la aplicación lo arrancan con `iniciar_replicacion()`, que toma
+la ruta del registro de `CLINICA_CAMBIOS_PATH` (por defecto `cambios.db`; vacía
+desactiva la replicación).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from src.database_conn.db_conn import DatabaseConnection
+from src.eventos.bus import BusCambios, obtener_bus
+from src.eventos.cambios import EventoCambio
+
+logger = logging.getLogger(__name__)
+
+
+class RegistroCambiosSQLite:
+    """
+    Clase RegistroCambiosSQLite
+    Propósito: Registro de eventos de cambio, solo de anexado, compartido por
+    varios procesos a través de un fichero SQLite.
+
+    Principio SOLID:
+    - SRP (Responsabilidad Única): Solo guarda y lee eventos; repartirlos es
+      cosa del bus y del replicador.
+    """
+
+    DDL = """
+        CREATE TABLE IF NOT EXISTS registro_cambios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origen VARCHAR(40) NOT NULL,
+            evento TEXT NOT NULL,
+            marca REAL NOT NULL
+        )
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.db = DatabaseConnection.sqlite(ruta)
+        # La conexión se comparte entre el hilo de sondeo y los que publican
+        self._lock = threading.Lock()
+
+    def conectar(self) -> bool:
+        if not self.db.connect():
+            return False
+        with self._lock:
+            self.db.execute_query(self.DDL)
+        return True
+
+    def cerrar(self) -> None:
+        with self._lock:
+            self.db.disconnect()
+
+    def anexar(self, eventos: List[EventoCambio]) -> bool:
+        filas = [(e.origen, json.dumps(e.a_dict(), default=str), e.marca) for e in eventos]
+        with self._lock:
+            return self.db.execute_many(
+                "INSERT INTO registro_cambios (origen, evento, marca) VALUES (%s, %s, %s)", filas
+            )
+
+    def leer_desde(self, ultimo_id: int, limite: int = 1000) -> List[Tuple[int, EventoCambio]]:
+        """Eventos con id mayor que `ultimo_id`, en orden de anexado."""
+        with self._lock:
+            filas = self.db.fetch_all(
+                "SELECT id, evento FROM registro_cambios WHERE id > %s ORDER BY id LIMIT %s",
+                (ultimo_id, limite),
+            )
+        return [(f["id"], EventoCambio.desde_dict(json.loads(f["evento"]))) for f in filas]
+
+    def ultimo_id(self) -> int:
+        with self._lock:
+            fila = self.db.fetch_one("SELECT COALESCE(MAX(id), 0) AS ultimo FROM registro_cambios")
+        return fila["ultimo"]
+
+    def podar(self, antiguedad: float = 3600.0) -> int:
+        """Elimina los eventos con más de `antiguedad` segundos. Devuelve cuántos."""
+        with self._lock:
+            return self.db.execute_update(
+                "DELETE FROM registro_cambios WHERE marca < %s", (time.time() - antiguedad,)
+            )
+
+
+class ReplicadorCambios:
+    """
+    Clase ReplicadorCambios
+    Propósito: Mantener sincronizados el bus de este proceso y el registro
+    compartido, en ambos sentidos.
+
+    En segundo plano también poda cada `intervalo_poda` segundos los eventos con
+    más de `retencion` segundos, que ningún proceso activo debería tener pendientes.
+    """
+
+    def __init__(self, bus: BusCambios, registro: RegistroCambiosSQLite,
+                 intervalo: float = 0.2, lote: int = 1000,
+                 retencion: float = 3600.0, intervalo_poda: float = 300.0):
+        self.bus = bus
+        self.registro = registro
+        self.intervalo = intervalo
+        self.lote = lote
+        self.retencion = retencion
+        self.intervalo_poda = intervalo_poda
+        self._ultimo_id = 0
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self, en_segundo_plano: bool = True) -> None:
+        """
+        Empieza a replicar. Solo se reciben los cambios anexados a partir de
+        ahora: el estado anterior lo cargan los consumidores de la base de datos.
+        """
+        self._ultimo_id = self.registro.ultimo_id()
+        self.bus.suscribir(self._enviar)
+        if en_segundo_plano:
+            self.recibir()
+
+    def recibir(self) -> None:
+        """Arranca el hilo que sondea el registro, si no estaba ya en marcha."""
+        if self._hilo is not None:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="replicador-cambios", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self.bus.desuscribir(self._enviar)
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _enviar(self, eventos: List[EventoCambio]) -> None:
+        # Los cambios recibidos de otros procesos no se vuelven a anexar
+        locales = [e for e in eventos if e.origen == self.bus.origen]
+        if locales:
+            self.registro.anexar(locales)
+
+    def sondear(self) -> int:
+        """Publica en el bus local los cambios nuevos de otros procesos. Devuelve cuántos."""
+        recibidos = 0
+        while True:
+            filas = self.registro.leer_desde(self._ultimo_id, self.lote)
+            if not filas:
+                return recibidos
+            self._ultimo_id = filas[-1][0]
+            with self.bus.agrupar():
+                for _, evento in filas:
+                    if evento.origen != self.bus.origen:
+                        self.bus.publicar(evento)
+                        recibidos += 1
+
+    def _bucle(self) -> None:
+        ultima_poda = time.monotonic()
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.sondear()
+                if time.monotonic() - ultima_poda >= self.intervalo_poda:
+                    ultima_poda = time.monotonic()
+                    self.registro.podar(self.retencion)
+            except Exception:
+                # Registro bloqueado o borrado: se reintenta en el siguiente ciclo
+                logger.exception("Error al replicar los cambios con el registro compartido")
+
+
+# ------------------------------
+# Replicación del proceso
+# ------------------------------
+RUTA_POR_DEFECTO = "cambios.db"
+
+_replicador: Optional[ReplicadorCambios] = None
+_replicador_lock = threading.Lock()
+
+
+def ruta_registro_cambios() -> Optional[str]:
+    """Ruta del registro compartido según `CLINICA_CAMBIOS_PATH`, o None si está desactivado."""
+    return os.getenv("CLINICA_CAMBIOS_PATH", RUTA_POR_DEFECTO) or None
+
+
+def iniciar_replicacion(ruta: Optional[str] = None, en_segundo_plano: bool = True) -> Optional[ReplicadorCambios]:
+    """
+    Conecta el bus del proceso con el registro compartido; solo la primera llamada
+    lo abre. Los procesos que solo escriben (importación, archivado, carga) pasan
+    `en_segundo_plano=False`: anexan sus cambios sin sondear los de los demás.
+    Devuelve None si la replicación está desactivada o el registro no se puede abrir.
+    """
+    global _replicador
+    with _replicador_lock:
+        if _replicador is None:
+            ruta = ruta or ruta_registro_cambios()
+            if ruta is None:
+                return None
+            registro = RegistroCambiosSQLite(ruta)
+            if not registro.conectar():
+                logger.error("No se pudo abrir el registro de cambios %s; los demás procesos no verán "
+                             "los cambios de este", ruta)
+                return None
+            _replicador = ReplicadorCambios(obtener_bus(), registro)
+            _replicador.iniciar(en_segundo_plano)
+        elif en_segundo_plano:
+            _replicador.recibir()
+        return _replicador
+
+
+def detener_replicacion() -> None:
+    """Deja de replicar y cierra el registro compartido."""
+    global _replicador
+    with _replicador_lock:
+        if _replicador is not None:
+            _replicador.detener()
+            _replicador.registro.cerrar()
+            _replicador = None
@@ -0,0 +1,23 @@
+class FranjaOcupadaError(ValueError):
+    """Se lanza al reservar una franja horaria que el empleado ya tiene ocupada."""
+
+    def __init__(self, id_empleado: int, fecha, hora):
+        super().__init__(f"El empleado {id_empleado} ya tiene una cita el {fecha} a las {hora}.")
+        self.id_empleado = id_empleado
+        self.fecha = fecha
+        self.hora = hora
+
+
+class ConflictoConcurrenciaError(Exception):
+    """
+    Se lanza al guardar una entidad cuya versión en la base de datos ya no es la
+    que se leyó: otra sesión la modificó (o eliminó) entre la lectura y la escritura.
+    """
+
+    def __init__(self, entidad: str, clave: int, version_esperada: int):
+        super().__init__(
+            f"{entidad} {clave} fue modificada por otra sesión (versión esperada {version_esperada})."
+        )
+        self.entidad = entidad
+        self.clave = clave
+        self.version_esperada = version_esperada
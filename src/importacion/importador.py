@@ -0,0 +1,412 @@
+"""
+Importación masiva de dueños y mascotas desde hojas de cálculo (CSV o Excel).
+
+    python -m src.importacion.importador --duenos duenos.xlsx --mascotas mascotas.csv --errores errores.csv
+
+1. Las filas se leen en streaming (`lectores`), nunca el fichero completo.
+2. Se validan por lotes en un pool de procesos con las reglas de las propias
+   entidades: fechas que acepta `Dueño`/`Mascota` y peso positivo como exige
+   `Mascota.actualizar_peso`.
+3. En el proceso principal se comprueba que el DNI no se repite (conjunto en
+   memoria con los DNI ya existentes en la base de datos), se asignan los IDs y
+   se enlaza cada mascota con su dueño, por `dni_dueno` o por el `id_dueno`
+   que tenía el dueño en la hoja importada.
+4. Se escribe por lotes con `execute_many`, cada lote en su transacción. Si un
+   lote falla se reintenta fila a fila para rechazar solo las culpables.
+
+Las filas rechazadas quedan en el `InformeImportacion` con su número de fila
+(el que ve el usuario en la hoja) y el motivo.
+"""
+import argparse
+import csv
+import math
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.database_conn.esquema import COLUMNAS, sentencia_insert
+from src.entidades.mascotas.mascota import Mascota
+from src.entidades.personas.duenos.dueno import Dueño
+from src.eventos import cambios
+from src.eventos.bus import BusCambios, obtener_bus
+from src.importacion.lectores import Fila, leer_filas
+
+DUENOS = "duenos"
+MASCOTAS = "mascotas"
+
+_FECHA_DMA = re.compile(r"^(\d{1,2})[/-](\d{1,2})[/-](\d{4})$")
+SEXOS = {"m": "M", "macho": "M", "h": "H", "hembra": "H"}
+
+Validada = Tuple[int, Optional[dict], List[str]]
+
+
+# ------------------------------
+# Validación (se ejecuta en los procesos del pool)
+# ------------------------------
+
+def _texto(fila: dict, columna: str) -> str:
+    valor = fila.get(columna)
+    return "" if valor is None else str(valor).strip()
+
+
+def _fecha(fila: dict, columna: str) -> str:
+    """Acepta AAAA-MM-DD y también DD/MM/AAAA, habitual en las hojas en español."""
+    texto = _texto(fila, columna)
+    coincidencia = _FECHA_DMA.match(texto)
+    if coincidencia:
+        dia, mes, año = coincidencia.groups()
+        return f"{año}-{int(mes):02d}-{int(dia):02d}"
+    return texto
+
+
+def normalizar_dni(valor) -> str:
+    """DNI sin espacios, puntos ni guiones; Excel devuelve los numéricos como float (12345678.0)."""
+    return re.sub(r"[\s.-]", "", clave_externa(valor)).upper()
+
+
+def clave_externa(valor) -> str:
+    """ID de la hoja como texto estable: 12, 12.0 y "12" son la misma clave."""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip() if valor not in (None, "") else ""
+
+
+def validar_dueño(fila: dict) -> Tuple[Optional[dict], List[str]]:
+    """Valores de la fila listos para insertar, o None y la lista de errores."""
+    errores = []
+    nombre, dni = _texto(fila, "nombre"), normalizar_dni(fila.get("dni"))
+    if not nombre:
+        errores.append("nombre: obligatorio")
+    if not dni:
+        errores.append("dni: obligatorio")
+    fecha = _fecha(fila, "fecha_nacimiento")
+    try:
+        dueño = Dueño(0, nombre, dni, _texto(fila, "telefono"), _texto(fila, "email"),
+                      fecha, _texto(fila, "direccion"))
+    except ValueError:
+        errores.append(f"fecha_nacimiento: '{fecha}' no es una fecha válida (AAAA-MM-DD o DD/MM/AAAA)")
+    if errores:
+        return None, errores
+    return {
+        "nombre": dueño.nombre,
+        "dni": dueño.dni,
+        "telefono": dueño.telefono,
+        "email": dueño.email,
+        "fecha_nacimiento": dueño.fecha_nacimiento.isoformat(),
+        "direccion": dueño.direccion,
+        "id_externo": clave_externa(fila.get("id_dueno")),
+    }, []
+
+
+def validar_mascota(fila: dict) -> Tuple[Optional[dict], List[str]]:
+    errores = []
+    nombre, especie = _texto(fila, "nombre"), _texto(fila, "especie")
+    if not nombre:
+        errores.append("nombre: obligatorio")
+    if not especie:
+        errores.append("especie: obligatoria")
+    sexo = _texto(fila, "sexo")
+    if sexo and sexo.lower() not in SEXOS:
+        errores.append(f"sexo: '{sexo}' no es válido (M/H)")
+    dni_dueno, id_dueno = normalizar_dni(fila.get("dni_dueno")), clave_externa(fila.get("id_dueno"))
+    if not dni_dueno and not id_dueno:
+        errores.append("dni_dueno: obligatorio para enlazar la mascota con su dueño")
+    fecha = _fecha(fila, "fecha_nacimiento")
+    texto_peso = _texto(fila, "peso").replace(",", ".")
+    try:
+        peso = float(texto_peso)
+    except ValueError:
+        peso = None
+    if peso is None or not math.isfinite(peso):  # float() también acepta "nan" e "inf"
+        errores.append(f"peso: '{texto_peso}' no es un número")
+        peso = None
+    try:
+        mascota = Mascota(0, nombre, especie, _texto(fila, "raza"), fecha, peso, SEXOS.get(sexo.lower()), None)
+    except ValueError:
+        errores.append(f"fecha_nacimiento: '{fecha}' no es una fecha válida (AAAA-MM-DD o DD/MM/AAAA)")
+    else:
+        if peso is not None:
+            try:
+                mascota.actualizar_peso(peso)  # Misma regla que al editar la mascota
+            except ValueError as e:
+                errores.append(f"peso: {e}")
+    if errores:
+        return None, errores
+    return {
+        "nombre": mascota.nombre,
+        "especie": mascota.especie,
+        "raza": mascota.raza,
+        "fecha_nacimiento": mascota.fecha_nacimiento.isoformat(),
+        "peso": mascota.peso,
+        "sexo": mascota.sexo,
+        "dni_dueno": dni_dueno,
+        "id_dueno_externo": id_dueno,
+    }, []
+
+
+_VALIDADORES = {DUENOS: validar_dueño, MASCOTAS: validar_mascota}
+
+
+def validar_lote(tabla: str, filas: List[Fila]) -> List[Validada]:
+    validar = _VALIDADORES[tabla]
+    return [(numero, *validar(fila)) for numero, fila in filas]
+
+
+# ------------------------------
+# Informe
+# ------------------------------
+
+@dataclass
+class ErrorFila:
+    tabla: str
+    fila: int
+    mensaje: str
+
+
+@dataclass
+class InformeImportacion:
+    tabla: str
+    leidas: int = 0
+    importadas: int = 0
+    errores: List[ErrorFila] = field(default_factory=list)
+    duracion: float = 0.0
+
+    @property
+    def rechazadas(self) -> int:
+        return len({e.fila for e in self.errores})
+
+    def rechazar(self, fila: int, mensajes: Iterable[str]) -> None:
+        self.errores.extend(ErrorFila(self.tabla, fila, m) for m in mensajes)
+
+    def __str__(self):
+        ritmo = self.leidas / self.duracion if self.duracion else 0.0
+        return (f"{self.tabla}: {self.leidas} leídas, {self.importadas} importadas, "
+                f"{self.rechazadas} rechazadas en {self.duracion:.2f} s ({ritmo:,.0f} filas/s)")
+
+
+def guardar_errores(informes: Iterable[InformeImportacion], ruta: str) -> int:
+    """Escribe el informe de errores por fila en un CSV. Devuelve el número de errores."""
+    total = 0
+    with open(ruta, "w", newline="", encoding="utf-8") as fichero:
+        escritor = csv.writer(fichero)
+        escritor.writerow(("tabla", "fila", "error"))
+        for informe in informes:
+            for error in informe.errores:
+                escritor.writerow((error.tabla, error.fila, error.mensaje))
+                total += 1
+    return total
+
+
+# ------------------------------
+# Importador
+# ------------------------------
+
+def _trocear(filas: Iterable[Fila], tamaño: int) -> Iterator[List[Fila]]:
+    iterador = iter(filas)
+    while True:
+        lote = list(islice(iterador, tamaño))
+        if not lote:
+            return
+        yield lote
+
+
+class Importador:
+    """
+    Clase Importador
+    Propósito: Cargar en la base de datos hojas de dueños y mascotas de otra
+    clínica, validando y enlazando las filas sin cargar los ficheros en memoria.
+
+    Principio SOLID:
+    - SRP (Responsabilidad Única): Las reglas de cada campo son las de las
+      entidades; el importador solo orquesta lectura, validación y escritura.
+
+    Las mascotas deben importarse después de sus dueños (mismo importador si se
+    enlazan por el `id_dueno` de la hoja).
+    """
+
+    def __init__(self, db, procesos: Optional[int] = None, tam_lote: int = 1000,
+                 tam_lote_validacion: int = 2000, bus: Optional[BusCambios] = None):
+        self.db = db
+        self.procesos = procesos if procesos is not None else (os.cpu_count() or 1)
+        self.tam_lote = tam_lote
+        self.tam_lote_validacion = tam_lote_validacion
+        self.bus = bus or obtener_bus()
+        self._dni_a_id: Optional[Dict[str, int]] = None
+        self._externo_a_id: Dict[str, int] = {}
+        self._siguiente_id: Dict[str, int] = {}
+
+    def _preparar(self) -> None:
+        """Carga una sola vez los DNI existentes y los siguientes IDs libres."""
+        if self._dni_a_id is not None:
+            return
+        self._dni_a_id = {normalizar_dni(f["dni"]): f["id_dueno"]
+                          for f in self.db.fetch_all("SELECT id_dueno, dni FROM duenos")}
+        for tabla, clave in ((DUENOS, "id_dueno"), (MASCOTAS, "id_mascota")):
+            fila = self.db.fetch_one(f"SELECT COALESCE(MAX({clave}), 0) AS ultimo FROM {tabla}")
+            self._siguiente_id[tabla] = int(fila["ultimo"]) + 1
+
+    def _asignar_id(self, tabla: str) -> int:
+        nuevo = self._siguiente_id[tabla]
+        self._siguiente_id[tabla] += 1
+        return nuevo
+
+    def _validar(self, tabla: str, filas: Iterable[Fila]) -> Iterator[Validada]:
+        lotes = _trocear(filas, self.tam_lote_validacion)
+        if self.procesos <= 1:
+            for lote in lotes:
+                yield from validar_lote(tabla, lote)
+            return
+        with ProcessPoolExecutor(self.procesos) as pool:
+            # Como mucho dos lotes por proceso en vuelo: memoria acotada y orden de la hoja
+            en_vuelo = deque()
+            for lote in lotes:
+                en_vuelo.append(pool.submit(validar_lote, tabla, lote))
+                if len(en_vuelo) >= self.procesos * 2:
+                    yield from en_vuelo.popleft().result()
+            while en_vuelo:
+                yield from en_vuelo.popleft().result()
+
+    # ------------------------------
+    # Dueños
+    # ------------------------------
+
+    def importar_duenos(self, ruta: str, hoja: Optional[str] = None) -> InformeImportacion:
+        return self._importar(DUENOS, leer_filas(ruta, hoja))
+
+    def _fila_dueño(self, informe: InformeImportacion, numero: int, valores: dict) -> Optional[tuple]:
+        dni = valores["dni"]
+        if dni in self._dni_a_id:
+            informe.rechazar(numero, [f"dni: {dni} ya está registrado"])
+            return None
+        id_dueno = self._asignar_id(DUENOS)
+        self._dni_a_id[dni] = id_dueno
+        if valores["id_externo"]:
+            self._externo_a_id[valores["id_externo"]] = id_dueno
+        return (id_dueno, valores["nombre"], dni, valores["telefono"], valores["email"],
+                valores["fecha_nacimiento"], valores["direccion"])
+
+    # ------------------------------
+    # Mascotas
+    # ------------------------------
+
+    def importar_mascotas(self, ruta: str, hoja: Optional[str] = None) -> InformeImportacion:
+        return self._importar(MASCOTAS, leer_filas(ruta, hoja))
+
+    def _fila_mascota(self, informe: InformeImportacion, numero: int, valores: dict) -> Optional[tuple]:
+        if valores["dni_dueno"]:
+            id_dueno = self._dni_a_id.get(valores["dni_dueno"])
+            if id_dueno is None:
+                informe.rechazar(numero, [f"dni_dueno: no hay ningún dueño con DNI {valores['dni_dueno']}"])
+                return None
+        else:
+            id_dueno = self._externo_a_id.get(valores["id_dueno_externo"])
+            if id_dueno is None:
+                informe.rechazar(numero, [f"id_dueno: el dueño {valores['id_dueno_externo']} "
+                                          f"no está en la hoja de dueños importada"])
+                return None
+        return (self._asignar_id(MASCOTAS), valores["nombre"], valores["especie"], valores["raza"],
+                valores["fecha_nacimiento"], valores["peso"], valores["sexo"], id_dueno)
+
+    # ------------------------------
+    # Canal común
+    # ------------------------------
+
+    def _importar(self, tabla: str, filas: Iterable[Fila]) -> InformeImportacion:
+        self._preparar()
+        informe = InformeImportacion(tabla)
+        preparar_fila = self._fila_dueño if tabla == DUENOS else self._fila_mascota
+        inicio = time.perf_counter()
+        lote: List[Tuple[int, tuple]] = []
+        for numero, valores, errores in self._validar(tabla, filas):
+            informe.leidas += 1
+            if errores:
+                informe.rechazar(numero, errores)
+                continue
+            fila = preparar_fila(informe, numero, valores)
+            if fila is None:
+                continue
+            lote.append((numero, fila))
+            if len(lote) >= self.tam_lote:
+                self._escribir(tabla, lote, informe)
+                lote = []
+        if lote:
+            self._escribir(tabla, lote, informe)
+        informe.duracion = time.perf_counter() - inicio
+        return informe
+
+    def _escribir(self, tabla: str, lote: List[Tuple[int, tuple]], informe: InformeImportacion) -> None:
+        sentencia = sentencia_insert(tabla)
+        try:
+            with self.db.transaction():
+                self.db.execute_many(sentencia, [fila for _, fila in lote])
+            escritas = [fila for _, fila in lote]
+        except Exception:
+            # Se aísla la fila culpable: el resto del lote se importa igualmente
+            escritas = []
+            for numero, fila in lote:
+                try:
+                    with self.db.transaction():
+                        self.db.execute_query(sentencia, fila)
+                    escritas.append(fila)
+                except Exception as e:
+                    informe.rechazar(numero, [f"base de datos: {e}"])
+                    self._olvidar(tabla, fila)
+        informe.importadas += len(escritas)
+        entidad = cambios.DUENO if tabla == DUENOS else cambios.MASCOTA
+        with self.bus.agrupar():
+            for fila in escritas:
+                self.bus.emitir(entidad, cambios.INSERTAR, fila[0], dict(zip(COLUMNAS[tabla], fila)), 0)
+
+    def _olvidar(self, tabla: str, fila: tuple) -> None:
+        """Un dueño que no llegó a escribirse no puede recibir mascotas."""
+        if tabla != DUENOS:
+            return
+        id_dueno, dni = fila[0], fila[2]
+        self._dni_a_id.pop(dni, None)
+        for externo in [e for e, i in self._externo_a_id.items() if i == id_dueno]:
+            del self._externo_a_id[externo]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa dueños y mascotas desde CSV o Excel.")
+    parser.add_argument("--duenos", help="Hoja de dueños (.csv o .xlsx)")
+    parser.add_argument("--mascotas", help="Hoja de mascotas (.csv o .xlsx)")
+    parser.add_argument("--hoja-duenos", help="Nombre de la hoja de Excel de dueños")
+    parser.add_argument("--hoja-mascotas", help="Nombre de la hoja de Excel de mascotas")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos de validación (por defecto, uno por núcleo)")
+    parser.add_argument("--lote", type=int, default=1000, help="Filas por inserción")
+    parser.add_argument("--errores", default="errores_importacion.csv", help="CSV con las filas rechazadas")
+    args = parser.parse_args(argv)
+    if not args.duenos and not args.mascotas:
+        parser.error("indica --duenos, --mascotas o ambos")
+
+    from src.database_conn.db_conn import DatabaseConnection
+    from src.eventos.transporte import detener_replicacion, iniciar_replicacion
+
+    db = DatabaseConnection.from_env()
+    if not db.connect():
+        raise SystemExit("No se pudo conectar a la base de datos.")
+    iniciar_replicacion(en_segundo_plano=False)
+    try:
+        importador = Importador(db, procesos=args.procesos, tam_lote=args.lote)
+        informes = []
+        if args.duenos:
+            informes.append(importador.importar_duenos(args.duenos, args.hoja_duenos))
+            print(informes[-1])
+        if args.mascotas:
+            informes.append(importador.importar_mascotas(args.mascotas, args.hoja_mascotas))
+            print(informes[-1])
+    finally:
+        detener_replicacion()
+        db.disconnect()
+    if guardar_errores(informes, args.errores):
+        print(f"Errores por fila en {args.errores}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Lectura en streaming de hojas de cálculo (CSV y Excel) fila a fila.
+
+Ninguna función carga el fichero completo: devuelven iteradores de
+(número de fila, dict) con las cabeceras normalizadas ("Fecha de nacimiento"
+-> "fecha_nacimiento", "DNI dueño" -> "dni_dueno").
+"""
+import csv
+import os
+import unicodedata
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.utils.fechas import a_texto_fecha
+
+# Cabeceras habituales en las hojas de otras clínicas -> nombre de columna
+ALIAS_CABECERAS = {
+    "fecha_de_nacimiento": "fecha_nacimiento",
+    "nacimiento": "fecha_nacimiento",
+    "documento": "dni",
+    "nif": "dni",
+    "correo": "email",
+    "correo_electronico": "email",
+    "telefono_movil": "telefono",
+    "movil": "telefono",
+    "domicilio": "direccion",
+    "dni_del_dueno": "dni_dueno",
+    "dni_propietario": "dni_dueno",
+    "id_propietario": "id_dueno",
+    "peso_kg": "peso",
+    "peso_(kg)": "peso",
+}
+
+Fila = Tuple[int, Dict[str, object]]
+
+
+def normalizar_cabecera(cabecera) -> str:
+    """Minúsculas, sin tildes y con guiones bajos: 'Fecha de nacimiento' -> 'fecha_nacimiento'."""
+    texto = unicodedata.normalize("NFKD", str(cabecera or "")).encode("ascii", "ignore").decode()
+    texto = "_".join(texto.strip().lower().split())
+    return ALIAS_CABECERAS.get(texto, texto)
+
+
+def _a_dict(cabeceras: List[str], valores) -> Dict[str, object]:
+    fila = {}
+    for cabecera, valor in zip(cabeceras, valores):
+        if not cabecera:
+            continue
+        if isinstance(valor, (date, datetime)):
+            valor = a_texto_fecha(valor)  # Las celdas de fecha de Excel llegan como datetime
+        elif isinstance(valor, str):
+            valor = valor.strip()
+        fila[cabecera] = valor
+    return fila
+
+
+def leer_csv(ruta: str, delimitador: Optional[str] = None, encoding: str = "utf-8-sig") -> Iterator[Fila]:
+    """
+    Filas de un CSV. Si no se indica el delimitador se detecta con la primera
+    parte del fichero (las exportaciones de Excel en español usan ';').
+    """
+    with open(ruta, newline="", encoding=encoding) as fichero:
+        if delimitador is None:
+            muestra = fichero.read(8192)
+            fichero.seek(0)
+            try:
+                delimitador = csv.Sniffer().sniff(muestra, delimiters=",;\t").delimiter
+            except csv.Error:
+                delimitador = ","
+        lector = csv.reader(fichero, delimiter=delimitador)
+        cabeceras = [normalizar_cabecera(c) for c in next(lector, [])]
+        # La fila 1 es la cabecera: los números coinciden con los que ve el usuario en la hoja
+        for numero, valores in enumerate(lector, start=2):
+            if any(v.strip() for v in valores):
+                yield numero, _a_dict(cabeceras, valores)
+
+
+def leer_excel(ruta: str, hoja: Optional[str] = None) -> Iterator[Fila]:
+    """Filas de una hoja de Excel (.xlsx), leída en modo solo lectura. Requiere openpyxl."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("Para importar ficheros Excel hace falta instalar openpyxl.") from e
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = (libro[hoja] if hoja else libro.active).iter_rows(values_only=True)
+        cabeceras = [normalizar_cabecera(c) for c in next(filas, ())]
+        for numero, valores in enumerate(filas, start=2):
+            if any(v not in (None, "") for v in valores):
+                yield numero, _a_dict(cabeceras, valores)
+    finally:
+        libro.close()
+
+
+def leer_filas(ruta: str, hoja: Optional[str] = None) -> Iterator[Fila]:
+    """Elige el lector según la extensión del fichero."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return leer_excel(ruta, hoja)
+    if extension in (".csv", ".txt"):
+        return leer_csv(ruta)
+    raise ValueError(f"Formato de fichero no soportado: {extension}")
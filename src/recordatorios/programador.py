@@ -0,0 +1,331 @@
+"""
+Recordatorios de citas pendientes.
+
+`ProgramadorRecordatorios` coloca cada aviso (por defecto 24 h y 2 h antes de
+la cita) en una `RuedaTemporal` y duerme hasta el siguiente vencimiento, sin
+consultar la tabla de citas periódicamente. El estado se mantiene así:
+
+- Al arrancar se reconstruye en una sola pasada en streaming sobre las citas
+  pendientes a partir de hoy.
+- Después se actualiza con los eventos de cambio de citas del bus
+  (`src.eventos`): al crear, reprogramar, cancelar, completar o eliminar una
+  cita se reprograman o cancelan solo sus avisos. Para recibir los cambios de
+  la aplicación desde otro proceso se usa el `ReplicadorCambios`.
+
+Los avisos enviados quedan en `recordatorios_enviados`, de modo que un
+reinicio no los repite. Si la cita se reprograma, los avisos de la nueva fecha
+son otros y se vuelven a enviar.
+
+    python -m src.recordatorios.programador --avisos 24h,2h --registro-cambios cambios.db
+"""
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.eventos import cambios
+from src.eventos.bus import BusCambios, obtener_bus
+from src.eventos.cambios import EventoCambio
+from src.recordatorios.rueda import RuedaTemporal
+from src.recordatorios.transportes import Recordatorio, Transporte
+from src.utils.fechas import a_texto_fecha, a_texto_hora, parsear_fecha, parsear_hora
+
+logger = logging.getLogger(__name__)
+
+AVISOS_POR_DEFECTO = (timedelta(hours=24), timedelta(hours=2))
+FORMATO_INICIO = "%Y-%m-%d %H:%M:%S"
+
+DDL_ENVIADOS = """
+    CREATE TABLE IF NOT EXISTS recordatorios_enviados (
+        id_cita INTEGER NOT NULL,
+        aviso INTEGER NOT NULL,
+        inicio DATETIME NOT NULL,
+        enviado DATETIME NOT NULL,
+        PRIMARY KEY (id_cita, aviso, inicio)
+    )
+"""
+
+
+def _minutos(aviso: timedelta) -> int:
+    return int(aviso.total_seconds()) // 60
+
+
+def parsear_aviso(texto: str) -> timedelta:
+    """'24h', '90m' o '2d' -> timedelta."""
+    texto = texto.strip().lower()
+    unidades = {"m": "minutes", "h": "hours", "d": "days"}
+    if len(texto) < 2 or texto[-1] not in unidades or not texto[:-1].isdigit():
+        raise ValueError(f"Aviso '{texto}' inválido. Usa minutos, horas o días: 90m, 24h, 2d.")
+    return timedelta(**{unidades[texto[-1]]: int(texto[:-1])})
+
+
+class ProgramadorRecordatorios:
+    """
+    Clase ProgramadorRecordatorios
+    Propósito: Enviar a los dueños los recordatorios de las citas pendientes
+    con la antelación configurada.
+
+    Principio SOLID:
+    - SRP (Responsabilidad Única): Decide qué aviso toca y cuándo; cómo se
+      entrega lo resuelve el `Transporte`.
+    """
+
+    def __init__(self, db, transporte: Transporte, avisos: Iterable[timedelta] = AVISOS_POR_DEFECTO,
+                 bus: Optional[BusCambios] = None, reloj: Callable[[], float] = time.time,
+                 reintento: timedelta = timedelta(minutes=5), tam_lote: int = 1000,
+                 espera_maxima: float = 60.0):
+        self.db = db
+        self.transporte = transporte
+        self.avisos = tuple(sorted(set(avisos), reverse=True))
+        if not self.avisos or any(a <= timedelta(0) for a in self.avisos):
+            raise ValueError("Hace falta al menos un aviso y todos deben ser positivos.")
+        self.bus = bus or obtener_bus()
+        self.reloj = reloj
+        self.reintento = reintento
+        self.tam_lote = tam_lote
+        # Tope de cada espera: corrige a tiempo un cambio de hora del sistema
+        self.espera_maxima = espera_maxima
+        self._rueda = RuedaTemporal(inicio=reloj())
+        # id_cita -> {(aviso en minutos, inicio)} ya enviados, solo de citas pendientes
+        self._enviados: Dict[int, Set[Tuple[int, str]]] = {}
+        self._lock = threading.RLock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        """Avisos programados."""
+        with self._lock:
+            return len(self._rueda)
+
+    @staticmethod
+    def _inicio(fecha, hora) -> datetime:
+        return datetime.combine(parsear_fecha(a_texto_fecha(fecha)), parsear_hora(a_texto_hora(hora)))
+
+    # ------------------------------
+    # Estado: reconstrucción y cambios incrementales
+    # ------------------------------
+
+    def reconstruir(self) -> int:
+        """
+        Vuelve a cargar los avisos de todas las citas pendientes desde la base de
+        datos, en una pasada en streaming. Devuelve cuántos quedan programados.
+        """
+        self.db.execute_query(DDL_ENVIADOS)
+        ahora = self.reloj()
+        hoy = datetime.fromtimestamp(ahora).date().isoformat()
+        # Los avisos de citas ya pasadas no vuelven a hacer falta
+        antiguos = datetime.fromtimestamp(ahora) - max(self.avisos) - timedelta(days=1)
+        self.db.execute_query("DELETE FROM recordatorios_enviados WHERE inicio < %s",
+                              (antiguos.strftime(FORMATO_INICIO),))
+        # La conexión dura lo que el proceso: cada lectura cierra su transacción para
+        # que la siguiente no vea la foto de la primera (REPEATABLE READ en MySQL)
+        with self.db.transaction(), self._lock:
+            self._rueda = RuedaTemporal(inicio=ahora)
+            self._enviados = {}
+            for fila in self.db.fetch_all(
+                "SELECT r.id_cita, r.aviso, r.inicio FROM recordatorios_enviados r "
+                "JOIN citas c ON c.id_cita = r.id_cita WHERE c.estado = 'pendiente' AND c.fecha >= %s",
+                (hoy,),
+            ):
+                self._enviados.setdefault(fila["id_cita"], set()).add((fila["aviso"], str(fila["inicio"])[:19]))
+            for fila in self.db.fetch_iter(
+                "SELECT id_cita, fecha, hora FROM citas WHERE estado = 'pendiente' AND fecha >= %s",
+                (hoy,), self.tam_lote,
+            ):
+                self._programar_cita(fila["id_cita"], self._inicio(fila["fecha"], fila["hora"]), ahora)
+            programados = len(self._rueda)
+        self._despertar.set()
+        return programados
+
+    def _programar_cita(self, id_cita: int, inicio: datetime, ahora: float) -> None:
+        """(Re)programa los avisos de una cita pendiente. Llamar con el lock tomado."""
+        self._cancelar_cita(id_cita, olvidar_enviados=False)
+        comienzo = inicio.timestamp()
+        if comienzo <= ahora:
+            return
+        texto_inicio = inicio.strftime(FORMATO_INICIO)
+        enviados = {m for m, i in self._enviados.get(id_cita, ()) if i == texto_inicio}
+        atrasados, futuros = [], 0
+        for aviso in self.avisos:
+            minutos = _minutos(aviso)
+            if minutos in enviados:
+                continue
+            instante = comienzo - aviso.total_seconds()
+            if instante > ahora:
+                self._rueda.programar((id_cita, minutos), instante, inicio)
+                futuros += 1
+            else:
+                atrasados.append(minutos)
+        # Cita creada (o reprogramada) con menos antelación que algún aviso, o un
+        # reinicio que se saltó su hora: se manda uno solo, el más cercano, y solo
+        # si no queda ninguno por llegar ni se mandó ya otro más próximo a la cita
+        if atrasados and not futuros and not any(m <= min(atrasados) for m in enviados):
+            self._rueda.programar((id_cita, min(atrasados)), ahora, inicio)
+
+    def _cancelar_cita(self, id_cita: int, olvidar_enviados: bool = True) -> None:
+        for aviso in self.avisos:
+            self._rueda.cancelar((id_cita, _minutos(aviso)))
+        if olvidar_enviados:
+            self._enviados.pop(id_cita, None)
+
+    def _al_cambiar(self, eventos: List[EventoCambio]) -> None:
+        ahora = self.reloj()
+        with self._lock:
+            for evento in eventos:
+                datos = evento.datos or {}
+                if evento.operacion == cambios.ELIMINAR or datos.get("estado") != "pendiente":
+                    self._cancelar_cita(evento.clave)
+                else:
+                    self._programar_cita(evento.clave, self._inicio(datos["fecha"], datos["hora"]), ahora)
+        self._despertar.set()
+
+    # ------------------------------
+    # Envío
+    # ------------------------------
+
+    def despachar(self, ahora: Optional[float] = None) -> int:
+        """Envía los avisos vencidos hasta `ahora`. Devuelve cuántos se enviaron."""
+        ahora = self.reloj() if ahora is None else ahora
+        with self._lock:
+            vencidos = self._rueda.avanzar(ahora)
+        if not vencidos:
+            return 0
+        citas = self._leer_citas(sorted({id_cita for (id_cita, _), _ in vencidos}))
+        enviados = 0
+        for (id_cita, minutos), inicio in vencidos:
+            fila = citas.get(id_cita)
+            # Un cambio que aún no ha llegado por el bus: manda lo que hay en la base de datos
+            if fila is None or fila["estado"] != "pendiente" or self._inicio(fila["fecha"], fila["hora"]) != inicio:
+                continue
+            if not fila["email"]:
+                logger.warning("La cita %s no tiene email de contacto: no se envía el recordatorio", id_cita)
+                continue
+            try:
+                self.transporte.enviar(self._componer(fila, timedelta(minutes=minutos), inicio))
+            except Exception:
+                logger.exception("No se pudo enviar el recordatorio de la cita %s", id_cita)
+                reintento = ahora + self.reintento.total_seconds()
+                if reintento < inicio.timestamp():
+                    with self._lock:
+                        self._rueda.programar((id_cita, minutos), reintento, inicio)
+                continue
+            self._marcar_enviado(id_cita, minutos, inicio)
+            enviados += 1
+        return enviados
+
+    def _leer_citas(self, ids: List[int]) -> Dict[int, dict]:
+        citas = {}
+        with self.db.transaction():  # Ver lo confirmado por otras sesiones desde la última lectura
+            for desde in range(0, len(ids), self.tam_lote):
+                bloque = ids[desde:desde + self.tam_lote]
+                for fila in self.db.fetch_all(
+                    "SELECT c.id_cita, c.fecha, c.hora, c.estado, c.motivo, m.nombre AS mascota, "
+                    "d.nombre AS dueno, d.email FROM citas c "
+                    "JOIN mascotas m ON m.id_mascota = c.id_mascota "
+                    "JOIN duenos d ON d.id_dueno = m.id_dueno "
+                    f"WHERE c.id_cita IN ({', '.join(['%s'] * len(bloque))})",
+                    tuple(bloque),
+                ):
+                    citas[fila["id_cita"]] = fila
+        return citas
+
+    @staticmethod
+    def _componer(fila: dict, aviso: timedelta, inicio: datetime) -> Recordatorio:
+        cuando = f"el {inicio:%d/%m/%Y} a las {inicio:%H:%M}"
+        cuerpo = (
+            f"Hola {fila['dueno']}:\n\n"
+            f"Le recordamos la cita de {fila['mascota']} {cuando}"
+            + (f" ({fila['motivo']})" if fila["motivo"] else "")
+            + ".\n\nSi no puede acudir, avísenos para liberar la franja.\n\nClínica Veterinaria"
+        )
+        return Recordatorio(fila["id_cita"], aviso, inicio, fila["email"],
+                            f"Recordatorio: cita de {fila['mascota']} {cuando}", cuerpo)
+
+    def _marcar_enviado(self, id_cita: int, minutos: int, inicio: datetime) -> None:
+        texto_inicio = inicio.strftime(FORMATO_INICIO)
+        self.db.execute_query(
+            "INSERT INTO recordatorios_enviados (id_cita, aviso, inicio, enviado) VALUES (%s, %s, %s, %s)",
+            (id_cita, minutos, texto_inicio, datetime.fromtimestamp(self.reloj()).strftime(FORMATO_INICIO)),
+        )
+        with self._lock:
+            self._enviados.setdefault(id_cita, set()).add((minutos, texto_inicio))
+
+    # ------------------------------
+    # Ejecución
+    # ------------------------------
+
+    def conectar(self) -> None:
+        """Empieza a seguir los cambios de citas publicados en el bus."""
+        self.bus.suscribir(self._al_cambiar, entidades=[cambios.CITA])
+
+    def iniciar(self, en_segundo_plano: bool = True) -> None:
+        """Se suscribe a los cambios de citas, reconstruye el estado y empieza a enviar."""
+        # Primero la suscripción: lo que cambie durante la reconstrucción no se pierde
+        self.conectar()
+        self.reconstruir()
+        self._detener.clear()
+        if en_segundo_plano:
+            self._hilo = threading.Thread(target=self._bucle, name="recordatorios", daemon=True)
+            self._hilo.start()
+        else:
+            self._bucle()
+
+    def detener(self) -> None:
+        self.bus.desuscribir(self._al_cambiar)
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            self._despertar.clear()
+            try:
+                self.despachar()
+            except Exception:
+                logger.exception("Error al despachar recordatorios")
+            with self._lock:
+                proximo = self._rueda.proximo()
+            espera = self.espera_maxima if proximo is None else max(0.0, proximo - self.reloj())
+            self._despertar.wait(min(espera, self.espera_maxima))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Envía los recordatorios de las citas pendientes.")
+    parser.add_argument("--avisos", default="24h,2h", help="Antelaciones separadas por comas: 24h,2h,30m")
+    parser.add_argument("--registro-cambios", default=None,
+                        help="Registro SQLite compartido con la aplicación para recibir sus cambios "
+                             "(por defecto, CLINICA_CAMBIOS_PATH)")
+    parser.add_argument("--simular", action="store_true", help="Muestra los recordatorios en lugar de enviarlos")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    from src.database_conn.db_conn import DatabaseConnection
+    from src.eventos.transporte import detener_replicacion, iniciar_replicacion
+    from src.recordatorios.transportes import TransporteConsola, TransporteSMTP
+
+    db = DatabaseConnection.from_env()
+    if not db.connect():
+        raise SystemExit("No se pudo conectar a la base de datos.")
+    if iniciar_replicacion(args.registro_cambios) is None and args.registro_cambios:
+        raise SystemExit(f"No se pudo abrir el registro de cambios {args.registro_cambios}.")
+    programador = ProgramadorRecordatorios(
+        db, TransporteConsola() if args.simular else TransporteSMTP.from_env(),
+        [parsear_aviso(a) for a in args.avisos.split(",")],
+    )
+    try:
+        programador.iniciar(en_segundo_plano=False)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        programador.detener()
+        detener_replicacion()
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
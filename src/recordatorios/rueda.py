@@ -0,0 +1,197 @@
+"""
+Rueda temporal jerárquica (hierarchical timing wheel) para programar miles de
+avisos sin recorrerlos en cada comprobación.
+
+El tiempo se divide en ticks de `resolucion` segundos. El nivel 0 tiene una
+ranura por tick; cada nivel superior agrupa `ranuras` ranuras del anterior.
+Programar y cancelar cuestan O(1); al avanzar solo se visitan las ranuras no
+vacías, y las entradas de los niveles altos bajan de nivel (cascada) cuando
+llega su ranura. Lo que queda más allá del último nivel espera en un montículo.
+
+    rueda = RuedaTemporal()
+    rueda.programar("cita-1", time.time() + 3600, datos)
+    for clave, datos in rueda.avanzar(time.time()):
+        ...
+"""
+import heapq
+import math
+from itertools import count
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Ubicación de una entrada: (nivel, ranura), o uno de estos marcadores
+_VENCIDA = (-1, -1)
+_DESBORDE = (-2, -2)
+
+
+class RuedaTemporal:
+    """
+    Clase RuedaTemporal
+    Propósito: Guardar entradas con clave y vencimiento y devolver las vencidas
+    al avanzar el reloj.
+
+    Principio SOLID:
+    - SRP (Responsabilidad Única): Solo sabe de tiempo; qué se hace al vencer
+      una entrada lo decide quien avanza la rueda.
+
+    No es segura entre hilos: quien la comparta debe protegerla con un lock.
+    """
+
+    def __init__(self, inicio: float = 0.0, resolucion: float = 1.0, ranuras: int = 64, niveles: int = 4):
+        if resolucion <= 0 or ranuras < 2 or niveles < 1:
+            raise ValueError("La rueda necesita resolución positiva, al menos 2 ranuras y 1 nivel.")
+        self.resolucion = resolucion
+        self.ranuras = ranuras
+        self.niveles = niveles
+        self._actual = math.floor(inicio / resolucion)
+        self._ruedas: List[List[Dict[Hashable, Tuple[int, Any]]]] = [
+            [{} for _ in range(ranuras)] for _ in range(niveles)
+        ]
+        self._ubicacion: Dict[Hashable, Tuple[int, int]] = {}
+        self._vencidas: Dict[Hashable, Tuple[int, Any]] = {}
+        self._desborde: List[Tuple[int, int, Hashable]] = []  # (tick, secuencia, clave)
+        self._entradas_desborde: Dict[Hashable, Tuple[int, int, Any]] = {}
+        self._secuencia = count()
+
+    def __len__(self) -> int:
+        return len(self._ubicacion)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        return clave in self._ubicacion
+
+    def _tick(self, instante: float) -> int:
+        # Redondeo hacia arriba: una entrada nunca vence antes de su instante
+        return math.ceil(instante / self.resolucion)
+
+    def _ancho(self, nivel: int) -> int:
+        """Ticks que cubre una ranura del nivel."""
+        return self.ranuras ** nivel
+
+    # ------------------------------
+    # Programar y cancelar
+    # ------------------------------
+
+    def programar(self, clave: Hashable, instante: float, valor: Any = None) -> None:
+        """Programa (o reprograma, si la clave ya existe) una entrada para `instante`."""
+        self.cancelar(clave)
+        self._colocar(clave, self._tick(instante), valor)
+
+    def cancelar(self, clave: Hashable) -> bool:
+        """Quita la entrada de `clave`. Devuelve False si no estaba programada."""
+        ubicacion = self._ubicacion.pop(clave, None)
+        if ubicacion is None:
+            return False
+        if ubicacion == _VENCIDA:
+            del self._vencidas[clave]
+        elif ubicacion == _DESBORDE:
+            del self._entradas_desborde[clave]  # Su hueco en el montículo se ignora al sacarlo
+        else:
+            nivel, ranura = ubicacion
+            del self._ruedas[nivel][ranura][clave]
+        return True
+
+    def _colocar(self, clave: Hashable, tick: int, valor: Any) -> None:
+        if tick <= self._actual:
+            self._vencidas[clave] = (tick, valor)
+            self._ubicacion[clave] = _VENCIDA
+            return
+        # Nivel más bajo cuyo bloque padre contiene a la vez el tick actual y el
+        # de la entrada: su ranura siempre está por delante de la actual
+        for nivel in range(self.niveles):
+            padre = self._ancho(nivel + 1)
+            if tick // padre == self._actual // padre:
+                ranura = (tick // self._ancho(nivel)) % self.ranuras
+                self._ruedas[nivel][ranura][clave] = (tick, valor)
+                self._ubicacion[clave] = (nivel, ranura)
+                return
+        secuencia = next(self._secuencia)
+        heapq.heappush(self._desborde, (tick, secuencia, clave))
+        self._entradas_desborde[clave] = (tick, secuencia, valor)
+        self._ubicacion[clave] = _DESBORDE
+
+    # ------------------------------
+    # Avanzar
+    # ------------------------------
+
+    def proximo(self) -> Optional[float]:
+        """
+        Instante en el que hay que volver a avanzar la rueda (puede ser solo
+        para bajar entradas de nivel), o None si está vacía.
+        """
+        if self._vencidas:
+            return self._actual * self.resolucion
+        tick = self._siguiente_tick()
+        return None if tick is None else tick * self.resolucion
+
+    def avanzar(self, instante: float) -> List[Tuple[Hashable, Any]]:
+        """Avanza el reloj hasta `instante` y devuelve las entradas vencidas, por orden."""
+        objetivo = math.floor(instante / self.resolucion)
+        disparadas = sorted(self._vencidas.items(), key=lambda e: e[1][0])
+        for clave in self._vencidas:
+            del self._ubicacion[clave]
+        self._vencidas = {}
+        while True:
+            tick = self._siguiente_tick(objetivo)
+            if tick is None:
+                break
+            self._actual = tick
+            disparadas.extend(self._procesar(tick))
+        self._actual = max(self._actual, objetivo)
+        return [(clave, valor) for clave, (_, valor) in disparadas]
+
+    def _siguiente_tick(self, limite: Optional[int] = None) -> Optional[int]:
+        """Primer tick posterior al actual con algo que hacer (como mucho `limite`)."""
+        candidatos = []
+        for nivel in range(self.niveles):
+            ancho = self._ancho(nivel)
+            base = (self._actual // self._ancho(nivel + 1)) * self._ancho(nivel + 1)
+            rueda = self._ruedas[nivel]
+            for ranura in range((self._actual // ancho) % self.ranuras + 1, self.ranuras):
+                if rueda[ranura]:
+                    candidatos.append(base + ranura * ancho)
+                    break
+        self._limpiar_desborde()
+        if self._desborde:
+            bloque = self._ancho(self.niveles)
+            candidatos.append(max(self._actual + 1, (self._desborde[0][0] // bloque) * bloque))
+        if not candidatos:
+            return None
+        tick = min(candidatos)
+        return tick if limite is None or tick <= limite else None
+
+    def _procesar(self, tick: int) -> List[Tuple[Hashable, Tuple[int, Any]]]:
+        # Del montículo a la rueda las que ya caben en el último nivel
+        bloque = self._ancho(self.niveles)
+        while self._desborde and self._desborde[0][0] // bloque == tick // bloque:
+            _, secuencia, clave = heapq.heappop(self._desborde)
+            entrada = self._entradas_desborde.get(clave)
+            if entrada is not None and entrada[1] == secuencia:
+                del self._entradas_desborde[clave]
+                del self._ubicacion[clave]
+                self._colocar(clave, entrada[0], entrada[2])
+        # Cascada: de arriba abajo, las ranuras que empiezan en este tick
+        for nivel in range(self.niveles - 1, 0, -1):
+            ancho = self._ancho(nivel)
+            if tick % ancho == 0:
+                ranura = (tick // ancho) % self.ranuras
+                entradas, self._ruedas[nivel][ranura] = self._ruedas[nivel][ranura], {}
+                for clave, (vence, valor) in entradas.items():
+                    del self._ubicacion[clave]
+                    self._colocar(clave, vence, valor)
+        # Las que vencen justo ahora acaban en la lista de vencidas o en la ranura actual
+        ranura = tick % self.ranuras
+        disparadas = list(self._ruedas[0][ranura].items())
+        self._ruedas[0][ranura] = {}
+        disparadas.extend(self._vencidas.items())
+        for clave, _ in disparadas:
+            del self._ubicacion[clave]
+        self._vencidas = {}
+        return disparadas
+
+    def _limpiar_desborde(self) -> None:
+        """Descarta de la cima del montículo las entradas canceladas o reprogramadas."""
+        while self._desborde:
+            _, secuencia, clave = self._desborde[0]
+            entrada = self._entradas_desborde.get(clave)
+            if entrada is not None and entrada[1] == secuencia:
+                return
+            heapq.heappop(self._desborde)
@@ -0,0 +1,98 @@
+"""
+Transportes por los que salen los recordatorios de citas.
+
+`TransporteSMTP` envía correos de verdad; `TransporteMemoria` solo los guarda
+en una lista (pruebas) y `TransporteConsola` los muestra por pantalla, para
+ensayar la configuración sin molestar a los dueños.
+"""
+import os
+import smtplib
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional
+
+
+@dataclass(frozen=True)
+class Recordatorio:
+    id_cita: int
+    aviso: timedelta      # Antelación con la que se avisa
+    inicio: datetime      # Fecha y hora de la cita
+    destinatario: str
+    asunto: str
+    cuerpo: str
+
+
+class Transporte(ABC):
+    """
+    Clase Abstracta Transporte
+    Propósito: Entregar un recordatorio a su destinatario.
+
+    Principio SOLID:
+    - DIP (Inversión de Dependencias): El programador de recordatorios depende
+      de esta interfaz, no de un servidor de correo concreto.
+    """
+
+    @abstractmethod
+    def enviar(self, recordatorio: Recordatorio) -> None:
+        """Entrega el recordatorio o lanza una excepción si no se pudo."""
+
+
+class TransporteMemoria(Transporte):
+    """Guarda los recordatorios en `enviados` en lugar de mandarlos."""
+
+    def __init__(self):
+        self.enviados: List[Recordatorio] = []
+        self._lock = threading.Lock()
+
+    def enviar(self, recordatorio: Recordatorio) -> None:
+        with self._lock:
+            self.enviados.append(recordatorio)
+
+
+class TransporteConsola(Transporte):
+    """Muestra cada recordatorio por la salida estándar."""
+
+    def enviar(self, recordatorio: Recordatorio) -> None:
+        print(f"[{recordatorio.destinatario}] {recordatorio.asunto}")
+
+
+class TransporteSMTP(Transporte):
+    """Envía cada recordatorio como un correo por SMTP (con STARTTLS si `tls`)."""
+
+    def __init__(self, host: str, puerto: int = 587, remitente: str = "", usuario: Optional[str] = None,
+                 contraseña: Optional[str] = None, tls: bool = True, timeout: float = 10.0):
+        self.host = host
+        self.puerto = puerto
+        self.remitente = remitente
+        self.usuario = usuario
+        self.contraseña = contraseña
+        self.tls = tls
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> "TransporteSMTP":
+        """Configuración desde CLINICA_SMTP_HOST/PORT/FROM/USER/PASSWORD/TLS."""
+        return cls(
+            host=os.environ.get("CLINICA_SMTP_HOST", "localhost"),
+            puerto=int(os.environ.get("CLINICA_SMTP_PORT", "587")),
+            remitente=os.environ.get("CLINICA_SMTP_FROM", "recordatorios@clinica.local"),
+            usuario=os.environ.get("CLINICA_SMTP_USER") or None,
+            contraseña=os.environ.get("CLINICA_SMTP_PASSWORD") or None,
+            tls=os.environ.get("CLINICA_SMTP_TLS", "1").lower() not in ("0", "false", "no"),
+        )
+
+    def enviar(self, recordatorio: Recordatorio) -> None:
+        mensaje = EmailMessage()
+        mensaje["From"] = self.remitente
+        mensaje["To"] = recordatorio.destinatario
+        mensaje["Subject"] = recordatorio.asunto
+        mensaje.set_content(recordatorio.cuerpo)
+        with smtplib.SMTP(self.host, self.puerto, timeout=self.timeout) as servidor:
+            if self.tls:
+                servidor.starttls()
+            if self.usuario:
+                servidor.login(self.usuario, self.contraseña or "")
+            servidor.send_message(mensaje)
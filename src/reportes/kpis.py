@@ -0,0 +1,400 @@
+"""
+Indicadores (KPIs) de la clínica materializados en memoria.
+
+Los agregados diarios y mensuales se mantienen de forma incremental a partir de
+los cambios confirmados que publican los repositorios en el bus de cambios
+(`src.eventos`), de modo que los reportes nunca recorren las tablas completas.
+Como un evento solo trae los valores nuevos de la fila, se guarda de cada fila
+viva lo poco que aporta a los agregados (fecha, estado, importe...) para poder
+restar su aportación anterior. `reconstruir` lo recalcula todo desde la base de
+datos (al crear el agregador del proceso o tras una carga masiva):
+
+    python -m src.reportes.kpis
+
+Tablas leídas en la reconstrucción:
+    citas(id_cita, fecha, hora, id_mascota, id_empleado, estado, hora_fin)
+    consultas(id_consulta, id_cita, fecha_registro)
+    mascotas(id_mascota, especie)
+    facturas(id_factura, total, fecha, metodo_pago)
+y las particiones del archivo histórico (ver src.database_conn.archivado).
+"""
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from src.entidades.administrativo.cita import Cita
+from src.eventos import cambios
+from src.eventos.bus import BusCambios, obtener_bus
+from src.eventos.cambios import EventoCambio
+from src.eventos.transporte import iniciar_replicacion
+from src.utils.fechas import a_texto_fecha, a_texto_hora, parsear_fecha, parsear_hora
+from src.utils.perfilado import perfilar
+
+GRANULARIDADES = ("dia", "mes")
+
+# Métricas almacenadas por periodo. Cada una es un contador {clave: valor}.
+INGRESOS = "ingresos"            # clave: "total"
+FACTURAS = "facturas"            # clave: "pagadas"
+CITAS = "citas"                  # clave: estado de la cita
+DURACION = "duracion"            # clave: id_empleado -> segundos acumulados
+COMPLETADAS = "completadas"      # clave: id_empleado -> citas con duración
+CONSULTAS = "consultas"          # clave: especie
+
+ENTIDADES = (cambios.CITA, cambios.CONSULTA, cambios.FACTURA, cambios.MASCOTA)
+
+# Aportación de cada fila viva a los agregados
+AporteCita = Tuple[date, str, int, Optional[timedelta], Optional[int]]  # fecha, estado, empleado, duración, mascota
+AporteConsulta = Tuple[date, Optional[str]]                           # fecha de registro, especie
+AporteFactura = Tuple[date, float]                                    # fecha de pago, total (solo pagadas)
+
+
+def _periodo(fecha: date, granularidad: str) -> str:
+    return fecha.strftime("%Y-%m-%d") if granularidad == "dia" else fecha.strftime("%Y-%m")
+
+
+def _fecha(valor) -> date:
+    return parsear_fecha(a_texto_fecha(valor))
+
+
+class KPIsClinica:
+    """
+    Clase KPIsClinica
+    Propósito: Mantener los agregados de reportes de la clínica (ingresos, citas
+    por estado, duración media por veterinario y consultas por especie).
+
+    Principio SOLID:
+    - SRP (Responsabilidad Única): Solo agrega métricas; se entera de los cambios
+      ya confirmados por el bus y ni las entidades ni los repositorios conocen los reportes.
+    """
+
+    def __init__(self, bus: Optional[BusCambios] = None):
+        self.bus = bus or obtener_bus()
+        self._lock = threading.Lock()
+        self._agregados = self._vacio()
+        self._citas: Dict[int, AporteCita] = {}
+        self._consultas: Dict[int, AporteConsulta] = {}
+        self._facturas: Dict[int, AporteFactura] = {}
+        self._especies: Dict[int, str] = {}
+        # Eventos recibidos durante una reconstrucción, que se vuelven a aplicar al terminar
+        self._durante_reconstruccion: Optional[List[EventoCambio]] = None
+        self.ultima_reconstruccion: Optional[datetime] = None
+
+    @staticmethod
+    def _vacio() -> Dict[str, Dict[str, Dict[str, defaultdict]]]:
+        return {
+            g: defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+            for g in GRANULARIDADES
+        }
+
+    # ------------------------------
+    # Suscripción a los cambios confirmados
+    # ------------------------------
+
+    def conectar(self):
+        """Suscribe el agregador a los cambios de citas, consultas, facturas y mascotas."""
+        self.bus.suscribir(self._al_cambiar, entidades=ENTIDADES)
+
+    def desconectar(self):
+        self.bus.desuscribir(self._al_cambiar)
+
+    def _al_cambiar(self, eventos: List[EventoCambio]):
+        with self._lock:
+            if self._durante_reconstruccion is not None:
+                self._durante_reconstruccion.extend(eventos)
+            for evento in eventos:
+                self._aplicar(evento)
+
+    def _aplicar(self, evento: EventoCambio):
+        """
+        Lleva la fila del evento a su estado nuevo: resta su aportación anterior y
+        suma la nueva. Aplicar dos veces el mismo evento no cambia nada.
+        """
+        datos = evento.datos or {}
+        if evento.entidad == cambios.MASCOTA:
+            if evento.operacion == cambios.ELIMINAR:
+                self._especies.pop(evento.clave, None)
+            else:
+                self._especies[evento.clave] = datos["especie"]
+            return
+        filas, aporte, sumar = {
+            cambios.CITA: (self._citas, self._aporte_cita, self._sumar_cita),
+            cambios.CONSULTA: (self._consultas, self._aporte_consulta, self._sumar_consulta),
+            cambios.FACTURA: (self._facturas, self._aporte_factura, self._sumar_factura),
+        }[evento.entidad]
+        anterior = filas.pop(evento.clave, None)
+        # Una fila archivada sale de las tablas vivas, pero sigue contando en los
+        # reportes: si el evento trae sus últimos valores (ver `cambios.combinar`)
+        # sustituyen a los anteriores y ya no se recuerda su aportación
+        archivada = bool(datos.get(cambios.ARCHIVADO))
+        valores = {c: v for c, v in datos.items() if c != cambios.ARCHIVADO}
+        if archivada and not valores:
+            return
+        if anterior is not None:
+            sumar(anterior, -1)
+        if evento.operacion != cambios.ELIMINAR or archivada:
+            nuevo = aporte(valores)
+            if nuevo is not None:
+                sumar(nuevo, 1)
+                if not archivada:
+                    filas[evento.clave] = nuevo
+
+    # ------------------------------
+    # Aportación de cada fila
+    # ------------------------------
+
+    def _aporte_cita(self, fila: dict) -> AporteCita:
+        fecha = _fecha(fila["fecha"])
+        duracion = None
+        if fila["estado"] == "completada" and fila["hora_fin"] is not None:
+            duracion = self._duracion(fecha, parsear_hora(a_texto_hora(fila["hora"])),
+                                      parsear_hora(a_texto_hora(fila["hora_fin"])))
+        return fecha, fila["estado"], fila["id_empleado"], duracion, fila.get("id_mascota")
+
+    def _aporte_consulta(self, fila: dict) -> Optional[AporteConsulta]:
+        if fila["fecha_registro"] is None:
+            return None
+        especie = fila.get("especie")
+        if especie is None:
+            cita = self._citas.get(fila["id_cita"])
+            especie = self._especies.get(cita[4]) if cita else None
+        return _fecha(fila["fecha_registro"]), especie
+
+    @staticmethod
+    def _aporte_factura(fila: dict) -> Optional[AporteFactura]:
+        if fila["metodo_pago"] is None or fila["fecha"] is None:
+            return None
+        return _fecha(fila["fecha"]), float(fila["total"])
+
+    def _sumar_cita(self, aporte: AporteCita, signo: int):
+        fecha, estado, id_empleado, duracion, _ = aporte
+        self._sumar(fecha, CITAS, estado, signo)
+        if duracion is not None:
+            self._sumar_duracion(fecha, id_empleado, duracion, signo)
+
+    def _sumar_consulta(self, aporte: AporteConsulta, signo: int):
+        fecha, especie = aporte
+        if especie is not None:
+            self._sumar(fecha, CONSULTAS, especie, signo)
+
+    def _sumar_factura(self, aporte: AporteFactura, signo: int):
+        fecha, total = aporte
+        self._sumar_ingreso(fecha, total, signo)
+
+    # ------------------------------
+    # Consultas sobre los agregados
+    # ------------------------------
+
+    def ingresos(self, granularidad: str = "mes") -> Dict[str, float]:
+        """Ingresos cobrados por periodo."""
+        with self._lock:
+            return {p: m[INGRESOS]["total"] for p, m in sorted(self._tabla(granularidad).items())
+                    if m[INGRESOS]["total"]}
+
+    def facturas_pagadas(self, granularidad: str = "mes") -> Dict[str, int]:
+        """Número de facturas pagadas por periodo."""
+        with self._lock:
+            return {p: int(m[FACTURAS]["pagadas"]) for p, m in sorted(self._tabla(granularidad).items())
+                    if m[FACTURAS]["pagadas"]}
+
+    def citas_por_estado(self, granularidad: str = "mes") -> Dict[str, Dict[str, int]]:
+        """Citas por periodo y estado."""
+        with self._lock:
+            resultado = {}
+            for periodo, metricas in sorted(self._tabla(granularidad).items()):
+                conteo = {e: int(metricas[CITAS][e]) for e in Cita.ESTADOS_VALIDOS if metricas[CITAS][e]}
+                if conteo:
+                    resultado[periodo] = conteo
+            return resultado
+
+    def consultas_por_especie(self, granularidad: str = "mes") -> Dict[str, Dict[str, int]]:
+        """Consultas por periodo y especie."""
+        with self._lock:
+            resultado = {}
+            for periodo, metricas in sorted(self._tabla(granularidad).items()):
+                conteo = {e: int(n) for e, n in metricas[CONSULTAS].items() if n}
+                if conteo:
+                    resultado[periodo] = conteo
+            return resultado
+
+    def duracion_media_por_veterinario(self, desde: Optional[str] = None,
+                                       hasta: Optional[str] = None) -> Dict[int, timedelta]:
+        """
+        Duración media de las citas completadas por empleado.
+        `desde`/`hasta` son meses 'YYYY-MM' inclusivos.
+        """
+        segundos, citas = defaultdict(float), defaultdict(float)
+        with self._lock:
+            for periodo, metricas in self._agregados["mes"].items():
+                if (desde and periodo < desde) or (hasta and periodo > hasta):
+                    continue
+                for id_empleado, valor in metricas[DURACION].items():
+                    segundos[id_empleado] += valor
+                for id_empleado, valor in metricas[COMPLETADAS].items():
+                    citas[id_empleado] += valor
+        return {
+            id_empleado: timedelta(seconds=segundos[id_empleado] / n)
+            for id_empleado, n in sorted(citas.items()) if n
+        }
+
+    # ------------------------------
+    # Reconstrucción desde la base de datos
+    # ------------------------------
+
+    @perfilar()
+    def reconstruir(self, db) -> None:
+        """
+        Recalcula todos los agregados leyendo las tablas de la base de datos.
+        Se construye en un agregador aparte y se sustituye al final, de modo que
+        los lectores nunca ven un estado a medias; los cambios recibidos mientras
+        tanto se vuelven a aplicar sobre el resultado.
+        """
+        from src.database_conn.archivado import VistaHistorica
+
+        with self._lock:
+            self._durante_reconstruccion = []
+        try:
+            nuevo = KPIsClinica(self.bus)
+            nuevo._especies = {f["id_mascota"]: f["especie"]
+                               for f in db.fetch_all("SELECT id_mascota, especie FROM mascotas")}
+            # Claves leídas de las tablas vivas: si el archivador mueve un lote entre
+            # esta lectura y la del archivo, esas filas se ignoran al leer el archivo
+            vivas = {"citas": set(), "consultas": set(), "facturas": set()}
+            for fila in db.fetch_all(
+                "SELECT id_cita, fecha, hora, id_mascota, id_empleado, estado, hora_fin FROM citas"
+            ):
+                vivas["citas"].add(fila["id_cita"])
+                aporte = nuevo._citas[fila["id_cita"]] = nuevo._aporte_cita(fila)
+                nuevo._sumar_cita(aporte, 1)
+            consultas = db.fetch_all(
+                "SELECT co.id_consulta, co.id_cita, co.fecha_registro, m.especie FROM consultas co "
+                "JOIN citas ci ON ci.id_cita = co.id_cita "
+                "JOIN mascotas m ON m.id_mascota = ci.id_mascota"
+            )
+            for fila in consultas:
+                vivas["consultas"].add(fila["id_consulta"])
+                aporte = nuevo._aporte_consulta(fila)
+                if aporte is not None:
+                    nuevo._consultas[fila["id_consulta"]] = aporte
+                    nuevo._sumar_consulta(aporte, 1)
+            for fila in db.fetch_all(
+                "SELECT id_factura, total, fecha, metodo_pago FROM facturas WHERE metodo_pago IS NOT NULL"
+            ):
+                vivas["facturas"].add(fila["id_factura"])
+                aporte = nuevo._aporte_factura(fila)
+                if aporte is not None:
+                    nuevo._facturas[fila["id_factura"]] = aporte
+                    nuevo._sumar_factura(aporte, 1)
+
+            # Lo ya archivado sigue contando en los reportes históricos, pero no
+            # cambia: no hace falta recordar su aportación
+            historico = VistaHistorica(db)
+            if historico.particiones():
+                columnas = ("id_cita", "fecha", "hora", "id_empleado", "estado", "hora_fin")
+                for fila in historico.archivadas("citas", columnas):
+                    if fila["id_cita"] not in vivas["citas"]:
+                        nuevo._sumar_cita(nuevo._aporte_cita(fila), 1)
+                for fila in historico.consultas_archivadas_con_especie():
+                    if fila["id_consulta"] not in vivas["consultas"]:
+                        nuevo._sumar_consulta((_fecha(fila["fecha_registro"]), fila["especie"]), 1)
+                for fila in historico.archivadas("facturas", ("id_factura", "total", "fecha", "metodo_pago")):
+                    aporte = nuevo._aporte_factura(fila)
+                    if aporte is not None and fila["id_factura"] not in vivas["facturas"]:
+                        nuevo._sumar_factura(aporte, 1)
+        except BaseException:
+            with self._lock:
+                self._durante_reconstruccion = None
+            raise
+
+        with self._lock:
+            pendientes, self._durante_reconstruccion = self._durante_reconstruccion, None
+            self._agregados = nuevo._agregados
+            self._citas, self._consultas = nuevo._citas, nuevo._consultas
+            self._facturas, self._especies = nuevo._facturas, nuevo._especies
+            for evento in pendientes:
+                self._aplicar(evento)
+            self.ultima_reconstruccion = datetime.now()
+
+    # ------------------------------
+    # Utilidades internas (llamar con el lock tomado)
+    # ------------------------------
+
+    def _tabla(self, granularidad: str):
+        if granularidad not in GRANULARIDADES:
+            raise ValueError(f"Granularidad '{granularidad}' inválida. Debe ser una de {GRANULARIDADES}.")
+        return self._agregados[granularidad]
+
+    def _sumar(self, fecha: date, metrica: str, clave, delta: float):
+        for granularidad in GRANULARIDADES:
+            self._agregados[granularidad][_periodo(fecha, granularidad)][metrica][clave] += delta
+
+    def _sumar_ingreso(self, fecha: date, total: float, signo: int):
+        self._sumar(fecha, INGRESOS, "total", signo * total)
+        self._sumar(fecha, FACTURAS, "pagadas", signo)
+
+    def _sumar_duracion(self, fecha: date, id_empleado: int, duracion: timedelta, signo: int):
+        self._sumar(fecha, DURACION, id_empleado, signo * duracion.total_seconds())
+        self._sumar(fecha, COMPLETADAS, id_empleado, signo)
+
+    @staticmethod
+    def _duracion(fecha: date, hora_inicio, hora_fin) -> timedelta:
+        return datetime.combine(fecha, hora_fin) - datetime.combine(fecha, hora_inicio)
+
+
+# ------------------------------
+# Instancia compartida por el proceso (todas las sesiones de Streamlit)
+# ------------------------------
+
+_kpis: Optional[KPIsClinica] = None
+_kpis_lock = threading.Lock()
+
+
+def obtener_kpis(db=None) -> KPIsClinica:
+    """
+    Devuelve el agregador del proceso. La primera vez lo crea, lo conecta al bus
+    y lo reconstruye desde `db` (o desde la base de datos configurada en el entorno).
+    Si no se puede reconstruir lanza la excepción y no guarda nada: la siguiente
+    llamada lo vuelve a intentar en lugar de servir agregados vacíos.
+    """
+    global _kpis
+    with _kpis_lock:
+        if _kpis is None:
+            kpis = KPIsClinica()
+            kpis.conectar()  # Antes de leer: lo que cambie durante la reconstrucción no se pierde
+            # Los cambios de importaciones, archivado y demás procesos llegan por el registro compartido
+            iniciar_replicacion()
+            try:
+                if db is not None:
+                    kpis.reconstruir(db)
+                else:
+                    from src.database_conn.db_conn import DatabaseConnection
+
+                    db = DatabaseConnection.from_env()
+                    if not db.connect():
+                        raise ConnectionError("No se pudo conectar a la base de datos para calcular los KPIs.")
+                    try:
+                        kpis.reconstruir(db)
+                    finally:
+                        db.disconnect()
+            except BaseException:
+                kpis.desconectar()
+                raise
+            _kpis = kpis
+        return _kpis
+
+
+if __name__ == "__main__":
+    from src.database_conn.db_conn import DatabaseConnection
+
+    db = DatabaseConnection.from_env()
+    if not db.connect():
+        raise SystemExit("No se pudo conectar a la base de datos.")
+    try:
+        kpis = KPIsClinica()
+        kpis.reconstruir(db)
+    finally:
+        db.disconnect()
+    print("Ingresos por mes:", kpis.ingresos("mes"))
+    print("Citas por estado:", kpis.citas_por_estado("mes"))
+    print("Duración media por veterinario:", kpis.duracion_media_por_veterinario())
+    print("Consultas por especie:", kpis.consultas_por_especie("mes"))
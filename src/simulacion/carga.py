@@ -0,0 +1,309 @@
+"""
+Simulador de carga: N recepcionistas reservando citas y M veterinarios
+completándolas a la vez, cada uno en su propio hilo (como las sesiones de
+Streamlit). Informa del rendimiento y de los percentiles de latencia.
+
+    python -m src.simulacion.carga --recepcionistas 8 --veterinarios 4 --operaciones 500
+
+Con `--backend db` las sesiones trabajan contra la base de datos configurada en
+el entorno (CLINICA_DB_*), cada una con su conexión, en lugar de en memoria.
+"""
+import argparse
+import itertools
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from src.database_conn.repositorios import RepositorioCitas, reintentar_si_conflicto
+from src.entidades.administrativo.cita import Cita
+from src.excepciones.excepciones import FranjaOcupadaError
+from src.utils.fechas import parsear_fecha
+
+HORAS_AGENDA = tuple(f"{h:02d}:{m:02d}" for h in range(8, 20) for m in (0, 30))
+DURACION_CITA = timedelta(minutes=20)
+
+
+class Agenda(ABC):
+    """
+    Clase Abstracta Agenda
+    Propósito: Punto de acceso a las citas sobre el que actúa el simulador.
+
+    Principio SOLID:
+    - DIP (Inversión de Dependencias): El simulador no sabe si las citas viven en
+      memoria o en la base de datos.
+    """
+
+    @abstractmethod
+    def reservar(self, fecha: str, hora: str, motivo: str, id_mascota: int, id_empleado: int) -> Cita:
+        """Crea una cita pendiente. Lanza FranjaOcupadaError si la franja está ocupada."""
+
+    @abstractmethod
+    def completar(self, id_cita: int, hora_fin: str) -> None:
+        """Marca una cita como completada."""
+
+    @abstractmethod
+    def pendientes(self, id_empleado: int, limite: int = 10) -> List[Cita]:
+        """Citas pendientes de un empleado."""
+
+
+class AgendaEnMemoria(Agenda):
+    """Agenda en memoria protegida por un lock; referencia para comparar otras implementaciones."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._citas: Dict[int, Cita] = {}
+        self._franjas: Dict[tuple, int] = {}
+        self._pendientes: Dict[int, List[int]] = defaultdict(list)
+        self._siguiente_id = 1
+
+    def reservar(self, fecha, hora, motivo, id_mascota, id_empleado) -> Cita:
+        with self._lock:
+            clave = (id_empleado, fecha, hora)
+            if clave in self._franjas:
+                raise FranjaOcupadaError(id_empleado, fecha, hora)
+            cita = Cita(self._siguiente_id, fecha, hora, motivo, id_mascota, id_empleado)
+            self._siguiente_id += 1
+            self._citas[cita.id_cita] = cita
+            self._franjas[clave] = cita.id_cita
+            self._pendientes[id_empleado].append(cita.id_cita)
+            return cita
+
+    def completar(self, id_cita, hora_fin) -> None:
+        with self._lock:
+            cita = self._citas[id_cita]
+            cita.marcar_como_completada(hora_fin)
+            self._pendientes[cita.id_empleado].remove(id_cita)
+
+    def pendientes(self, id_empleado, limite=10) -> List[Cita]:
+        with self._lock:
+            return [self._citas[i] for i in self._pendientes[id_empleado][:limite]]
+
+
+class AgendaBaseDatos(Agenda):
+    """
+    Agenda persistida con `RepositorioCitas` (franjas únicas y control optimista).
+    Cada hilo usa su propia conexión, creada con `crear_conexion`.
+    """
+
+    def __init__(self, crear_conexion: Callable[[], Any], primer_id: int = 1):
+        self._crear_conexion = crear_conexion
+        self._local = threading.local()
+        self._ids = itertools.count(primer_id)
+        self._conexiones = []
+        self._lock = threading.Lock()
+
+    def _repositorio(self) -> RepositorioCitas:
+        if not hasattr(self._local, "repositorio"):
+            db = self._crear_conexion()
+            with self._lock:
+                self._conexiones.append(db)
+            self._local.repositorio = RepositorioCitas(db)
+        return self._local.repositorio
+
+    def reservar(self, fecha, hora, motivo, id_mascota, id_empleado) -> Cita:
+        with self._lock:
+            id_cita = next(self._ids)
+        cita = Cita(id_cita, fecha, hora, motivo, id_mascota, id_empleado)
+        self._repositorio().crear(cita)
+        return cita
+
+    def completar(self, id_cita, hora_fin) -> None:
+        repositorio = self._repositorio()
+
+        def completar():
+            cita = repositorio.obtener(id_cita)
+            cita.marcar_como_completada(hora_fin)
+            repositorio.guardar(cita)
+
+        reintentar_si_conflicto(completar)
+
+    def pendientes(self, id_empleado, limite=10) -> List[Cita]:
+        return self._repositorio().pendientes_de(id_empleado, limite)
+
+    def cerrar(self):
+        """Cierra las conexiones abiertas por los hilos."""
+        with self._lock:
+            for db in self._conexiones:
+                db.disconnect()
+            self._conexiones.clear()
+
+
+@dataclass
+class EstadisticasOperacion:
+    latencias: List[float] = field(default_factory=list)
+    conflictos: int = 0
+    errores: int = 0
+
+    def percentil(self, p: float) -> float:
+        """Percentil `p` (0-100) de las latencias en milisegundos."""
+        if not self.latencias:
+            return 0.0
+        ordenadas = sorted(self.latencias)
+        indice = min(len(ordenadas) - 1, max(0, round(p / 100 * len(ordenadas)) - 1))
+        return ordenadas[indice] * 1000
+
+
+@dataclass
+class InformeCarga:
+    duracion: float
+    operaciones: Dict[str, EstadisticasOperacion]
+
+    def rendimiento(self, operacion: str) -> float:
+        """Operaciones correctas por segundo."""
+        return len(self.operaciones[operacion].latencias) / self.duracion if self.duracion else 0.0
+
+    def __str__(self):
+        lineas = [f"Duración: {self.duracion:.2f} s",
+                  f"{'operación':<12} {'ok':>7} {'conflict.':>9} {'errores':>7} {'ops/s':>9} "
+                  f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>8}"]
+        for nombre, est in self.operaciones.items():
+            lineas.append(
+                f"{nombre:<12} {len(est.latencias):>7} {est.conflictos:>9} {est.errores:>7} "
+                f"{self.rendimiento(nombre):>9.1f} {est.percentil(50):>8.3f} {est.percentil(95):>8.3f} "
+                f"{est.percentil(99):>8.3f} {est.percentil(100):>8.3f}"
+            )
+        return "\n".join(lineas)
+
+
+class SimuladorCarga:
+    """
+    Clase SimuladorCarga
+    Propósito: Lanzar sesiones concurrentes de recepcionistas y veterinarios
+    contra una `Agenda` y medir cada operación.
+    """
+
+    def __init__(self, agenda: Agenda, n_recepcionistas: int = 4, n_veterinarios: int = 4,
+                 operaciones_por_sesion: int = 200, n_mascotas: int = 1000, dias: int = 5,
+                 desde: Optional[str] = None, semilla: int = 42):
+        self.agenda = agenda
+        self.n_recepcionistas = n_recepcionistas
+        self.n_veterinarios = n_veterinarios
+        self.operaciones_por_sesion = operaciones_por_sesion
+        self.n_mascotas = n_mascotas
+        inicio = parsear_fecha(desde) if desde else date.today()
+        self.dias = [(inicio + timedelta(days=d)).isoformat() for d in range(dias)]
+        self.semilla = semilla
+        self._estadisticas: Dict[str, EstadisticasOperacion] = {}
+        self._lock = threading.Lock()
+        self._reservas_terminadas = threading.Event()
+
+    def _registrar(self, operacion: str, latencias: EstadisticasOperacion):
+        with self._lock:
+            total = self._estadisticas.setdefault(operacion, EstadisticasOperacion())
+            total.latencias.extend(latencias.latencias)
+            total.conflictos += latencias.conflictos
+            total.errores += latencias.errores
+
+    def _sesion_recepcionista(self, indice: int):
+        rnd = random.Random(self.semilla * 100 + indice)
+        est = EstadisticasOperacion()
+        for _ in range(self.operaciones_por_sesion):
+            args = (rnd.choice(self.dias), rnd.choice(HORAS_AGENDA), "Revisión",
+                    rnd.randint(1, self.n_mascotas), rnd.randint(1, self.n_veterinarios))
+            inicio = time.perf_counter()
+            try:
+                self.agenda.reservar(*args)
+                est.latencias.append(time.perf_counter() - inicio)
+            except FranjaOcupadaError:
+                est.conflictos += 1
+            except Exception:
+                est.errores += 1
+        self._registrar("reservar", est)
+
+    def _sesion_veterinario(self, id_empleado: int):
+        est = EstadisticasOperacion()
+        while True:
+            pendientes = self.agenda.pendientes(id_empleado)
+            if not pendientes:
+                if self._reservas_terminadas.is_set():
+                    break
+                time.sleep(0.001)
+                continue
+            for cita in pendientes:
+                hora_fin = (datetime.combine(cita.fecha, cita.hora) + DURACION_CITA).strftime("%H:%M")
+                inicio = time.perf_counter()
+                try:
+                    self.agenda.completar(cita.id_cita, hora_fin)
+                    est.latencias.append(time.perf_counter() - inicio)
+                except Exception:
+                    est.errores += 1
+            if est.errores > self.operaciones_por_sesion:
+                break  # Evita un bucle infinito si la agenda falla siempre
+        self._registrar("completar", est)
+
+    def ejecutar(self) -> InformeCarga:
+        """Lanza todas las sesiones, espera a que terminen y devuelve el informe."""
+        self._estadisticas = {"reservar": EstadisticasOperacion(), "completar": EstadisticasOperacion()}
+        self._reservas_terminadas.clear()
+        recepcion = [threading.Thread(target=self._sesion_recepcionista, args=(i,))
+                     for i in range(self.n_recepcionistas)]
+        veterinarios = [threading.Thread(target=self._sesion_veterinario, args=(i,))
+                        for i in range(1, self.n_veterinarios + 1)]
+        inicio = time.perf_counter()
+        for hilo in recepcion + veterinarios:
+            hilo.start()
+        for hilo in recepcion:
+            hilo.join()
+        self._reservas_terminadas.set()
+        for hilo in veterinarios:
+            hilo.join()
+        return InformeCarga(time.perf_counter() - inicio, self._estadisticas)
+
+
+def _agenda_base_datos() -> AgendaBaseDatos:
+    """Agenda sobre la base de datos del entorno, con el esquema creado y IDs libres."""
+    from src.database_conn.db_conn import DatabaseConnection
+    from src.database_conn.esquema import crear_esquema
+
+    def crear_conexion():
+        db = DatabaseConnection.from_env()
+        if not db.connect():
+            raise SystemExit("No se pudo conectar a la base de datos.")
+        return db
+
+    db = crear_conexion()
+    try:
+        crear_esquema(db)
+        fila = db.fetch_one("SELECT COALESCE(MAX(id_cita), 0) AS ultimo FROM citas")
+    finally:
+        db.disconnect()
+    return AgendaBaseDatos(crear_conexion, primer_id=fila["ultimo"] + 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula recepcionistas y veterinarios concurrentes.")
+    parser.add_argument("--recepcionistas", type=int, default=8)
+    parser.add_argument("--veterinarios", type=int, default=4)
+    parser.add_argument("--operaciones", type=int, default=500, help="Reservas por recepcionista")
+    parser.add_argument("--dias", type=int, default=5)
+    parser.add_argument("--desde", help="Primer día de la agenda (por defecto, hoy)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--backend", choices=("memoria", "db"), default="memoria",
+                        help="Agenda en memoria o en la base de datos configurada en el entorno")
+    args = parser.parse_args(argv)
+
+    agenda = AgendaEnMemoria()
+    if args.backend == "db":
+        from src.eventos.transporte import iniciar_replicacion
+
+        agenda = _agenda_base_datos()
+        iniciar_replicacion(en_segundo_plano=False)
+    try:
+        simulador = SimuladorCarga(agenda, args.recepcionistas, args.veterinarios, args.operaciones,
+                                   dias=args.dias, desde=args.desde, semilla=args.semilla)
+        print(simulador.ejecutar())
+    finally:
+        if isinstance(agenda, AgendaBaseDatos):
+            from src.eventos.transporte import detener_replicacion
+
+            detener_replicacion()
+            agenda.cerrar()
+
+
+if __name__ == "__main__":
+    main()
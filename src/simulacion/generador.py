@@ -0,0 +1,403 @@
+"""
+Generador determinista (con semilla) de un conjunto de datos completo de la clínica.
+
+Produce dueños con varias mascotas, empleados (veterinarios con `horario`) y la
+actividad diaria de la agenda: citas sin solapes por veterinario, con
+transiciones de estado válidas aplicadas a través de la propia entidad `Cita`,
+una consulta por cita completada y su `Factura` pagada con un método válido.
+
+Las filas se generan en streaming y se pueden volcar a CSV, a Parquet o
+cargar en bloque en la base de datos:
+
+    python -m src.simulacion.generador --duenos 10000 --formato csv --salida datos/
+"""
+import argparse
+import csv
+import os
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.database_conn.esquema import COLUMNAS, ORDEN_TABLAS, sentencia_insert
+from src.entidades.administrativo.cita import Cita
+from src.entidades.administrativo.factura import Factura
+from src.utils.fechas import parsear_fecha
+
+NOMBRES = ("Ana", "Luis", "Marta", "Jorge", "Lucía", "Pablo", "Elena", "Sergio", "Carmen", "Diego",
+           "Laura", "Javier", "Sara", "Andrés", "Paula", "Raúl")
+APELLIDOS = ("García", "López", "Martín", "Sánchez", "Pérez", "Gómez", "Ruiz", "Díaz", "Moreno",
+             "Álvarez", "Romero", "Navarro", "Torres", "Gil")
+CALLES = ("Mayor", "Real", "del Sol", "de la Paz", "Nueva", "Alcalá", "Gran Vía", "del Carmen")
+NOMBRES_MASCOTA = ("Luna", "Max", "Coco", "Rocky", "Nala", "Toby", "Kira", "Simba", "Lola", "Bruno",
+                   "Milo", "Chispa", "Canela", "Thor")
+ESPECIES = {
+    "Perro": (("Labrador", "Pastor Alemán", "Beagle", "Mestizo", "Bulldog"), (4.0, 45.0)),
+    "Gato": (("Europeo", "Siamés", "Persa", "Maine Coon"), (2.0, 9.0)),
+    "Conejo": (("Belier", "Enano", "Rex"), (0.8, 5.0)),
+    "Ave": (("Periquito", "Canario", "Agaporni"), (0.02, 0.5)),
+}
+PESO_ESPECIES = (6, 4, 1, 1)
+MOTIVOS = ("Vacunación", "Revisión anual", "Desparasitación", "Cojera", "Vómitos",
+           "Control de peso", "Problemas de piel", "Seguimiento")
+DIAGNOSTICOS = ("Sano", "Otitis", "Gastroenteritis", "Dermatitis", "Sobrepeso", "Esguince")
+TRATAMIENTOS = ("Ninguno", "Antibiótico 7 días", "Dieta blanda", "Antiinflamatorio", "Reposo")
+SERVICIOS = (("Consulta general", 35.0), ("Vacuna", 25.0), ("Analítica", 60.0),
+             ("Radiografía", 80.0), ("Desparasitación", 15.0), ("Ecografía", 70.0))
+ESPECIALIDADES = ("Medicina general", "Cirugía", "Dermatología", "Traumatología", "Exóticos")
+HORARIOS = ("08:00-15:00", "15:00-22:00")
+IMPUESTOS = 0.21
+
+_LETRAS_DNI = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+@dataclass
+class ConfiguracionClinica:
+    """Parámetros del conjunto de datos a generar."""
+    n_duenos: int = 1000
+    mascotas_por_dueno: Tuple[int, int] = (1, 4)
+    n_veterinarios: int = 8
+    n_enfermeros: int = 4
+    n_recepcionistas: int = 3
+    n_conserjes: int = 1
+    desde: str = "2024-01-01"
+    dias: int = 365
+    hoy: Optional[str] = None  # Citas anteriores se cierran; posteriores quedan pendientes
+    ocupacion: float = 0.6     # Probabilidad de que una franja de la agenda esté reservada
+    minutos_franja: int = 30
+    semilla: int = 42
+
+
+def _dni(numero: int) -> str:
+    return f"{numero:08d}{_LETRAS_DNI[numero % 23]}"
+
+
+class GeneradorClinica:
+    """
+    Clase GeneradorClinica
+    Propósito: Generar en streaming un conjunto de datos coherente de la clínica.
+
+    La misma configuración (incluida la semilla) produce siempre las mismas filas.
+    """
+
+    def __init__(self, config: Optional[ConfiguracionClinica] = None):
+        self.config = config or ConfiguracionClinica()
+        self._hoy = parsear_fecha(self.config.hoy) if self.config.hoy else date.today()
+        self.n_mascotas = sum(self._conteo_mascotas())
+        self.n_empleados = (self.config.n_veterinarios + self.config.n_enfermeros
+                            + self.config.n_recepcionistas + self.config.n_conserjes)
+
+    def _rnd(self, desplazamiento: int) -> random.Random:
+        # Un generador independiente por tabla: cambiar una tabla no altera las demás
+        return random.Random(self.config.semilla * 1000 + desplazamiento)
+
+    def _conteo_mascotas(self) -> Iterator[int]:
+        rnd = self._rnd(1)
+        minimo, maximo = self.config.mascotas_por_dueno
+        for _ in range(self.config.n_duenos):
+            yield rnd.randint(minimo, maximo)
+
+    # ------------------------------
+    # Tablas maestras
+    # ------------------------------
+
+    def duenos(self) -> Iterator[dict]:
+        rnd = self._rnd(2)
+        for i in range(1, self.config.n_duenos + 1):
+            nacimiento = date(1945, 1, 1) + timedelta(days=rnd.randrange(365 * 58))
+            yield {
+                "id_dueno": i,
+                "nombre": f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}",
+                "dni": _dni(i),
+                "telefono": f"6{rnd.randrange(10 ** 8):08d}",
+                "email": f"cliente{i}@example.com",
+                "fecha_nacimiento": nacimiento.isoformat(),
+                "direccion": f"Calle {rnd.choice(CALLES)} {rnd.randrange(1, 200)}",
+            }
+
+    def mascotas(self) -> Iterator[dict]:
+        rnd = self._rnd(3)
+        # Nacidas como mínimo dos meses antes de la primera cita generada
+        primer_dia = parsear_fecha(self.config.desde)
+        id_mascota = 0
+        for id_dueno, cantidad in enumerate(self._conteo_mascotas(), start=1):
+            for _ in range(cantidad):
+                id_mascota += 1
+                especie = rnd.choices(tuple(ESPECIES), weights=PESO_ESPECIES)[0]
+                razas, (peso_min, peso_max) = ESPECIES[especie]
+                nacimiento = primer_dia - timedelta(days=rnd.randrange(60, 365 * 16))
+                yield {
+                    "id_mascota": id_mascota,
+                    "nombre": rnd.choice(NOMBRES_MASCOTA),
+                    "especie": especie,
+                    "raza": rnd.choice(razas),
+                    "fecha_nacimiento": nacimiento.isoformat(),
+                    "peso": round(rnd.uniform(peso_min, peso_max), 2),
+                    "sexo": rnd.choice(("M", "H")),
+                    "id_dueno": id_dueno,
+                }
+
+    def empleados(self) -> Iterator[dict]:
+        """Los veterinarios ocupan los primeros IDs (1..n_veterinarios)."""
+        rnd = self._rnd(4)
+        c = self.config
+        tipos = (["Veterinario"] * c.n_veterinarios + ["Enfermero"] * c.n_enfermeros
+                 + ["Recepcionista"] * c.n_recepcionistas + ["Conserje"] * c.n_conserjes)
+        for i, tipo in enumerate(tipos, start=1):
+            nacimiento = date(1960, 1, 1) + timedelta(days=rnd.randrange(365 * 40))
+            fila = dict.fromkeys(COLUMNAS["empleados"])
+            fila.update({
+                "id_empleado": i,
+                "nombre": f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}",
+                "dni": _dni(90_000_000 + i),
+                "telefono": f"7{rnd.randrange(10 ** 8):08d}",
+                "email": f"empleado{i}@clinica.example.com",
+                "fecha_nacimiento": nacimiento.isoformat(),
+                "salario": float(rnd.randrange(1_300, 3_500, 50)),
+                "tipo_empleado": tipo,
+                "usuario": f"empleado{i}",
+            })
+            if tipo == "Veterinario":
+                fila.update(especialidad=rnd.choice(ESPECIALIDADES), num_colegiado=f"COL-{10000 + i}",
+                            horario=HORARIOS[i % len(HORARIOS)])
+            elif tipo == "Recepcionista":
+                fila["horario"] = HORARIOS[i % len(HORARIOS)]
+            else:
+                fila["turno"] = rnd.choice(("diurno", "nocturno"))
+                if tipo == "Enfermero":
+                    fila["area_asignada"] = rnd.choice(("Quirófano", "Hospitalización", "Consultas"))
+            yield fila
+
+    # ------------------------------
+    # Actividad de la agenda
+    # ------------------------------
+
+    def franjas(self, horario: str) -> List[str]:
+        """Horas de inicio de las franjas de un horario 'HH:MM-HH:MM'."""
+        inicio, fin = (datetime.strptime(h, "%H:%M") for h in horario.split("-"))
+        paso = timedelta(minutes=self.config.minutos_franja)
+        horas = []
+        while inicio + paso <= fin:
+            horas.append(inicio.strftime("%H:%M"))
+            inicio += paso
+        return horas
+
+    def actividad(self) -> Iterator[Tuple[str, dict]]:
+        """
+        Recorre la agenda día a día y genera ("citas" | "consultas" | "facturas", fila).
+        Cada veterinario tiene como mucho una cita por franja de su horario.
+        Sin mascotas no hay a quién dar cita, así que no se genera actividad.
+        """
+        c = self.config
+        if not self.n_mascotas:
+            return
+        rnd = self._rnd(5)
+        agenda = {i: self.franjas(HORARIOS[i % len(HORARIOS)]) for i in range(1, c.n_veterinarios + 1)}
+        id_cita = id_consulta = id_factura = 0
+        dia = parsear_fecha(c.desde)
+        for _ in range(c.dias):
+            texto_dia = dia.isoformat()
+            for id_empleado, horas in agenda.items():
+                for hora in horas:
+                    if rnd.random() >= c.ocupacion:
+                        continue
+                    id_cita += 1
+                    cita = Cita(id_cita, texto_dia, hora, rnd.choice(MOTIVOS),
+                                rnd.randint(1, self.n_mascotas), id_empleado)
+                    if dia < self._hoy:
+                        if rnd.random() < 0.9:
+                            cita.marcar_como_completada(self._hora_fin(rnd, cita))
+                        else:
+                            cita.cancelar()
+                    elif rnd.random() < 0.05:
+                        cita.cancelar()
+                    yield "citas", self._fila_cita(cita)
+
+                    if cita.estado != "completada":
+                        continue
+                    id_consulta += 1
+                    id_factura += 1
+                    factura = Factura(id_factura, id_consulta)
+                    factura.calcular_total(
+                        [{"descripcion": d, "precio": p} for d, p in rnd.sample(SERVICIOS, rnd.randint(1, 3))],
+                        impuestos=IMPUESTOS,
+                    )
+                    factura.registrar_pago(rnd.choice(Factura.METODOS_PAGO_VALIDOS), texto_dia)
+                    yield "consultas", {
+                        "id_consulta": id_consulta,
+                        "id_cita": id_cita,
+                        "diagnostico": rnd.choice(DIAGNOSTICOS),
+                        "tratamiento": rnd.choice(TRATAMIENTOS),
+                        "observaciones": "",
+                        "id_factura": id_factura,
+                        "fecha_registro": f"{texto_dia} {cita._hora_fin.strftime('%H:%M')}:00",
+                    }
+                    yield "facturas", {
+                        "id_factura": id_factura,
+                        "id_consulta": id_consulta,
+                        "total": round(factura.total, 2),
+                        "fecha": factura.fecha.strftime("%Y-%m-%d"),
+                        "metodo_pago": factura.metodo_pago,
+                    }
+            dia += timedelta(days=1)
+
+    def _hora_fin(self, rnd: random.Random, cita: Cita) -> str:
+        inicio = datetime.combine(cita.fecha, cita.hora)
+        return (inicio + timedelta(minutes=rnd.randint(10, self.config.minutos_franja))).strftime("%H:%M")
+
+    @staticmethod
+    def _fila_cita(cita: Cita) -> dict:
+        return {
+            "id_cita": cita.id_cita,
+            "fecha": cita.fecha.isoformat(),
+            "hora": cita.hora.strftime("%H:%M"),
+            "motivo": cita.motivo,
+            "id_mascota": cita.id_mascota,
+            "id_empleado": cita.id_empleado,
+            "estado": cita.estado,
+            "hora_fin": cita._hora_fin.strftime("%H:%M") if cita._hora_fin else None,
+        }
+
+    def filas(self) -> Iterator[Tuple[str, dict]]:
+        """Todas las filas como (tabla, fila), en un orden que respeta las claves foráneas."""
+        for tabla, generador in (("duenos", self.duenos), ("mascotas", self.mascotas),
+                                 ("empleados", self.empleados)):
+            for fila in generador():
+                yield tabla, fila
+        yield from self.actividad()
+
+
+# ------------------------------
+# Destinos de volcado
+# ------------------------------
+
+def exportar_csv(generador: GeneradorClinica, directorio: str) -> Dict[str, int]:
+    """Escribe un CSV por tabla en `directorio`. Devuelve las filas escritas por tabla."""
+    os.makedirs(directorio, exist_ok=True)
+    ficheros, escritores, conteo = {}, {}, dict.fromkeys(ORDEN_TABLAS, 0)
+    try:
+        for tabla in ORDEN_TABLAS:
+            ficheros[tabla] = open(os.path.join(directorio, f"{tabla}.csv"), "w", newline="", encoding="utf-8")
+            escritores[tabla] = csv.DictWriter(ficheros[tabla], fieldnames=COLUMNAS[tabla])
+            escritores[tabla].writeheader()
+        for tabla, fila in generador.filas():
+            escritores[tabla].writerow(fila)
+            conteo[tabla] += 1
+    finally:
+        for fichero in ficheros.values():
+            fichero.close()
+    return conteo
+
+
+def _tipo_parquet(pa, columna: str):
+    if columna.startswith("id_"):
+        return pa.int64()
+    if columna in ("peso", "salario", "total"):
+        return pa.float64()
+    return pa.string()
+
+
+def exportar_parquet(generador: GeneradorClinica, directorio: str, tam_lote: int = 50_000) -> Dict[str, int]:
+    """Escribe un fichero Parquet por tabla en lotes de `tam_lote` filas (requiere pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Exportar a Parquet requiere pyarrow (pip install pyarrow).") from e
+
+    os.makedirs(directorio, exist_ok=True)
+    esquemas = {t: pa.schema([(c, _tipo_parquet(pa, c)) for c in COLUMNAS[t]]) for t in ORDEN_TABLAS}
+    escritores = {t: pq.ParquetWriter(os.path.join(directorio, f"{t}.parquet"), esquemas[t])
+                  for t in ORDEN_TABLAS}
+    lotes: Dict[str, List[dict]] = {t: [] for t in ORDEN_TABLAS}
+    conteo = dict.fromkeys(ORDEN_TABLAS, 0)
+
+    def volcar(tabla):
+        if lotes[tabla]:
+            escritores[tabla].write_table(pa.Table.from_pylist(lotes[tabla], schema=esquemas[tabla]))
+            lotes[tabla] = []
+
+    try:
+        for tabla, fila in generador.filas():
+            lotes[tabla].append(fila)
+            conteo[tabla] += 1
+            if len(lotes[tabla]) >= tam_lote:
+                volcar(tabla)
+        for tabla in ORDEN_TABLAS:
+            volcar(tabla)
+    finally:
+        for escritor in escritores.values():
+            escritor.close()
+    return conteo
+
+
+def cargar_en_db(generador: GeneradorClinica, db, tam_lote: int = 5_000) -> Dict[str, int]:
+    """
+    Inserta todas las filas con `execute_many` en lotes de `tam_lote`.
+    Antes de volcar un lote se vuelcan los de las tablas de las que depende.
+    Las citas no canceladas reservan además su franja en `franjas_agenda`.
+    """
+    orden = ORDEN_TABLAS[:ORDEN_TABLAS.index("citas") + 1] + ("franjas_agenda",) \
+        + ORDEN_TABLAS[ORDEN_TABLAS.index("citas") + 1:]
+    lotes: Dict[str, List[tuple]] = {t: [] for t in orden}
+    conteo = dict.fromkeys(ORDEN_TABLAS, 0)
+    sentencias = {t: sentencia_insert(t) for t in orden}
+
+    def volcar_hasta(tabla):
+        for t in orden[:orden.index(tabla) + 1]:
+            if lotes[t]:
+                if not db.execute_many(sentencias[t], lotes[t]):
+                    raise RuntimeError(f"Falló la carga de un lote en la tabla '{t}'.")
+                lotes[t] = []
+
+    for tabla, fila in generador.filas():
+        lotes[tabla].append(tuple(fila[c] for c in COLUMNAS[tabla]))
+        conteo[tabla] += 1
+        if tabla == "citas" and fila["estado"] != "cancelada":
+            lotes["franjas_agenda"].append((fila["id_empleado"], fila["fecha"], fila["hora"], fila["id_cita"]))
+            if len(lotes["franjas_agenda"]) >= tam_lote:
+                volcar_hasta("franjas_agenda")
+        if len(lotes[tabla]) >= tam_lote:
+            volcar_hasta(tabla)
+    volcar_hasta(orden[-1])
+    return conteo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un conjunto de datos sintético de la clínica.")
+    parser.add_argument("--duenos", type=int, default=1000)
+    parser.add_argument("--veterinarios", type=int, default=8)
+    parser.add_argument("--desde", default="2024-01-01")
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--hoy", help="Fecha de referencia (por defecto, hoy)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--formato", choices=("csv", "parquet", "db"), default="csv")
+    parser.add_argument("--salida", default="datos_sinteticos")
+    args = parser.parse_args(argv)
+
+    generador = GeneradorClinica(ConfiguracionClinica(
+        n_duenos=args.duenos, n_veterinarios=args.veterinarios, desde=args.desde,
+        dias=args.dias, hoy=args.hoy, semilla=args.semilla,
+    ))
+    if args.formato == "csv":
+        conteo = exportar_csv(generador, args.salida)
+    elif args.formato == "parquet":
+        conteo = exportar_parquet(generador, args.salida)
+    else:
+        from src.database_conn.db_conn import DatabaseConnection
+        from src.database_conn.esquema import crear_esquema
+
+        db = DatabaseConnection.from_env()
+        if not db.connect():
+            raise SystemExit("No se pudo conectar a la base de datos.")
+        try:
+            crear_esquema(db)
+            conteo = cargar_en_db(generador, db)
+        finally:
+            db.disconnect()
+    for tabla, filas in conteo.items():
+        print(f"{tabla:<10} {filas:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+
+FORMATO_FECHA = "%Y-%m-%d"
+FORMATO_HORA = "%H:%M"
+
+# Tamaño de las cachés LRU. Las fechas y horas se repiten mucho al hidratar
+# filas (mismo día de agenda, mismas franjas de 30 minutos), así que una caché
+# pequeña basta para acertar casi siempre.
+TAMANO_CACHE_FECHAS = 4096
+TAMANO_CACHE_HORAS = 2048
+
+
+def parsear_fecha(valor: str) -> date:
+    """
+    Convierte una cadena 'YYYY-MM-DD' en `date`.
+    Equivale a `datetime.strptime(valor, "%Y-%m-%d").date()`, con los mismos errores.
+    """
+    if type(valor) is not str:
+        # Delegamos en strptime para conservar el TypeError original
+        return datetime.strptime(valor, FORMATO_FECHA).date()
+    return _parsear_fecha_cacheada(valor)
+
+
+def parsear_hora(valor: str) -> time:
+    """
+    Convierte una cadena 'HH:MM' en `time`.
+    Equivale a `datetime.strptime(valor, "%H:%M").time()`, con los mismos errores.
+    """
+    if type(valor) is not str:
+        return datetime.strptime(valor, FORMATO_HORA).time()
+    return _parsear_hora_cacheada(valor)
+
+
+def a_texto_fecha(valor) -> str:
+    """
+    Normaliza un valor de fecha leído de la base de datos (date, datetime o str)
+    al formato 'YYYY-MM-DD' que esperan los constructores de las entidades.
+    """
+    if isinstance(valor, (date, datetime)):
+        return valor.strftime(FORMATO_FECHA)
+    return str(valor)[:10]
+
+
+def a_texto_hora(valor) -> str:
+    """
+    Normaliza un valor de hora leído de la base de datos al formato 'HH:MM'.
+    MySQL devuelve las columnas TIME como `timedelta`; SQLite, como texto 'HH:MM[:SS]'.
+    """
+    if isinstance(valor, timedelta):
+        minutos = int(valor.total_seconds()) // 60
+        return f"{minutos // 60:02d}:{minutos % 60:02d}"
+    if isinstance(valor, (time, datetime)):
+        return valor.strftime(FORMATO_HORA)
+    # Texto 'H:MM', 'HH:MM' o 'HH:MM:SS': sin segundos y con la hora a dos cifras
+    return parsear_hora(":".join(str(valor).split(":")[:2])).strftime(FORMATO_HORA)
+
+
+def limpiar_cache() -> None:
+    """Vacía las cachés de fechas y horas (útil en tests y benchmarks)."""
+    _parsear_fecha_cacheada.cache_clear()
+    _parsear_hora_cacheada.cache_clear()
+
+
+# ------------------------------
+# Implementación interna
+# ------------------------------
+
+@lru_cache(maxsize=TAMANO_CACHE_FECHAS)
+def _parsear_fecha_cacheada(valor: str) -> date:
+    # Camino rápido: formato canónico con relleno de ceros (el de la BD y los formularios)
+    if len(valor) == 10 and valor[4] == "-" and valor[7] == "-" and valor.isascii():
+        anio, mes, dia = valor[:4], valor[5:7], valor[8:]
+        if anio.isdigit() and mes.isdigit() and dia.isdigit():
+            try:
+                return date(int(anio), int(mes), int(dia))
+            except ValueError:
+                pass
+    # Cualquier otro caso (sin relleno, fechas imposibles, basura) lo resuelve
+    # strptime, que acepta exactamente lo mismo y lanza el mensaje de siempre.
+    return datetime.strptime(valor, FORMATO_FECHA).date()
+
+
+@lru_cache(maxsize=TAMANO_CACHE_HORAS)
+def _parsear_hora_cacheada(valor: str) -> time:
+    if len(valor) == 5 and valor[2] == ":" and valor.isascii():
+        horas, minutos = valor[:2], valor[3:]
+        if horas.isdigit() and minutos.isdigit():
+            try:
+                return time(int(horas), int(minutos))
+            except ValueError:
+                pass
+    return datetime.strptime(valor, FORMATO_HORA).time()
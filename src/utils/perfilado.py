@@ -0,0 +1,301 @@
+"""
+Perfilado opcional de las páginas de Streamlit y de las llamadas que hacen.
+
+Desactivado por defecto: cada sección medida cuesta solo una comprobación. Se
+activa con la variable de entorno CLINICA_PERFILADO=1 o llamando a `activar()`.
+
+    with pagina_perfilada("Citas"):        # una ejecución (rerun) de la página
+        with perfilar("tabla de citas"):  # sección con nombre
+            ...
+
+    @perfilar()                           # en métodos: "Clase.metodo"
+    def guardar(self, entidad): ...
+
+Las secciones se anidan en un árbol por ejecución. `pagina_perfilada` muestra al
+final, en la barra lateral, el desglose tipo flame graph de la ejecución y
+permite volcar un cProfile de la siguiente. Sin Streamlit, el mismo volcado se
+obtiene desde la línea de comandos:
+
+    python -m src.utils.perfilado pages/Citas.py --repeticiones 5 --salida perfiles
+"""
+import argparse
+import cProfile
+import inspect
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+VARIABLE_ENTORNO = "CLINICA_PERFILADO"
+HISTORIAL_POR_PAGINA = 50
+
+_activo = os.environ.get(VARIABLE_ENTORNO, "").lower() not in ("", "0", "false", "no")
+_hilo = threading.local()
+_historial: Dict[str, Deque["Ejecucion"]] = defaultdict(lambda: deque(maxlen=HISTORIAL_POR_PAGINA))
+_historial_lock = threading.Lock()
+
+
+def activar(valor: bool = True) -> None:
+    global _activo
+    _activo = valor
+
+
+def activo() -> bool:
+    return _activo
+
+
+# ------------------------------
+# Árbol de secciones
+# ------------------------------
+
+@dataclass
+class NodoPerfil:
+    nombre: str
+    total: float = 0.0
+    llamadas: int = 0
+    hijos: Dict[str, "NodoPerfil"] = field(default_factory=dict)
+
+    @property
+    def propio(self) -> float:
+        """Tiempo no atribuido a ninguna subsección."""
+        return max(0.0, self.total - sum(h.total for h in self.hijos.values()))
+
+    def hijo(self, nombre: str) -> "NodoPerfil":
+        nodo = self.hijos.get(nombre)
+        if nodo is None:
+            nodo = self.hijos[nombre] = NodoPerfil(nombre)
+        return nodo
+
+    def fundir(self, otro: "NodoPerfil") -> None:
+        """Suma los tiempos de `otro` (mismo nombre) a este nodo, recursivamente."""
+        self.total += otro.total
+        self.llamadas += otro.llamadas
+        for nombre, hijo in otro.hijos.items():
+            self.hijo(nombre).fundir(hijo)
+
+    def recorrer(self, profundidad: int = 0) -> Iterator[Tuple[int, "NodoPerfil"]]:
+        """Nodos en profundidad, los hijos ordenados de más a menos costosos."""
+        yield profundidad, self
+        for hijo in sorted(self.hijos.values(), key=lambda h: h.total, reverse=True):
+            yield from hijo.recorrer(profundidad + 1)
+
+
+@dataclass
+class Ejecucion:
+    """Una ejecución completa (rerun) de una página."""
+
+    pagina: str
+    inicio: datetime
+    raiz: NodoPerfil
+    volcado: Optional[str] = None  # Fichero .prof, si se pidió cProfile
+
+    @property
+    def total(self) -> float:
+        return self.raiz.total
+
+
+class perfilar:
+    """
+    Mide una sección con nombre dentro de la ejecución en curso. Se usa como
+    gestor de contexto o como decorador; fuera de una ejecución, o con el
+    perfilado desactivado, no mide nada.
+    """
+
+    __slots__ = ("nombre", "_nodo", "_inicio")
+
+    def __init__(self, nombre: Optional[str] = None):
+        self.nombre = nombre
+        self._nodo: Optional[NodoPerfil] = None
+
+    def __enter__(self) -> "perfilar":
+        pila = getattr(_hilo, "pila", None) if _activo else None
+        if pila:
+            self._nodo = pila[-1].hijo(self.nombre)
+            pila.append(self._nodo)
+            self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        if self._nodo is not None:
+            self._nodo.total += time.perf_counter() - self._inicio
+            self._nodo.llamadas += 1
+            _hilo.pila.pop()
+            self._nodo = None
+        return False
+
+    def __call__(self, funcion: Callable) -> Callable:
+        nombre = self.nombre
+        parametros = list(inspect.signature(funcion).parameters)
+        es_metodo = nombre is None and parametros[:1] == ["self"]
+        if nombre is None:
+            nombre = funcion.__qualname__
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _activo:
+                return funcion(*args, **kwargs)
+            # En métodos heredados se usa la clase real: RepositorioCitas.guardar
+            seccion = f"{type(args[0]).__name__}.{funcion.__name__}" if es_metodo else nombre
+            with perfilar(seccion):
+                return funcion(*args, **kwargs)
+
+        return envoltura
+
+
+@contextmanager
+def ejecucion(pagina: str, volcar_en: Optional[str] = None):
+    """
+    Agrupa las secciones medidas en este hilo durante el bloque en una
+    `Ejecucion` de `pagina`, que queda en el historial. Con `volcar_en`
+    también se perfila con cProfile y se guarda el .prof en ese directorio.
+    Devuelve None si el perfilado está desactivado.
+    """
+    if not _activo:
+        yield None
+        return
+    actual = Ejecucion(pagina, datetime.now(), NodoPerfil(pagina))
+    pila_anterior = getattr(_hilo, "pila", None)
+    _hilo.pila = [actual.raiz]
+    perfil = cProfile.Profile() if volcar_en else None
+    if perfil:
+        try:
+            perfil.enable()
+        except ValueError:
+            perfil = None  # Otra sesión ya está perfilando: solo puede haber un perfilador activo
+    inicio = time.perf_counter()
+    try:
+        yield actual
+    finally:
+        if perfil:
+            perfil.disable()
+        actual.raiz.total = time.perf_counter() - inicio
+        actual.raiz.llamadas = 1
+        _hilo.pila = pila_anterior
+        if perfil:
+            os.makedirs(volcar_en, exist_ok=True)
+            actual.volcado = os.path.join(volcar_en, f"{pagina}-{actual.inicio:%Y%m%d-%H%M%S-%f}.prof")
+            perfil.dump_stats(actual.volcado)
+        with _historial_lock:
+            _historial[pagina].append(actual)
+
+
+def ultimas(pagina: str, n: int = HISTORIAL_POR_PAGINA) -> List[Ejecucion]:
+    """Últimas `n` ejecuciones registradas de `pagina`, de la más antigua a la más reciente."""
+    with _historial_lock:
+        return list(_historial[pagina])[-n:]
+
+
+def acumulado(pagina: str, n: int = HISTORIAL_POR_PAGINA) -> NodoPerfil:
+    """Suma de los árboles de las últimas `n` ejecuciones de `pagina`."""
+    raiz = NodoPerfil(pagina)
+    for anterior in ultimas(pagina, n):
+        raiz.fundir(anterior.raiz)
+    return raiz
+
+
+def limpiar_historial() -> None:
+    with _historial_lock:
+        _historial.clear()
+
+
+def desglose(raiz: NodoPerfil, ancho: int = 24, minimo: float = 0.01) -> str:
+    """
+    Desglose en texto, estilo flame graph: una fila por sección, sangrada por
+    nivel, con una barra proporcional a su parte del total. Omite las
+    secciones por debajo de `minimo` (fracción del total).
+    """
+    lineas = []
+    for profundidad, nodo in raiz.recorrer():
+        fraccion = nodo.total / raiz.total if raiz.total else 0.0
+        if profundidad and fraccion < minimo:
+            continue
+        barra = "█" * max(1, round(fraccion * ancho)) if nodo.total else ""
+        etiqueta = f"{'  ' * profundidad}{nodo.nombre}"
+        lineas.append(f"{etiqueta:<40.40} {barra:<{ancho}} {nodo.total * 1000:9.2f} ms "
+                      f"{fraccion:6.1%}  x{nodo.llamadas}")
+    return "\n".join(lineas)
+
+
+# ------------------------------
+# Integración con Streamlit
+# ------------------------------
+
+DIRECTORIO_VOLCADOS = "perfiles"
+
+
+@contextmanager
+def pagina_perfilada(pagina: str):
+    """
+    Envuelve el script de una página. Con el perfilado activo, mide la
+    ejecución y al terminar añade el panel de depuración a la barra lateral.
+    """
+    if not _activo:
+        yield
+        return
+    import streamlit as st
+
+    volcar = st.session_state.pop("perfilado_volcar", False)
+    with ejecucion(pagina, DIRECTORIO_VOLCADOS if volcar else None) as actual:
+        yield
+    mostrar_panel(actual)
+
+
+def mostrar_panel(actual: Ejecucion) -> None:
+    import streamlit as st
+
+    with st.sidebar.expander(f"Perfilado · {actual.total * 1000:.1f} ms", expanded=False):
+        modo = st.radio("Ejecuciones", ("última", "acumulado"), horizontal=True, key="perfilado_modo")
+        raiz = actual.raiz if modo == "última" else acumulado(actual.pagina)
+        st.code(desglose(raiz), language=None)
+        anteriores = [e.total * 1000 for e in ultimas(actual.pagina)]
+        if len(anteriores) > 1:
+            st.line_chart(anteriores, height=120)
+        if actual.volcado:
+            st.caption(f"cProfile guardado en {actual.volcado}")
+        if st.button("Volcar cProfile de la siguiente ejecución", key="perfilado_boton"):
+            st.session_state["perfilado_volcar"] = True
+            st.rerun()
+
+
+# ------------------------------
+# Línea de comandos
+# ------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfila un script de página con cProfile.")
+    parser.add_argument("script", help="Por ejemplo pages/Citas.py")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--salida", default=DIRECTORIO_VOLCADOS, help="Directorio de los .prof")
+    parser.add_argument("--top", type=int, default=25, help="Funciones a listar por tiempo acumulado")
+    args = parser.parse_args(argv)
+
+    import runpy
+
+    sys.path.insert(0, os.getcwd())  # Las páginas importan `src.` desde la raíz del proyecto
+    activar()
+    pagina = os.path.splitext(os.path.basename(args.script))[0]
+    volcados = []
+    for _ in range(args.repeticiones):
+        with ejecucion(pagina, args.salida) as actual:
+            # Streamlit se ejecuta en "modo bare": las llamadas st.* no necesitan servidor
+            runpy.run_path(args.script, run_name="__main__")
+        volcados.append(actual.volcado)
+
+    print(desglose(acumulado(pagina, args.repeticiones)))
+    print(f"\nVolcados: {', '.join(volcados)}\n")
+    pstats.Stats(*volcados).sort_stats("cumulative").print_stats(args.top)
+
+
+if __name__ == "__main__":
+    # Con `python -m` este módulo es __main__; las páginas importan src.utils.perfilado,
+    # así que se usa esa instancia para que sus secciones lleguen a la misma ejecución
+    sys.path.insert(0, os.getcwd())
+    from src.utils.perfilado import main as _main
+    _main()
@@ -0,0 +1,44 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from benchmarks.__main__ import main
+from benchmarks.harness import Contexto, ejecutar
+
+
+class TestSuiteBenchmarks(unittest.TestCase):
+    """Prueba de humo: la suite corre a la escala mínima y su salida es coherente."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+
+    def test_grupo_a_escala_minima(self):
+        resultados = ejecutar(Contexto(escala="1k", rondas=1), grupos=["fechas"])
+        self.assertTrue(resultados)
+        for resultado in resultados:
+            self.assertEqual(resultado.grupo, "fechas")
+            self.assertIsNone(resultado.omitido)
+            self.assertEqual(resultado.rondas, 1)
+            self.assertGreater(resultado.minimo, 0)
+
+    def test_main_guarda_json_y_compara(self):
+        ruta = os.path.join(self.directorio, "base.json")
+        argumentos = ["--escala", "1k", "--rondas", "1", "--grupo", "entidades"]
+        with redirect_stdout(io.StringIO()) as salida:
+            self.assertEqual(main(argumentos + ["--json", ruta]), 0)
+            # Contra sí misma y con un umbral holgado no puede haber regresiones
+            self.assertEqual(main(argumentos + ["--comparar", ruta, "--umbral", "1000"]), 0)
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+        self.assertEqual(datos["meta"]["escala"], "1k")
+        self.assertTrue(all(r["grupo"] == "entidades" for r in datos["resultados"]))
+        self.assertIn("entidades.", salida.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,217 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from src.database_conn.archivado import Archivador, DestinoParquet, VistaHistorica
+from src.database_conn.db_conn import DatabaseConnection
+from src.database_conn.esquema import crear_esquema, sentencia_insert
+from src.database_conn.repositorios import RepositorioMascotas
+from src.eventos import cambios
+from src.eventos.bus import BusCambios
+from src.reportes.kpis import KPIsClinica
+
+try:
+    import pyarrow  # noqa: F401
+    HAY_PYARROW = True
+except ImportError:
+    HAY_PYARROW = False
+
+HOY = date(2025, 6, 1)
+
+
+class TestArchivador(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DatabaseConnection.sqlite(":memory:")
+        self.db.connect()
+        crear_esquema(self.db)
+        self.bus = BusCambios()
+        self.eventos = []
+        self.bus.suscribir(self.eventos.extend)
+        self._insertar("duenos", (1, "Ana", "123A", "600", "ana@x.es", "1990-01-01", "Calle 1"))
+        self._insertar("mascotas", (1, "Toby", "Perro", "Mestizo", "2018-01-01", 10.0, "M", 1))
+        self._insertar("mascotas", (2, "Misi", "Gato", "Común", "2019-01-01", 4.0, "H", 1))
+        # Citas 1-3: antiguas y cerradas; 4: antigua pero con factura sin pagar; 5: reciente
+        self._cita(1, "2023-03-10", 1, "completada", consulta=True, pagada=True)
+        self._cita(2, "2024-02-20", 2, "completada", consulta=True, pagada=True)
+        self._cita(3, "2024-04-01", 1, "cancelada")
+        self._cita(4, "2024-01-15", 1, "completada", consulta=True, pagada=False)
+        self._cita(5, "2025-05-20", 1, "completada", consulta=True, pagada=True)
+
+    def tearDown(self):
+        self.db.disconnect()
+
+    def _insertar(self, tabla, valores):
+        self.db.execute_query(sentencia_insert(tabla), valores)
+
+    def _cita(self, id_cita, fecha, id_mascota, estado, consulta=False, pagada=False):
+        self._insertar("citas", (id_cita, fecha, "10:00", "Revisión", id_mascota, 7, estado,
+                                 "10:30" if estado == "completada" else None))
+        if estado != "cancelada":
+            self._insertar("franjas_agenda", (7, fecha, "10:00", id_cita))
+        if consulta:
+            self._insertar("consultas", (id_cita * 10, id_cita, "Sano", "Nada", None, id_cita * 100,
+                                         f"{fecha} 10:35:00"))
+            self._insertar("facturas", (id_cita * 100, id_cita * 10, 35.0, fecha if pagada else None,
+                                        "tarjeta" if pagada else None))
+
+    def _ids(self, tabla, clave):
+        return [f[clave] for f in self.db.fetch_all(f"SELECT {clave} FROM {tabla} ORDER BY {clave}")]
+
+    def _archivador(self, **opciones):
+        opciones = {"horizonte_dias": 365, "pausa": 0, "hoy": HOY, "bus": self.bus, **opciones}
+        return Archivador(self.db, **opciones)
+
+    def test_archiva_grupos_cerrados_y_deja_los_pendientes_de_pago(self):
+        resultado = self._archivador().ejecutar()
+        self.assertEqual((resultado.citas, resultado.consultas, resultado.facturas), (3, 2, 2))
+        self.assertEqual(self._ids("citas", "id_cita"), [4, 5])
+        self.assertEqual(self._ids("consultas", "id_consulta"), [40, 50])
+        self.assertEqual(self._ids("facturas", "id_factura"), [400, 500])
+        self.assertEqual(self._ids("franjas_agenda", "id_cita"), [4, 5])
+        # Particionado por año de la cita, conservando la versión
+        self.assertEqual(self._ids("citas_archivo_2023", "id_cita"), [1])
+        self.assertEqual(self._ids("citas_archivo_2024", "id_cita"), [2, 3])
+        self.assertEqual(self._ids("facturas_archivo_2024", "id_factura"), [200])
+        self.assertEqual(self.db.fetch_one("SELECT version FROM citas_archivo_2023")["version"], 0)
+
+    def test_no_archiva_consultas_sin_factura(self):
+        self._insertar("citas", (6, "2023-05-05", "10:00", "Revisión", 1, 7, "completada", "10:30"))
+        self._insertar("consultas", (60, 6, "Sano", "Nada", None, None, "2023-05-05 10:35:00"))
+        self._archivador().ejecutar()
+        self.assertIn(6, self._ids("citas", "id_cita"))
+        self.assertIn(60, self._ids("consultas", "id_consulta"))
+
+    def test_lotes_acotados_y_registro_de_particiones(self):
+        resultado = self._archivador(tam_lote=1).ejecutar()
+        self.assertEqual(resultado.lotes, 3)
+        particiones = {(p.tabla, p.año): p.filas for p in VistaHistorica(self.db).particiones()}
+        self.assertEqual(particiones, {("citas", 2023): 1, ("consultas", 2023): 1, ("facturas", 2023): 1,
+                                       ("citas", 2024): 2, ("consultas", 2024): 1, ("facturas", 2024): 1})
+
+    def test_max_lotes(self):
+        self.assertEqual(self._archivador(tam_lote=1).ejecutar(max_lotes=2).citas, 2)
+        self.assertEqual(self._ids("citas", "id_cita"), [3, 4, 5])
+
+    def test_publica_las_eliminaciones(self):
+        self._archivador().ejecutar()
+        eliminadas = sorted((e.entidad, e.clave) for e in self.eventos if e.operacion == cambios.ELIMINAR)
+        self.assertEqual(eliminadas, [(cambios.CITA, 1), (cambios.CITA, 2), (cambios.CITA, 3),
+                                      (cambios.CONSULTA, 10), (cambios.CONSULTA, 20),
+                                      (cambios.FACTURA, 100), (cambios.FACTURA, 200)])
+
+    def test_conflicto_deshace_el_lote_y_reintenta(self):
+        archivador = self._archivador()
+        original = archivador._candidatas
+        llamadas = []
+
+        def candidatas_con_cambio_concurrente():
+            filas = original()
+            if not llamadas:
+                # Otra sesión modifica la cita entre la lectura y el borrado
+                self.db.execute_query("UPDATE citas SET version = version + 1 WHERE id_cita = 1")
+            llamadas.append(1)
+            return filas
+
+        with patch.object(archivador, "_candidatas", candidatas_con_cambio_concurrente):
+            resultado = archivador.ejecutar()
+        self.assertEqual(resultado.conflictos, 1)
+        self.assertEqual(resultado.citas, 3)
+        self.assertEqual(self.db.fetch_one("SELECT version FROM citas_archivo_2023")["version"], 1)
+
+    def test_sin_archivo_no_hay_particiones(self):
+        self.assertEqual(VistaHistorica(self.db).particiones(), [])
+
+    def test_otros_errores_al_leer_particiones_no_se_ocultan(self):
+        with patch.object(self.db, "fetch_all", side_effect=sqlite3.OperationalError("database is locked")):
+            with self.assertRaises(sqlite3.OperationalError):
+                VistaHistorica(self.db).particiones()
+
+    def test_historial_ordena_las_horas_sin_relleno(self):
+        self._insertar("citas", (6, "2025-06-01", "10:00", "Revisión", 2, 7, "pendiente", None))
+        self._insertar("citas", (7, "2025-06-01", "9:00:00", "Vacuna", 2, 7, "pendiente", None))
+        self.assertEqual([c["id_cita"] for c in VistaHistorica(self.db).citas_de_mascota(2)], [2, 7, 6])
+
+    def test_historial_de_mascota_incluye_lo_archivado(self):
+        self._archivador().ejecutar()
+        vista = VistaHistorica(self.db)
+        self.assertEqual([c["id_cita"] for c in vista.citas_de_mascota(1)], [1, 4, 3, 5])
+        self.assertEqual(vista.consultas_de_mascota(1), [10, 40, 50])
+        with patch.object(vista, "leer", wraps=vista.leer) as leer:
+            vista.consultas_de_mascota(1)
+        leidas = [c for c in leer.call_args_list if c.args[0].tabla == "consultas"]
+        self.assertEqual(len(leidas), len({c.args[0] for c in leidas}))
+        # Solo se leen las consultas de las citas de la mascota, no la partición entera
+        self.assertTrue(all(c.kwargs["en"]["id_cita"] for c in leidas))
+        with patch.object(self.db, "fetch_all", wraps=self.db.fetch_all) as fetch_all:
+            vista.consultas_de_mascota(1)
+        consultas = [c.args[0] for c in fetch_all.call_args_list if "FROM consultas_archivo" in c.args[0]]
+        self.assertTrue(consultas and all("id_cita IN (" in q for q in consultas))
+        mascota = RepositorioMascotas(self.db, self.bus).obtener(2)
+        self.assertEqual(RepositorioMascotas(self.db, self.bus).cargar_historial(mascota).historial_consultas, [20])
+
+    def test_reconstruir_kpis_incluye_lo_archivado(self):
+        antes = KPIsClinica()
+        antes.reconstruir(self.db)
+        self._archivador().ejecutar()
+        despues = KPIsClinica()
+        despues.reconstruir(self.db)
+        self.assertEqual(despues.ingresos("mes"), antes.ingresos("mes"))
+        self.assertEqual(despues.citas_por_estado("mes"), antes.citas_por_estado("mes"))
+        self.assertEqual(despues.consultas_por_especie("mes"), antes.consultas_por_especie("mes"))
+        self.assertEqual(despues.duracion_media_por_veterinario(), antes.duracion_media_por_veterinario())
+
+    def test_reconstruir_kpis_con_un_lote_archivado_a_mitad(self):
+        antes = KPIsClinica(self.bus)
+        antes.reconstruir(self.db)
+        leer = self.db.fetch_all
+
+        def fetch_all_con_archivado(query, params=None):
+            filas = leer(query, params)
+            if query.startswith("SELECT id_factura"):
+                # El archivador mueve un lote tras leer las tablas vivas y antes del archivo
+                self._archivador().ejecutar()
+            return filas
+
+        despues = KPIsClinica(self.bus)
+        with patch.object(self.db, "fetch_all", side_effect=fetch_all_con_archivado):
+            despues.reconstruir(self.db)
+        self.assertEqual(despues.citas_por_estado("mes"), antes.citas_por_estado("mes"))
+        self.assertEqual(despues.ingresos("mes"), antes.ingresos("mes"))
+        self.assertEqual(despues.consultas_por_especie("mes"), antes.consultas_por_especie("mes"))
+
+    @unittest.skipUnless(HAY_PYARROW, "requiere pyarrow")
+    def test_destino_parquet(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        self._archivador(destino=DestinoParquet(directorio)).ejecutar()
+        self.assertTrue(os.listdir(os.path.join(directorio, "citas")))
+        self.assertEqual(VistaHistorica(self.db).consultas_de_mascota(1), [10, 40, 50])
+
+    def test_parquet_normaliza_horas_y_fechas_de_mysql(self):
+        # MySQL devuelve TIME como timedelta y DATE/DATETIME como objetos
+        self.assertEqual(DestinoParquet._a_texto("hora")(timedelta(hours=8)), "08:00")
+        self.assertEqual(DestinoParquet._a_texto("hora_fin")(timedelta(hours=8, minutes=30)), "08:30")
+        self.assertEqual(DestinoParquet._a_texto("fecha")(date(2024, 2, 20)), "2024-02-20")
+        self.assertEqual(DestinoParquet._a_texto("fecha_registro")(datetime(2024, 2, 20, 10, 35, 0, 120)),
+                         "2024-02-20 10:35:00")
+
+    @unittest.skipUnless(HAY_PYARROW, "requiere pyarrow")
+    def test_parquet_archiva_horas_timedelta(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        destino = DestinoParquet(directorio)
+        fila = {"id_cita": 1, "fecha": date(2024, 2, 20), "hora": timedelta(hours=8), "motivo": "Revisión",
+                "id_mascota": 1, "id_empleado": 7, "estado": "completada",
+                "hora_fin": timedelta(hours=8, minutes=30), "version": 0}
+        particion = destino.escribir(self.db, "citas", 2024, [fila])
+        leida = destino.leer(self.db, particion, ("fecha", "hora", "hora_fin"))
+        self.assertEqual(leida, [{"fecha": "2024-02-20", "hora": "08:00", "hora_fin": "08:30"}])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
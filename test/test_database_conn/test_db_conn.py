@@ -1,12 +1,14 @@
 
+import sys
 import unittest
 from unittest.mock import patch, MagicMock
+from src.database_conn.backends import MySQLBackend
 from src.database_conn.db_conn import DatabaseConnection
 
 
 class TestDatabaseConnection(unittest.TestCase):
 
-    @patch("mysql.connector.connect")
+    @patch.object(MySQLBackend, "connect")
     def test_connect_successful(self, mock_connect):
         mock_connection = MagicMock()
         mock_connection.is_connected.return_value = True
@@ -16,7 +18,8 @@ class TestDatabaseConnection(unittest.TestCase):
         connected = db.connect()
         self.assertTrue(connected)
 
-    @patch("mysql.connector.connect", side_effect=Exception("Connection error"))
+    @patch.object(MySQLBackend, "Error", Exception)
+    @patch.object(MySQLBackend, "connect", side_effect=Exception("Connection error"))
     def test_connect_failure(self, mock_connect):
         db = DatabaseConnection("localhost", "user", "pass", "clinicadb")
         connected = db.connect()
@@ -40,6 +43,7 @@ class TestDatabaseConnection(unittest.TestCase):
         self.assertTrue(success)
         cursor.execute.assert_called_once()
 
+    @patch.object(MySQLBackend, "Error", Exception)
     def test_execute_query_failure(self):
         db = DatabaseConnection("localhost", "user", "pass", "clinicadb")
         db.connection = MagicMock()
@@ -51,6 +55,17 @@ class TestDatabaseConnection(unittest.TestCase):
         success = db.execute_query("INVALID SQL")
         self.assertFalse(success)
 
+    def test_sin_driver_no_oculta_el_error_original(self):
+        with patch.dict(sys.modules, {"mysql": None, "mysql.connector": None}):
+            db = DatabaseConnection("localhost", "user", "pass", "clinicadb")
+            db.connection = MagicMock()
+            db.connection.is_connected.return_value = True
+            db.connection.cursor.return_value.execute.side_effect = ValueError("Query error")
+            with self.assertRaisesRegex(ValueError, "Query error"):
+                db.execute_query("SELECT 1")
+            with self.assertRaises(ImportError):
+                db.connect()
+
     def test_fetch_one_returns_result(self):
         db = DatabaseConnection("localhost", "user", "pass", "clinicadb")
         db.connection = MagicMock()
@@ -0,0 +1,235 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.database_conn.db_conn import DatabaseConnection
+from src.database_conn.esquema import crear_esquema
+from src.database_conn.repositorios import (
+    RepositorioCitas, RepositorioConsultas, RepositorioDueños, RepositorioFacturas,
+    RepositorioMascotas, reintentar_si_conflicto,
+)
+from src.entidades.administrativo.consulta import Consulta
+from src.entidades.administrativo.cita import Cita
+from src.entidades.administrativo.factura import Factura
+from src.entidades.mascotas.mascota import Mascota
+from src.entidades.personas.duenos.dueno import Dueño
+from src.eventos import cambios
+from src.eventos.bus import BusCambios
+from src.excepciones.excepciones import ConflictoConcurrenciaError, FranjaOcupadaError
+
+
+def _fila_cita(**cambios):
+    fila = {"id_cita": 1, "fecha": "2025-01-10", "hora": "10:00", "motivo": "Revisión",
+            "id_mascota": 3, "id_empleado": 7, "estado": "pendiente", "hora_fin": None, "version": 4}
+    fila.update(cambios)
+    return fila
+
+
+class TestRepositorioCitas(unittest.TestCase):
+
+    def setUp(self):
+        self.db = MagicMock()
+        self.repo = RepositorioCitas(self.db)
+
+    def test_obtener_hidrata_la_version(self):
+        self.db.fetch_one.return_value = _fila_cita(estado="completada", hora_fin="10:25")
+        cita = self.repo.obtener(1)
+        self.assertEqual(cita.version, 4)
+        self.assertEqual(str(cita.obtener_duracion()), "0:25:00")
+
+    def test_guardar_hace_compare_and_swap_e_incrementa_version(self):
+        self.db.fetch_one.return_value = _fila_cita()
+        cita = self.repo.obtener(1)
+        cita.reprogramar("2025-01-11", "09:30")
+        self.db.execute_update.return_value = 1
+        self.repo.guardar(cita)
+        sentencia, parametros = self.db.execute_update.call_args[0]
+        self.assertIn("version = version + 1", sentencia)
+        self.assertIn("AND version = %s", sentencia)
+        self.assertEqual(parametros[-2:], (1, 4))
+        self.assertEqual(cita.version, 5)
+
+    def test_guardar_version_obsoleta_lanza_conflicto(self):
+        self.db.fetch_one.return_value = _fila_cita()
+        cita = self.repo.obtener(1)
+        cita.cancelar()
+        self.db.execute_update.return_value = 0
+        with self.assertRaises(ConflictoConcurrenciaError):
+            self.repo.guardar(cita)
+        self.assertEqual(cita.version, 4)
+
+    def test_cancelar_libera_la_franja(self):
+        self.db.fetch_one.return_value = _fila_cita()
+        cita = self.repo.obtener(1)
+        cita.cancelar()
+        self.db.execute_update.return_value = 1
+        self.repo.guardar(cita)
+        sentencias = [c[0][0] for c in self.db.execute_query.call_args_list]
+        self.assertTrue(any(s.startswith("DELETE FROM franjas_agenda") for s in sentencias))
+        self.assertFalse(any(s.startswith("INSERT INTO franjas_agenda") for s in sentencias))
+
+    def test_crear_en_franja_ocupada_lanza_franja_ocupada(self):
+        self.db.execute_query.side_effect = [True, True, Exception("UNIQUE constraint failed")]
+        self.db.fetch_one.return_value = {"id_cita": 99}
+        with self.assertRaises(FranjaOcupadaError):
+            self.repo.crear(Cita(1, "2025-01-10", "10:00", "Revisión", 3, 7))
+
+
+class TestRepositorioFacturas(unittest.TestCase):
+
+    def test_hidratar_conserva_el_pago(self):
+        db = MagicMock()
+        db.fetch_one.return_value = {"id_factura": 1, "id_consulta": 2, "total": 42.0,
+                                     "fecha": "2025-01-10", "metodo_pago": "efectivo", "version": 3}
+        factura = RepositorioFacturas(db).obtener(1)
+        self.assertEqual((factura.total, factura.metodo_pago, factura.version), (42.0, "efectivo", 3))
+        self.assertEqual(factura.fecha.date().isoformat(), "2025-01-10")
+
+
+class TestRepositoriosSQLite(unittest.TestCase):
+    """Ida y vuelta real contra el backend SQLite en memoria."""
+
+    def setUp(self):
+        self.db = DatabaseConnection.sqlite(":memory:")
+        self.db.connect()
+        crear_esquema(self.db)
+
+    def tearDown(self):
+        self.db.disconnect()
+
+    def test_dos_sesiones_sobre_la_misma_cita(self):
+        repo = RepositorioCitas(self.db)
+        repo.crear(Cita(1, "2025-01-10", "10:00", "Revisión", 3, 7))
+        sesion_a, sesion_b = repo.obtener(1), repo.obtener(1)
+        sesion_a.reprogramar("2025-01-11", "09:00")
+        repo.guardar(sesion_a)
+        sesion_b.cancelar()
+        with self.assertRaises(ConflictoConcurrenciaError):
+            repo.guardar(sesion_b)
+        self.assertEqual(repo.obtener(1).estado, "pendiente")
+
+    def test_no_permite_doble_reserva_y_libera_al_cancelar(self):
+        repo = RepositorioCitas(self.db)
+        repo.crear(Cita(1, "2025-01-10", "10:00", "Revisión", 3, 7))
+        with self.assertRaises(FranjaOcupadaError):
+            repo.crear(Cita(2, "2025-01-10", "10:00", "Vacuna", 4, 7))
+        self.assertIsNone(repo.obtener(2))
+        cita = repo.obtener(1)
+        cita.cancelar()
+        repo.guardar(cita)
+        repo.crear(Cita(2, "2025-01-10", "10:00", "Vacuna", 4, 7))
+
+    def test_consulta_y_factura_ida_y_vuelta(self):
+        consultas, facturas = RepositorioConsultas(self.db), RepositorioFacturas(self.db)
+        consulta = Consulta(1, 1, "Otitis", "Gotas")
+        consultas.crear(consulta)
+        factura = Factura(1, 1)
+        factura.calcular_total([{"descripcion": "Consulta", "precio": 35.0}])
+        factura.registrar_pago("tarjeta", "2025-01-10")
+        facturas.crear(factura)
+        leida = consultas.obtener(1)
+        leida.vincular_factura(1)
+        consultas.guardar(leida)
+        self.assertEqual(consultas.obtener(1).id_factura, 1)
+        self.assertEqual(consultas.obtener(1).version, 1)
+        self.assertEqual(facturas.obtener(1).fecha.strftime("%Y-%m-%d"), "2025-01-10")
+
+
+class TestPublicacionDeCambios(unittest.TestCase):
+    """Cada escritura confirmada se publica en el bus; las fallidas no."""
+
+    def setUp(self):
+        self.db = DatabaseConnection.sqlite(":memory:")
+        self.db.connect()
+        crear_esquema(self.db)
+        self.bus = BusCambios()
+        self.eventos = []
+        self.bus.suscribir(self.eventos.extend)
+
+    def tearDown(self):
+        self.db.disconnect()
+
+    def resumen(self):
+        return [(e.entidad, e.operacion, e.clave, e.version) for e in self.eventos]
+
+    def test_dueño_y_mascota_ida_y_vuelta(self):
+        dueños, mascotas = RepositorioDueños(self.db, self.bus), RepositorioMascotas(self.db, self.bus)
+        dueño = Dueño(1, "Ana Ruiz", "12345678A", "600000000", "ana@example.com", "1985-04-02", "C/ Mayor 1")
+        dueños.crear(dueño)
+        mascotas.crear(Mascota(1, "Luna", "Perro", "Beagle", "2020-06-01", 12.5, "H", dueño))
+        mascota = mascotas.obtener(1)
+        self.assertEqual((mascota.dueño.dni, mascota.peso), ("12345678A", 12.5))
+        mascota.actualizar_peso(13.0)
+        mascotas.guardar(mascota)
+        dueño.actualizar_direccion("C/ Nueva 2")
+        dueños.guardar(dueño)
+        self.assertEqual(self.resumen(), [
+            (cambios.DUENO, cambios.INSERTAR, 1, 0),
+            (cambios.MASCOTA, cambios.INSERTAR, 1, 0),
+            (cambios.MASCOTA, cambios.ACTUALIZAR, 1, 1),
+            (cambios.DUENO, cambios.ACTUALIZAR, 1, 1),
+        ])
+        self.assertEqual(self.eventos[2].datos["peso"], 13.0)
+        self.assertEqual(dueños.obtener(1).direccion, "C/ Nueva 2")
+
+    def test_conflictos_y_dobles_reservas_no_se_publican(self):
+        repo = RepositorioCitas(self.db, self.bus)
+        repo.crear(Cita(1, "2025-01-10", "10:00", "Revisión", 3, 7))
+        with self.assertRaises(FranjaOcupadaError):
+            repo.crear(Cita(2, "2025-01-10", "10:00", "Vacuna", 4, 7))
+        obsoleta = repo.obtener(1)
+        actual = repo.obtener(1)
+        actual.cancelar()
+        repo.guardar(actual)
+        obsoleta.cancelar()
+        with self.assertRaises(ConflictoConcurrenciaError):
+            repo.guardar(obsoleta)
+        repo.eliminar(actual)
+        self.assertEqual(self.resumen(), [
+            (cambios.CITA, cambios.INSERTAR, 1, 0),
+            (cambios.CITA, cambios.ACTUALIZAR, 1, 1),
+            (cambios.CITA, cambios.ELIMINAR, 1, None),
+        ])
+        self.assertEqual(self.eventos[1].datos["estado"], "cancelada")
+
+
+class TestReintentarSiConflicto(unittest.TestCase):
+
+    @patch("src.database_conn.repositorios.time.sleep")
+    def test_reintenta_hasta_conseguirlo(self, _sleep):
+        operacion = MagicMock(side_effect=[ConflictoConcurrenciaError("Cita", 1, 0), "ok"])
+        self.assertEqual(reintentar_si_conflicto(operacion), "ok")
+        self.assertEqual(operacion.call_count, 2)
+
+    @patch("src.database_conn.repositorios.time.sleep")
+    def test_propaga_el_conflicto_al_agotar_intentos(self, _sleep):
+        operacion = MagicMock(side_effect=ConflictoConcurrenciaError("Cita", 1, 0))
+        with self.assertRaises(ConflictoConcurrenciaError):
+            reintentar_si_conflicto(operacion, intentos=3)
+        self.assertEqual(operacion.call_count, 3)
+
+    def test_solo_se_publica_el_intento_confirmado(self):
+        db = DatabaseConnection.sqlite(":memory:")
+        db.connect()
+        self.addCleanup(db.disconnect)
+        crear_esquema(db)
+        bus, eventos = BusCambios(), []
+        repo = RepositorioCitas(db, bus)
+        repo.crear(Cita(1, "2025-01-10", "10:00", "Revisión", 3, 7))
+        bus.suscribir(eventos.extend)
+        obsoleta = repo.obtener(1)
+        otra = repo.obtener(1)
+        otra.reprogramar("2025-01-11", "10:00")
+        repo.guardar(otra)
+        eventos.clear()
+
+        def cancelar():
+            cita = obsoleta if obsoleta.estado == "pendiente" else repo.obtener(1)
+            cita.cancelar()
+            repo.guardar(cita)
+
+        reintentar_si_conflicto(cancelar, espera=0)
+        self.assertEqual([(e.operacion, e.datos["estado"]) for e in eventos], [(cambios.ACTUALIZAR, "cancelada")])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.database_conn.backends import SQLiteBackend, traducir_marcadores
+from src.database_conn.db_conn import DatabaseConnection
+
+
+class TestSQLiteDatabaseConnection(unittest.TestCase):
+    """Mismos casos que TestDatabaseConnection, contra una base SQLite real."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.db = DatabaseConnection.sqlite(os.path.join(self.directorio, "clinica.db"))
+        self.assertTrue(self.db.connect())
+        self.db.execute_query("CREATE TABLE test (valor TEXT)")
+        self.db.execute_query("CREATE TABLE empleados (id INTEGER, usuario TEXT, contraseña TEXT)")
+        self.db.execute_query("INSERT INTO empleados VALUES (%s, %s, %s)", (1, "admin", "1234"))
+
+    def tearDown(self):
+        self.db.disconnect()
+        shutil.rmtree(self.directorio)
+
+    def test_connect_successful(self):
+        self.assertTrue(self.db.connection.is_connected())
+
+    def test_connect_failure(self):
+        db = DatabaseConnection.sqlite(os.path.join(self.directorio, "no", "existe", "clinica.db"))
+        self.assertFalse(db.connect())
+
+    def test_disconnect(self):
+        self.db.disconnect()
+        self.assertFalse(self.db.connection.is_connected())
+
+    def test_execute_query_success(self):
+        self.assertTrue(self.db.execute_query("INSERT INTO test VALUES (%s)", ("value",)))
+        self.assertEqual(self.db.fetch_one("SELECT valor FROM test"), {"valor": "value"})
+
+    def test_execute_query_failure(self):
+        self.assertFalse(self.db.execute_query("INVALID SQL"))
+
+    def test_fetch_one_returns_result(self):
+        result = self.db.fetch_one("SELECT usuario FROM empleados WHERE id=%s", (1,))
+        self.assertEqual(result, {"usuario": "admin"})
+
+    def test_fetch_one_raises_if_not_connected(self):
+        self.db.connection = None
+        with self.assertRaises(ConnectionError):
+            self.db.fetch_one("SELECT 1")
+
+    def test_validate_user_found(self):
+        self.assertTrue(self.db.validate_user("admin", "1234"))
+
+    def test_validate_user_not_found(self):
+        self.assertFalse(self.db.validate_user("admin", "wrong"))
+
+    def test_execute_update_devuelve_filas_afectadas(self):
+        self.db.execute_many("INSERT INTO test VALUES (%s)", [("a",), ("b",), ("b",)])
+        self.assertEqual(self.db.execute_update("DELETE FROM test WHERE valor = %s", ("b",)), 2)
+
+    def test_fetch_iter_recorre_por_bloques(self):
+        self.db.execute_many("INSERT INTO test VALUES (%s)", [(str(i),) for i in range(5)])
+        filas = self.db.fetch_iter("SELECT valor FROM test WHERE valor <> %s", ("3",), tam_lote=2)
+        self.assertEqual([f["valor"] for f in filas], ["0", "1", "2", "4"])
+
+    def test_transaction_hace_rollback_si_falla(self):
+        with self.assertRaises(Exception):
+            with self.db.transaction():
+                self.db.execute_query("INSERT INTO test VALUES (%s)", ("dentro",))
+                self.db.execute_query("INVALID SQL")
+        self.assertEqual(self.db.fetch_all("SELECT * FROM test"), [])
+
+    def test_modo_wal_activo(self):
+        self.assertEqual(self.db.fetch_one("PRAGMA journal_mode"), {"journal_mode": "wal"})
+
+
+class TestTraducirMarcadores(unittest.TestCase):
+
+    def test_traduce_marcadores(self):
+        self.assertEqual(traducir_marcadores("SELECT * FROM t WHERE a = %s AND b = %s"),
+                         "SELECT * FROM t WHERE a = ? AND b = ?")
+
+    def test_respeta_literales(self):
+        self.assertEqual(traducir_marcadores("SELECT '%s', a FROM t WHERE b LIKE '50%%' AND c = %s"),
+                         "SELECT '%s', a FROM t WHERE b LIKE '50%%' AND c = ?")
+
+    def test_porcentaje_escapado_fuera_de_literales(self):
+        self.assertEqual(traducir_marcadores("SELECT 10 %% 3"), "SELECT 10 % 3")
+
+
+class TestSQLiteBackend(unittest.TestCase):
+
+    def test_memoria_no_usa_wal(self):
+        conexion = SQLiteBackend(":memory:").connect()
+        cursor = conexion.cursor()
+        cursor.execute("PRAGMA journal_mode")
+        self.assertEqual(cursor.fetchone(), ("memory",))
+        conexion.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
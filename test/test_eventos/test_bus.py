@@ -0,0 +1,108 @@
+import threading
+import time
+import unittest
+
+from src.eventos.bus import BusCambios
+from src.eventos.cambios import (
+    ACTUALIZAR, ARCHIVADO, CITA, ELIMINAR, FACTURA, INSERTAR, EventoCambio, combinar,
+)
+
+
+class TestCombinar(unittest.TestCase):
+
+    def evento(self, operacion, **datos):
+        return EventoCambio(CITA, operacion, 1, datos)
+
+    def test_insertar_y_actualizar_queda_insertar_con_datos_finales(self):
+        neto = combinar(self.evento(INSERTAR, estado="pendiente"), self.evento(ACTUALIZAR, estado="cancelada"))
+        self.assertEqual((neto.operacion, neto.datos), (INSERTAR, {"estado": "cancelada"}))
+
+    def test_insertar_y_eliminar_se_anulan(self):
+        self.assertIsNone(combinar(self.evento(INSERTAR), self.evento(ELIMINAR)))
+
+    def test_insertar_y_archivar_conserva_la_fila_marcada(self):
+        neto = combinar(self.evento(INSERTAR, estado="completada"), self.evento(ELIMINAR, **{ARCHIVADO: True}))
+        self.assertEqual((neto.operacion, neto.datos), (INSERTAR, {"estado": "completada", ARCHIVADO: True}))
+
+    def test_actualizar_y_archivar_conserva_los_datos_finales(self):
+        neto = combinar(self.evento(ACTUALIZAR, estado="completada"), self.evento(ELIMINAR, **{ARCHIVADO: True}))
+        self.assertEqual((neto.operacion, neto.datos), (ELIMINAR, {"estado": "completada", ARCHIVADO: True}))
+
+    def test_eliminar_e_insertar_queda_actualizar(self):
+        self.assertEqual(combinar(self.evento(ELIMINAR), self.evento(INSERTAR)).operacion, ACTUALIZAR)
+
+    def test_operacion_invalida(self):
+        with self.assertRaises(ValueError):
+            EventoCambio(CITA, "upsert", 1)
+
+
+class TestBusCambios(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = BusCambios()
+        self.recibidos = []
+        self.bus.suscribir(self.recibidos.append)
+
+    def test_entrega_inmediata_por_defecto(self):
+        self.bus.emitir(CITA, INSERTAR, 1, {"estado": "pendiente"}, 0)
+        self.assertEqual(len(self.recibidos), 1)
+        self.assertEqual(self.recibidos[0][0].origen, self.bus.origen)
+
+    def test_agrupar_funde_rafagas_por_fila(self):
+        with self.bus.agrupar():
+            self.bus.emitir(CITA, INSERTAR, 1, {"estado": "pendiente"})
+            self.bus.emitir(CITA, ACTUALIZAR, 1, {"estado": "completada"})
+            self.bus.emitir(CITA, INSERTAR, 2)
+            self.bus.emitir(CITA, ELIMINAR, 2)
+            self.bus.emitir(FACTURA, ACTUALIZAR, 1)
+            self.assertEqual(self.recibidos, [])
+        self.assertEqual(len(self.recibidos), 1)
+        rafaga = self.recibidos[0]
+        self.assertEqual([(e.entidad, e.clave, e.operacion) for e in rafaga],
+                         [(CITA, 1, INSERTAR), (FACTURA, 1, ACTUALIZAR)])
+        self.assertEqual(rafaga[0].datos, {"estado": "completada"})
+        self.assertEqual((self.bus.publicados, self.bus.entregados), (5, 2))
+
+    def test_agrupar_solo_retiene_el_hilo_que_agrupa(self):
+        with self.bus.agrupar():
+            hilo = threading.Thread(target=self.bus.emitir, args=(CITA, ACTUALIZAR, 9))
+            hilo.start()
+            hilo.join()
+            self.assertEqual(len(self.recibidos), 1)
+
+    def test_filtra_por_entidad(self):
+        facturas = []
+        self.bus.suscribir(facturas.append, entidades=[FACTURA])
+        self.bus.emitir(CITA, ACTUALIZAR, 1)
+        self.bus.emitir(FACTURA, ACTUALIZAR, 1)
+        self.assertEqual([[e.entidad for e in r] for r in facturas], [[FACTURA]])
+
+    def test_consumidor_que_falla_no_afecta_a_los_demas(self):
+        bus = BusCambios()
+        recibidos = []
+        bus.suscribir(lambda eventos: 1 / 0)
+        bus.suscribir(recibidos.append)
+        with self.assertLogs("src.eventos.bus", level="ERROR"):
+            bus.emitir(CITA, ELIMINAR, 1)
+        self.assertEqual(len(recibidos), 1)
+
+    def test_ventana_agrupa_sin_bloque_explicito(self):
+        bus = BusCambios(ventana=0.05)
+        recibidos = []
+        bus.suscribir(recibidos.append)
+        for estado in ("pendiente", "cancelada"):
+            bus.emitir(CITA, ACTUALIZAR, 1, {"estado": estado})
+        self.assertEqual(recibidos, [])
+        limite = time.time() + 2
+        while not recibidos and time.time() < limite:
+            time.sleep(0.01)
+        self.assertEqual([[e.datos["estado"] for e in r] for r in recibidos], [["cancelada"]])
+
+    def test_desuscribir(self):
+        self.bus.desuscribir(self.recibidos.append)
+        self.bus.emitir(CITA, ACTUALIZAR, 1)
+        self.assertEqual(self.recibidos, [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+import unittest
+
+from src.eventos.bus import BusCambios
+from src.eventos.cache import CacheEntidades
+from src.eventos.cambios import ACTUALIZAR, CITA, ELIMINAR, FACTURA, MASCOTA
+
+
+class TestCacheEntidades(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = BusCambios()
+        self.cache = CacheEntidades(self.bus)
+        self.cache.conectar()
+        self.lecturas = 0
+
+    def cargar(self, valor):
+        def cargar():
+            self.lecturas += 1
+            return valor
+        return cargar
+
+    def test_solo_invalida_la_fila_cambiada(self):
+        self.cache.obtener(CITA, 1, self.cargar("cita 1"))
+        self.cache.obtener(CITA, 2, self.cargar("cita 2"))
+        self.bus.emitir(CITA, ACTUALIZAR, 1)
+        self.assertEqual(self.cache.obtener(CITA, 1, self.cargar("cita 1 nueva")), "cita 1 nueva")
+        self.assertEqual(self.cache.obtener(CITA, 2, self.cargar("otra")), "cita 2")
+        self.assertEqual((self.lecturas, self.cache.aciertos, self.cache.invalidaciones), (3, 1, 1))
+
+    def test_cada_lector_recibe_su_copia(self):
+        primera = self.cache.obtener(CITA, 1, self.cargar({"estado": "pendiente", "version": 0}))
+        primera["estado"], primera["version"] = "cancelada", 1  # Cambio de una sesión aún sin guardar
+        segunda = self.cache.obtener(CITA, 1, self.cargar(None))
+        self.assertEqual(segunda, {"estado": "pendiente", "version": 0})
+        self.assertIsNot(segunda, self.cache.obtener(CITA, 1, self.cargar(None)))
+        self.assertEqual(self.lecturas, 1)
+
+    def test_consulta_se_invalida_con_cualquier_cambio_de_sus_entidades(self):
+        self.cache.consulta("citas_hoy", [CITA], self.cargar([1, 2]))
+        self.cache.consulta("facturas", [FACTURA], self.cargar([7]))
+        self.bus.emitir(CITA, ELIMINAR, 2)
+        self.assertEqual(self.cache.consulta("citas_hoy", [CITA], self.cargar([1])), [1])
+        self.assertEqual(self.cache.consulta("facturas", [FACTURA], self.cargar([])), [7])
+
+    def test_no_guarda_lecturas_invalidadas_mientras_se_cargaban(self):
+        def cargar_con_cambio_concurrente():
+            self.bus.emitir(MASCOTA, ACTUALIZAR, 5)
+            return "valor antiguo"
+
+        self.assertEqual(self.cache.obtener(MASCOTA, 5, cargar_con_cambio_concurrente), "valor antiguo")
+        self.assertEqual(self.cache.obtener(MASCOTA, 5, self.cargar("valor nuevo")), "valor nuevo")
+        self.assertEqual(self.cache.obtener(MASCOTA, 5, self.cargar("otra")), "valor nuevo")
+
+    def test_capacidad_descarta_la_menos_usada(self):
+        cache = CacheEntidades(self.bus, capacidad=2)
+        cache.obtener(CITA, 1, self.cargar(1))
+        cache.obtener(CITA, 2, self.cargar(2))
+        cache.obtener(CITA, 1, self.cargar(1))
+        cache.obtener(CITA, 3, self.cargar(3))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.obtener(CITA, 2, self.cargar("recargada")), "recargada")
+
+    def test_cachea_none(self):
+        self.cache.obtener(CITA, 99, self.cargar(None))
+        self.assertIsNone(self.cache.obtener(CITA, 99, self.cargar("no")))
+        self.assertEqual(self.lecturas, 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from src.eventos import transporte
+from src.eventos.bus import BusCambios, obtener_bus
+from src.eventos.cambios import ACTUALIZAR, CITA, INSERTAR
+from src.eventos.transporte import (
+    RegistroCambiosSQLite, ReplicadorCambios, detener_replicacion, iniciar_replicacion,
+)
+
+
+class TestReplicadorCambios(unittest.TestCase):
+    """Dos procesos simulados: cada uno con su bus y su conexión al mismo registro."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        ruta = os.path.join(self.directorio, "cambios.db")
+        self.registros = [RegistroCambiosSQLite(ruta), RegistroCambiosSQLite(ruta)]
+        for registro in self.registros:
+            self.assertTrue(registro.conectar())
+        self.buses = [BusCambios(), BusCambios()]
+        self.replicadores = [ReplicadorCambios(bus, registro)
+                             for bus, registro in zip(self.buses, self.registros)]
+        for replicador in self.replicadores:
+            replicador.iniciar(en_segundo_plano=False)
+        self.recibidos = []
+        self.buses[1].suscribir(self.recibidos.extend)
+
+    def tearDown(self):
+        for replicador, registro in zip(self.replicadores, self.registros):
+            replicador.detener()
+            registro.cerrar()
+        shutil.rmtree(self.directorio)
+
+    def test_los_cambios_llegan_al_otro_proceso(self):
+        self.buses[0].emitir(CITA, INSERTAR, 1, {"estado": "pendiente", "fecha": "2025-01-10"}, 0)
+        self.buses[0].emitir(CITA, ACTUALIZAR, 1, {"estado": "cancelada"}, 1)
+        self.assertEqual(self.replicadores[1].sondear(), 2)
+        # Llegan en la misma ráfaga, fundidos en el cambio neto
+        self.assertEqual([(e.operacion, e.version) for e in self.recibidos], [(INSERTAR, 1)])
+        self.assertEqual(self.recibidos[0].datos, {"estado": "cancelada"})
+        self.assertEqual(self.recibidos[0].origen, self.buses[0].origen)
+
+    def test_los_datos_sobreviven_la_serializacion(self):
+        self.buses[0].emitir(CITA, INSERTAR, 1, {"estado": "pendiente", "fecha": "2025-01-10"}, 0)
+        self.replicadores[1].sondear()
+        self.assertEqual(self.recibidos[0].datos, {"estado": "pendiente", "fecha": "2025-01-10"})
+
+    def test_no_se_reciben_ni_reenvian_los_propios(self):
+        self.buses[1].emitir(CITA, ACTUALIZAR, 3)
+        self.assertEqual(self.replicadores[1].sondear(), 0)
+        self.buses[0].emitir(CITA, ACTUALIZAR, 4)
+        self.replicadores[1].sondear()
+        # El evento remoto publicado en el bus 1 no vuelve al registro
+        self.assertEqual(self.registros[0].ultimo_id(), 2)
+
+    def test_podar(self):
+        self.buses[0].emitir(CITA, ACTUALIZAR, 1)
+        self.assertEqual(self.registros[0].podar(antiguedad=-1), 1)
+
+    def _esperar(self, condicion, limite=2.0):
+        fin = time.monotonic() + limite
+        while not condicion() and time.monotonic() < fin:
+            time.sleep(0.01)
+        return condicion()
+
+    def _en_segundo_plano(self, **opciones):
+        replicador = ReplicadorCambios(self.buses[0], self.registros[0], intervalo=0.01, **opciones)
+        replicador.iniciar()
+        self.addCleanup(replicador.detener)
+        return replicador
+
+    def test_el_bucle_poda_el_registro(self):
+        self.buses[1].emitir(CITA, ACTUALIZAR, 1)
+        self._en_segundo_plano(retencion=-1, intervalo_poda=0)
+        self.assertTrue(self._esperar(lambda: self.registros[1].ultimo_id() == 0))
+
+    def test_el_bucle_registra_los_errores_y_sigue(self):
+        with self.assertLogs("src.eventos.transporte", level="ERROR") as registro, \
+                patch.object(RegistroCambiosSQLite, "leer_desde", side_effect=OSError("disco lleno")):
+            self._en_segundo_plano()
+            self.assertTrue(self._esperar(lambda: len(registro.records) >= 2))
+        self.assertIn("disco lleno", registro.output[0])
+
+
+class TestIniciarReplicacion(unittest.TestCase):
+    """El replicador del proceso se configura con CLINICA_CAMBIOS_PATH."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+        self.ruta = os.path.join(self.directorio, "cambios.db")
+        patcher = patch.object(transporte, "_replicador", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(detener_replicacion)
+
+    def test_vacio_desactiva_la_replicacion(self):
+        with patch.dict(os.environ, {"CLINICA_CAMBIOS_PATH": ""}):
+            self.assertIsNone(iniciar_replicacion())
+
+    def test_los_cambios_del_proceso_llegan_al_registro(self):
+        with patch.dict(os.environ, {"CLINICA_CAMBIOS_PATH": self.ruta}):
+            replicador = iniciar_replicacion(en_segundo_plano=False)
+            self.assertIs(iniciar_replicacion(en_segundo_plano=False), replicador)
+        self.assertIsNone(replicador._hilo)
+        obtener_bus().emitir(CITA, ACTUALIZAR, 1)
+        self.assertEqual(replicador.registro.ultimo_id(), 1)
+
+    def test_un_proceso_que_escribe_puede_pasar_a_recibir(self):
+        replicador = iniciar_replicacion(self.ruta, en_segundo_plano=False)
+        self.assertIs(iniciar_replicacion(), replicador)
+        self.assertIsNotNone(replicador._hilo)
+        detener_replicacion()
+        self.assertIsNone(transporte._replicador)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
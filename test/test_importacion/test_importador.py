@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+import unittest
+from importlib.util import find_spec
+
+from src.database_conn.db_conn import DatabaseConnection
+from src.database_conn.esquema import crear_esquema
+from src.eventos import cambios
+from src.eventos.bus import BusCambios
+from src.importacion.importador import (
+    Importador, guardar_errores, normalizar_dni, validar_dueño, validar_mascota,
+)
+from src.importacion.lectores import leer_csv, normalizar_cabecera
+from src.simulacion.generador import ConfiguracionClinica, GeneradorClinica, exportar_csv
+
+DUENOS_CSV = """\
+Nombre;DNI;Teléfono;Email;Fecha de nacimiento;Dirección;ID dueño
+Ana Ruiz;12345678-a;600000001;ana@example.com;02/04/1985;C/ Mayor 1;10
+Luis Gil;87654321B;600000002;luis@example.com;1979-11-30;C/ Sol 3;11
+Repetida;12345678A;600000003;;1990-01-01;;12
+Sin fecha;11111111C;600000004;;;;13
+"""
+
+MASCOTAS_CSV = """\
+nombre,especie,raza,fecha_nacimiento,peso,sexo,dni_dueno,id_dueno
+Luna,Perro,Beagle,2020-06-01,"12,5",Hembra,12345678A,
+Michi,Gato,Común,2019-02-10,4.2,M,,11
+Rocky,Perro,Bóxer,2018-05-05,-3,M,87654321B,
+Nube,Conejo,,2021-01-01,1.5,H,99999999Z,
+Fantasma,Gato,,2021-01-01,3,H,,13
+"""
+
+
+class TestValidacion(unittest.TestCase):
+
+    def test_cabeceras_normalizadas(self):
+        self.assertEqual(normalizar_cabecera(" Fecha de nacimiento "), "fecha_nacimiento")
+        self.assertEqual(normalizar_cabecera("DNI del dueño"), "dni_dueno")
+
+    def test_dueño_valido(self):
+        valores, errores = validar_dueño({"nombre": "Ana", "dni": "1234 5678-a", "fecha_nacimiento": "2/4/1985"})
+        self.assertEqual(errores, [])
+        self.assertEqual((valores["dni"], valores["fecha_nacimiento"]), ("12345678A", "1985-04-02"))
+
+    def test_dni_numerico_de_excel(self):
+        self.assertEqual(normalizar_dni(12345678.0), "12345678")
+        self.assertEqual(normalizar_dni(12345678), "12345678")
+        self.assertEqual(normalizar_dni(" 1234.5678-z "), "12345678Z")
+        self.assertEqual(normalizar_dni(None), "")
+
+    def test_dueño_con_varios_errores(self):
+        valores, errores = validar_dueño({"nombre": "", "dni": "", "fecha_nacimiento": "1985-13-01"})
+        self.assertIsNone(valores)
+        self.assertEqual([e.split(":")[0] for e in errores], ["nombre", "dni", "fecha_nacimiento"])
+
+    def test_peso_con_la_regla_de_actualizar_peso(self):
+        _, errores = validar_mascota({"nombre": "Rocky", "especie": "Perro", "fecha_nacimiento": "2018-05-05",
+                                      "peso": "0", "dni_dueno": "1A"})
+        self.assertEqual(errores, ["peso: El peso debe ser un número positivo."])
+        _, errores = validar_mascota({"nombre": "Rocky", "especie": "Perro", "fecha_nacimiento": "2018-05-05",
+                                      "peso": "mucho", "dni_dueno": "1A"})
+        self.assertEqual(errores, ["peso: 'mucho' no es un número"])
+
+    def test_peso_no_finito(self):
+        for peso in ("nan", "NaN", "inf", "-inf", "Infinity"):
+            with self.subTest(peso=peso):
+                mascota, errores = validar_mascota({"nombre": "Rocky", "especie": "Perro", "peso": peso,
+                                                    "fecha_nacimiento": "2018-05-05", "dni_dueno": "1A"})
+                self.assertIsNone(mascota)
+                self.assertEqual(errores, [f"peso: '{peso}' no es un número"])
+
+
+class TestImportador(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.db = DatabaseConnection.sqlite(":memory:")
+        self.db.connect()
+        crear_esquema(self.db)
+        self.bus = BusCambios()
+        self.eventos = []
+        self.bus.suscribir(self.eventos.extend)
+
+    def tearDown(self):
+        self.db.disconnect()
+        shutil.rmtree(self.directorio)
+
+    def escribir(self, nombre, contenido):
+        ruta = os.path.join(self.directorio, nombre)
+        with open(ruta, "w", encoding="utf-8") as fichero:
+            fichero.write(contenido)
+        return ruta
+
+    def test_importa_enlaza_e_informa_por_fila(self):
+        importador = Importador(self.db, procesos=1, tam_lote=2, bus=self.bus)
+        duenos = importador.importar_duenos(self.escribir("duenos.csv", DUENOS_CSV))
+        mascotas = importador.importar_mascotas(self.escribir("mascotas.csv", MASCOTAS_CSV))
+
+        self.assertEqual((duenos.leidas, duenos.importadas, duenos.rechazadas), (4, 2, 2))
+        self.assertEqual([(e.fila, e.mensaje.split(":")[0]) for e in duenos.errores],
+                         [(4, "dni"), (5, "fecha_nacimiento")])
+        self.assertEqual((mascotas.leidas, mascotas.importadas), (5, 2))
+        self.assertEqual([(e.fila, e.mensaje.split(":")[0]) for e in mascotas.errores],
+                         [(4, "peso"), (5, "dni_dueno"), (6, "id_dueno")])
+
+        filas = self.db.fetch_all(
+            "SELECT m.nombre, m.peso, m.sexo, d.dni FROM mascotas m JOIN duenos d USING (id_dueno) ORDER BY m.id_mascota")
+        self.assertEqual([(f["nombre"], f["peso"], f["sexo"], f["dni"]) for f in filas],
+                         [("Luna", 12.5, "H", "12345678A"), ("Michi", 4.2, "M", "87654321B")])
+        self.assertEqual(sum(e.entidad == cambios.MASCOTA for e in self.eventos), 2)
+
+        ruta = os.path.join(self.directorio, "errores.csv")
+        self.assertEqual(guardar_errores([duenos, mascotas], ruta), 5)
+
+    @unittest.skipUnless(find_spec("openpyxl"), "requiere openpyxl")
+    def test_excel_con_dni_numerico(self):
+        from openpyxl import Workbook
+
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(["Nombre", "DNI", "Fecha de nacimiento"])
+        hoja.append(["Ana Ruiz", 12345678, "1985-04-02"])
+        hoja.append(["Luis Gil", 87654321, "1979-11-30"])
+        ruta = os.path.join(self.directorio, "duenos.xlsx")
+        libro.save(ruta)
+        importador = Importador(self.db, procesos=1, bus=self.bus)
+        informe = importador.importar_duenos(ruta)
+        self.assertEqual((informe.importadas, informe.errores), (2, []))
+        self.assertEqual([f["dni"] for f in self.db.fetch_all("SELECT dni FROM duenos ORDER BY dni")],
+                         ["12345678", "87654321"])
+
+    def test_dni_existente_en_la_base_de_datos(self):
+        self.db.execute_query("INSERT INTO duenos (id_dueno, nombre, dni, fecha_nacimiento) "
+                              "VALUES (40, 'Ya estaba', '87654321B', '1970-01-01')")
+        importador = Importador(self.db, procesos=1, bus=self.bus)
+        informe = importador.importar_duenos(self.escribir("duenos.csv", DUENOS_CSV))
+        self.assertEqual(informe.importadas, 1)
+        self.assertEqual(self.db.fetch_one("SELECT MAX(id_dueno) AS m FROM duenos")["m"], 41)
+
+    def test_lote_fallido_se_reintenta_fila_a_fila(self):
+        importador = Importador(self.db, procesos=1, bus=self.bus)
+        importador._preparar()
+        # Un ID ya ocupado hace fallar el lote entero; solo se rechaza esa fila
+        self.db.execute_query("INSERT INTO duenos (id_dueno, nombre, dni, fecha_nacimiento) "
+                              "VALUES (2, 'Otra sesión', '00000000T', '1970-01-01')")
+        informe = importador.importar_duenos(self.escribir("duenos.csv", DUENOS_CSV))
+        self.assertEqual(informe.importadas, 1)
+        fallidas = [e for e in informe.errores if e.mensaje.startswith("base de datos:")]
+        self.assertEqual([e.fila for e in fallidas], [3])
+        self.assertNotIn("87654321B", importador._dni_a_id)
+
+    def test_datos_generados_con_pool_de_procesos(self):
+        generador = GeneradorClinica(ConfiguracionClinica(n_duenos=300, dias=1, hoy="2024-01-01"))
+        exportar_csv(generador, self.directorio)
+        importador = Importador(self.db, procesos=2, tam_lote=100, tam_lote_validacion=50, bus=self.bus)
+        duenos = importador.importar_duenos(os.path.join(self.directorio, "duenos.csv"))
+        mascotas = importador.importar_mascotas(os.path.join(self.directorio, "mascotas.csv"))
+        self.assertEqual((duenos.importadas, duenos.errores), (300, []))
+        self.assertEqual((mascotas.importadas, mascotas.errores), (generador.n_mascotas, []))
+        original = {m["id_mascota"]: m["id_dueno"] for m in generador.mascotas()}
+        importadas = {f["id_mascota"]: f["id_dueno"] for f in self.db.fetch_all("SELECT * FROM mascotas")}
+        self.assertEqual(importadas, original)
+
+    def test_lee_en_streaming(self):
+        filas = leer_csv(self.escribir("duenos.csv", DUENOS_CSV))
+        numero, fila = next(filas)
+        self.assertEqual((numero, fila["dni"], fila["id_dueno"]), (2, "12345678-a", "10"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
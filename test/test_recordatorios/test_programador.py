@@ -0,0 +1,170 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.database_conn.db_conn import DatabaseConnection
+from src.database_conn.esquema import crear_esquema, sentencia_insert
+from src.database_conn.repositorios import RepositorioCitas
+from src.entidades.administrativo.cita import Cita
+from src.eventos.bus import BusCambios
+from src.recordatorios.programador import ProgramadorRecordatorios, parsear_aviso
+from src.recordatorios.transportes import TransporteMemoria
+
+
+class TransporteQueFalla(TransporteMemoria):
+
+    def __init__(self, fallos):
+        super().__init__()
+        self.fallos = fallos
+
+    def enviar(self, recordatorio):
+        if self.fallos:
+            self.fallos -= 1
+            raise ConnectionError("servidor SMTP caído")
+        super().enviar(recordatorio)
+
+
+class TestProgramadorRecordatorios(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DatabaseConnection.sqlite(":memory:")
+        self.db.connect()
+        crear_esquema(self.db)
+        self.bus = BusCambios()
+        self.ahora = datetime(2025, 6, 1, 8, 0).timestamp()
+        self.transporte = TransporteMemoria()
+        self._insertar("duenos", (1, "Ana", "123A", "600", "ana@correo.es", "1990-01-01", "Calle 1"))
+        self._insertar("duenos", (2, "Luis", "456B", "601", None, "1985-01-01", "Calle 2"))
+        self._insertar("mascotas", (1, "Toby", "Perro", "Mestizo", "2018-01-01", 10.0, "M", 1))
+        self._insertar("mascotas", (2, "Misi", "Gato", "Común", "2019-01-01", 4.0, "H", 2))
+        self.citas = RepositorioCitas(self.db, self.bus)
+        self._cita(1, "2025-06-02", "10:00")               # Avisos a las 10:00 de hoy y a las 08:00 de mañana
+        self._cita(2, "2025-06-01", "09:00")               # Dentro de una hora: ya tarde para ambos
+        self._cita(3, "2025-06-03", "10:00", "cancelada")
+        self._cita(4, "2025-05-30", "10:00")               # Pasada
+        self._cita(5, "2025-06-04", "10:00", mascota=2)    # Dueño sin email
+
+    def tearDown(self):
+        self.db.disconnect()
+
+    def _insertar(self, tabla, valores):
+        self.db.execute_query(sentencia_insert(tabla), valores)
+
+    def _cita(self, id_cita, fecha, hora, estado="pendiente", mascota=1):
+        self._insertar("citas", (id_cita, fecha, hora, "Vacuna", mascota, 7, estado, None))
+
+    def _programador(self, transporte=None, **opciones):
+        programador = ProgramadorRecordatorios(self.db, transporte or self.transporte, bus=self.bus,
+                                               reloj=lambda: self.ahora, **opciones)
+        self.addCleanup(programador.detener)
+        programador.conectar()
+        programador.reconstruir()
+        return programador
+
+    def _despachar_hasta(self, programador, fecha):
+        self.ahora = fecha.timestamp()
+        return programador.despachar()
+
+    def _enviados(self):
+        return [(r.id_cita, r.aviso) for r in self.transporte.enviados]
+
+    def test_reconstruir_programa_las_citas_pendientes(self):
+        programador = self._programador()
+        # Cita 1: dos avisos; cita 2: uno inmediato; cita 5: dos (sin email, se descartan al vencer)
+        self.assertEqual(len(programador), 5)
+
+    def test_envia_cada_aviso_a_su_hora(self):
+        programador = self._programador()
+        self.assertEqual(self._despachar_hasta(programador, datetime(2025, 6, 1, 8, 0, 1)), 1)
+        self.assertEqual(self._enviados(), [(2, timedelta(hours=2))])
+        self.assertEqual(self._despachar_hasta(programador, datetime(2025, 6, 1, 9, 59)), 0)
+        self._despachar_hasta(programador, datetime(2025, 6, 2, 8, 0))
+        self.assertEqual(self._enviados()[1:], [(1, timedelta(hours=24)), (1, timedelta(hours=2))])
+        recordatorio = self.transporte.enviados[1]
+        self.assertEqual(recordatorio.destinatario, "ana@correo.es")
+        self.assertIn("Toby el 02/06/2025 a las 10:00", recordatorio.asunto)
+
+    def test_un_reinicio_no_repite_los_avisos_enviados(self):
+        self._despachar_hasta(self._programador(), datetime(2025, 6, 1, 10, 0))
+        self.assertEqual(len(self.transporte.enviados), 2)
+        programador = self._programador(tam_lote=1)
+        self._despachar_hasta(programador, datetime(2025, 6, 2, 9, 0))
+        self.assertEqual(self._enviados()[2:], [(1, timedelta(hours=2))])
+
+    def test_reprogramar_y_cancelar_actualizan_los_avisos(self):
+        programador = self._programador()
+        cita = self.citas.obtener(1)
+        cita.reprogramar("2025-06-05", "10:00")
+        self.citas.guardar(cita)
+        self._despachar_hasta(programador, datetime(2025, 6, 2, 9, 0))
+        self.assertNotIn(1, [id_cita for id_cita, _ in self._enviados()])
+        cita = self.citas.obtener(1)
+        cita.cancelar()
+        self.citas.guardar(cita)
+        self._despachar_hasta(programador, datetime(2025, 6, 5, 9, 0))
+        self.assertNotIn(1, [id_cita for id_cita, _ in self._enviados()])
+
+    def test_cita_nueva_recibe_sus_avisos(self):
+        programador = self._programador()
+        self.citas.crear(Cita(6, "2025-06-01", "12:00", "Revisión", 1, 8))
+        self._despachar_hasta(programador, datetime(2025, 6, 1, 10, 0))
+        self.assertIn((6, timedelta(hours=2)), self._enviados())
+
+    def test_no_envia_si_la_cita_cambio_sin_avisar_por_el_bus(self):
+        programador = self._programador()
+        self.db.execute_query("UPDATE citas SET estado = 'cancelada' WHERE id_cita = 2")
+        self.assertEqual(self._despachar_hasta(programador, datetime(2025, 6, 1, 8, 1)), 0)
+
+    def test_reintenta_si_el_transporte_falla(self):
+        transporte = TransporteQueFalla(fallos=1)
+        programador = self._programador(transporte, reintento=timedelta(minutes=5))
+        self.assertEqual(self._despachar_hasta(programador, datetime(2025, 6, 1, 8, 0, 1)), 0)
+        self.assertEqual(self._despachar_hasta(programador, datetime(2025, 6, 1, 8, 6)), 1)
+        self.assertEqual([r.id_cita for r in transporte.enviados], [2])
+
+    def test_parsear_aviso(self):
+        self.assertEqual(parsear_aviso("24h"), timedelta(hours=24))
+        self.assertEqual(parsear_aviso("90m"), timedelta(minutes=90))
+        self.assertEqual(parsear_aviso("2d"), timedelta(days=2))
+        with self.assertRaises(ValueError):
+            parsear_aviso("mañana")
+
+
+class TestProgramadorConOtraSesion(unittest.TestCase):
+    """La aplicación escribe por su propia conexión mientras el programador sigue abierto."""
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        ruta = os.path.join(directorio, "clinica.db")
+        self.db, self.otra = DatabaseConnection.sqlite(ruta), DatabaseConnection.sqlite(ruta)
+        for db in (self.db, self.otra):
+            db.connect()
+            self.addCleanup(db.disconnect)
+        crear_esquema(self.db)
+        for tabla, valores in (
+            ("duenos", (1, "Ana", "123A", "600", "ana@correo.es", "1990-01-01", "Calle 1")),
+            ("mascotas", (1, "Toby", "Perro", "Mestizo", "2018-01-01", 10.0, "M", 1)),
+            ("citas", (1, "2025-06-01", "10:00", "Vacuna", 1, 7, "pendiente", None)),
+        ):
+            self.db.execute_query(sentencia_insert(tabla), valores)
+
+    def test_despachar_lee_lo_confirmado_por_otra_conexion(self):
+        ahora = datetime(2025, 6, 1, 8, 0).timestamp()
+        programador = ProgramadorRecordatorios(self.db, TransporteMemoria(), bus=BusCambios(),
+                                               reloj=lambda: ahora)
+        programador.reconstruir()
+        # Cancelada por otra sesión sin que el cambio llegue por el bus
+        self.otra.execute_query("UPDATE citas SET estado = 'cancelada' WHERE id_cita = 1")
+        with patch.object(self.db.connection, "commit", wraps=self.db.connection.commit) as commit:
+            self.assertEqual(programador.despachar(datetime(2025, 6, 1, 8, 0, 1).timestamp()), 0)
+        # La lectura no deja abierta una transacción con una foto antigua
+        commit.assert_called()
+        self.assertFalse(self.db.connection._conexion.in_transaction)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,77 @@
+import math
+import random
+import unittest
+
+from src.recordatorios.rueda import RuedaTemporal
+
+
+class TestRuedaTemporal(unittest.TestCase):
+
+    def test_devuelve_las_vencidas_en_orden(self):
+        rueda = RuedaTemporal(inicio=0)
+        rueda.programar("b", 20, "B")
+        rueda.programar("a", 10, "A")
+        rueda.programar("c", 5000, "C")
+        self.assertEqual(rueda.avanzar(9), [])
+        self.assertEqual(rueda.avanzar(25), [("a", "A"), ("b", "B")])
+        self.assertEqual(len(rueda), 1)
+        self.assertEqual(rueda.avanzar(5000), [("c", "C")])
+        self.assertEqual(len(rueda), 0)
+
+    def test_nunca_vence_antes_de_su_instante(self):
+        rueda = RuedaTemporal(inicio=0)
+        rueda.programar("a", 10.5)
+        self.assertEqual(rueda.avanzar(10.9), [])
+        self.assertEqual(rueda.avanzar(11), [("a", None)])
+
+    def test_programar_en_el_pasado_vence_en_el_siguiente_avance(self):
+        rueda = RuedaTemporal(inicio=100)
+        rueda.programar("a", 50)
+        self.assertEqual(rueda.proximo(), 100)
+        self.assertEqual(rueda.avanzar(100), [("a", None)])
+
+    def test_cancelar_y_reprogramar(self):
+        rueda = RuedaTemporal(inicio=0)
+        rueda.programar("a", 10)
+        rueda.programar("b", 10 ** 9)  # Más allá del último nivel
+        self.assertTrue(rueda.cancelar("b"))
+        self.assertFalse(rueda.cancelar("b"))
+        rueda.programar("a", 30)
+        self.assertEqual(rueda.avanzar(20), [])
+        self.assertEqual(rueda.avanzar(10 ** 9), [("a", None)])
+        self.assertIsNone(rueda.proximo())
+
+    def test_proximo_no_recorre_tick_a_tick(self):
+        rueda = RuedaTemporal(inicio=0, ranuras=8, niveles=2)
+        rueda.programar("a", 1000)
+        proximo = rueda.proximo()
+        self.assertGreater(proximo, 0)
+        self.assertLessEqual(proximo, 1000)
+
+    def test_equivale_a_una_lista_ordenada(self):
+        aleatorio = random.Random(7)
+        # Pocas ranuras y niveles para ejercitar la cascada y el desborde
+        rueda = RuedaTemporal(inicio=0, ranuras=4, niveles=3)
+        pendientes, ahora = {}, 0.0
+        for _ in range(3000):
+            operacion = aleatorio.random()
+            clave = aleatorio.randrange(60)
+            if operacion < 0.5:
+                instante = ahora + aleatorio.choice((aleatorio.uniform(-3, 5), aleatorio.uniform(0, 300)))
+                rueda.programar(clave, instante, instante)
+                pendientes[clave] = instante
+            elif operacion < 0.65:
+                self.assertEqual(rueda.cancelar(clave), clave in pendientes)
+                pendientes.pop(clave, None)
+            else:
+                ahora += aleatorio.choice((0, aleatorio.uniform(0, 3), aleatorio.uniform(0, 80)))
+                disparadas = [c for c, _ in rueda.avanzar(ahora)]
+                esperadas = [c for c, i in pendientes.items() if math.ceil(i) <= math.floor(ahora)]
+                self.assertEqual(sorted(disparadas), sorted(esperadas))
+                for clave in disparadas:
+                    del pendientes[clave]
+                self.assertEqual(len(rueda), len(pendientes))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,226 @@
+import os
+import unittest
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from src.database_conn.db_conn import DatabaseConnection
+from src.database_conn.esquema import crear_esquema
+from src.database_conn.repositorios import (
+    RepositorioCitas, RepositorioConsultas, RepositorioDueños, RepositorioFacturas, RepositorioMascotas,
+    reintentar_si_conflicto,
+)
+from src.entidades.administrativo.cita import Cita
+from src.entidades.administrativo.consulta import Consulta
+from src.entidades.administrativo.factura import Factura
+from src.entidades.mascotas.mascota import Mascota
+from src.entidades.personas.duenos.dueno import Dueño
+from src.eventos import cambios
+from src.eventos.bus import BusCambios
+from src.reportes import kpis as modulo_kpis
+from src.reportes.kpis import KPIsClinica, obtener_kpis
+
+
+class TestKPIsClinica(unittest.TestCase):
+    """Los agregados siguen a los cambios confirmados que publican los repositorios."""
+
+    def setUp(self):
+        self.db = DatabaseConnection.sqlite(":memory:")
+        self.db.connect()
+        crear_esquema(self.db)
+        self.bus = BusCambios()
+        self.kpis = KPIsClinica(self.bus)
+        self.kpis.conectar()
+        self.citas = RepositorioCitas(self.db, self.bus)
+        self.facturas = RepositorioFacturas(self.db, self.bus)
+        dueño = Dueño(1, "Ana Ruiz", "12345678A", "600000000", "ana@example.com", "1985-04-02", "C/ Mayor 1")
+        RepositorioDueños(self.db, self.bus).crear(dueño)
+        RepositorioMascotas(self.db, self.bus).crear(
+            Mascota(1, "Misi", "Gato", "Común", "2020-06-01", 4.0, "H", dueño))
+
+    def tearDown(self):
+        self.kpis.desconectar()
+        self.db.disconnect()
+
+    def _reconstruido(self) -> KPIsClinica:
+        kpis = KPIsClinica(self.bus)
+        kpis.reconstruir(self.db)
+        return kpis
+
+    def _cita(self, id_cita=1, fecha="2025-03-10", hora="10:00") -> Cita:
+        cita = Cita(id_cita, fecha, hora, "Revisión", 1, 7)
+        self.citas.crear(cita)
+        return cita
+
+    def test_crear_cita_cuenta_por_estado(self):
+        self._cita()
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"pendiente": 1}})
+
+    def test_cancelar_mueve_el_conteo_de_estado(self):
+        cita = self._cita()
+        cita.cancelar()
+        self.citas.guardar(cita)
+        self.assertEqual(self.kpis.citas_por_estado("dia"), {"2025-03-10": {"cancelada": 1}})
+
+    def test_los_cambios_sin_guardar_no_cuentan(self):
+        cita = self._cita()
+        cita.cancelar()
+        self.assertEqual(self.kpis.citas_por_estado("dia"), {"2025-03-10": {"pendiente": 1}})
+
+    def test_reintento_tras_conflicto_coincide_con_la_base_de_datos(self):
+        self._cita()
+        concurrente = self.citas.obtener(1)
+        intentos = []
+
+        def cancelar():
+            cita = concurrente if not intentos else self.citas.obtener(1)
+            if not intentos:
+                # Otra sesión reprograma la cita entre la lectura y la escritura
+                otra = self.citas.obtener(1)
+                otra.reprogramar("2025-03-12", "11:00")
+                self.citas.guardar(otra)
+            intentos.append(1)
+            cita.cancelar()
+            self.citas.guardar(cita)
+
+        reintentar_si_conflicto(cancelar, espera=0)
+        self.assertEqual(len(intentos), 2)
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"cancelada": 1}})
+        self.assertEqual(self.kpis.citas_por_estado("dia"), self._reconstruido().citas_por_estado("dia"))
+
+    def test_reprogramar_cambia_de_periodo(self):
+        cita = self._cita(fecha="2025-03-31")
+        cita.reprogramar("2025-04-02", "11:00")
+        self.citas.guardar(cita)
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-04": {"pendiente": 1}})
+
+    def test_duracion_media_por_veterinario(self):
+        for id_cita, hora, fin in ((1, "10:00", "10:30"), (2, "11:00", "12:00")):
+            cita = self._cita(id_cita, hora=hora)
+            cita.marcar_como_completada(fin)
+            self.citas.guardar(cita)
+        self.assertEqual(self.kpis.duracion_media_por_veterinario(), {7: timedelta(minutes=45)})
+
+    def test_completar_dos_veces_no_duplica_duracion(self):
+        cita = self._cita()
+        cita.marcar_como_completada("10:20")
+        self.citas.guardar(cita)
+        cita.marcar_como_completada("10:40")
+        self.citas.guardar(cita)
+        self.assertEqual(self.kpis.duracion_media_por_veterinario(), {7: timedelta(minutes=40)})
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"completada": 1}})
+
+    def test_pago_y_recalculo_de_factura(self):
+        factura = Factura(1, 1)
+        factura.calcular_total([{"descripcion": "Consulta", "precio": 50.0}])
+        self.facturas.crear(factura)
+        self.assertEqual(self.kpis.ingresos("mes"), {})
+        factura.registrar_pago("tarjeta", "2025-03-10")
+        self.facturas.guardar(factura)
+        self.assertEqual(self.kpis.ingresos("mes"), {"2025-03": 50.0})
+        self.assertEqual(self.kpis.facturas_pagadas("dia"), {"2025-03-10": 1})
+        factura.calcular_total([{"descripcion": "Consulta", "precio": 80.0}])
+        self.facturas.guardar(factura)
+        self.assertEqual(self.kpis.ingresos("mes"), {"2025-03": 80.0})
+        self.assertEqual(self.kpis.facturas_pagadas("mes"), {"2025-03": 1})
+
+    def test_consulta_por_especie(self):
+        self._cita()
+        RepositorioConsultas(self.db, self.bus).crear(Consulta(1, 1))
+        self.assertEqual(sum(c["Gato"] for c in self.kpis.consultas_por_especie("mes").values()), 1)
+        self.assertEqual(self.kpis.consultas_por_especie("mes"), self._reconstruido().consultas_por_especie("mes"))
+
+    def test_eliminar_y_archivar(self):
+        self._cita(1)
+        self._cita(2, hora="11:00")
+        self.citas.eliminar(self.citas.obtener(1))
+        self.bus.emitir(cambios.CITA, cambios.ELIMINAR, 2, {cambios.ARCHIVADO: True})
+        # La archivada sigue contando en los reportes históricos
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"pendiente": 1}})
+
+    def test_crear_y_archivar_en_la_misma_rafaga(self):
+        with self.bus.agrupar():
+            cita = self._cita()
+            cita.marcar_como_completada("10:30")
+            self.citas.guardar(cita)
+            self.bus.emitir(cambios.CITA, cambios.ELIMINAR, 1, {cambios.ARCHIVADO: True})
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"completada": 1}})
+        self.assertEqual(self.kpis.duracion_media_por_veterinario(), {7: timedelta(minutes=30)})
+
+    def test_actualizar_y_archivar_en_la_misma_rafaga(self):
+        cita = self._cita()
+        with self.bus.agrupar():
+            cita.marcar_como_completada("10:30")
+            self.citas.guardar(cita)
+            self.bus.emitir(cambios.CITA, cambios.ELIMINAR, 1, {cambios.ARCHIVADO: True})
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"completada": 1}})
+        # Ya archivada: un evento posterior de la fila no resta su aportación
+        self.bus.emitir(cambios.CITA, cambios.ELIMINAR, 1, {cambios.ARCHIVADO: True})
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"completada": 1}})
+
+    def test_eventos_repetidos_no_duplican(self):
+        cita = self._cita()
+        cita.cancelar()
+        self.citas.guardar(cita)
+        datos = self.citas._valores(cita)
+        self.bus.emitir(cambios.CITA, cambios.ACTUALIZAR, 1, datos)
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"cancelada": 1}})
+
+    def test_granularidad_invalida(self):
+        with self.assertRaises(ValueError):
+            self.kpis.ingresos("semana")
+
+    def test_reconstruir_desde_db(self):
+        db = MagicMock()
+        db.fetch_all.side_effect = [
+            [{"id_mascota": 1, "especie": "Perro"}],
+            [
+                {"id_cita": 1, "fecha": "2025-03-10", "hora": "10:00", "id_mascota": 1, "id_empleado": 7,
+                 "estado": "completada", "hora_fin": "10:30"},
+                {"id_cita": 2, "fecha": "2025-03-11", "hora": "09:00", "id_mascota": 1, "id_empleado": 7,
+                 "estado": "pendiente", "hora_fin": None},
+            ],
+            [{"id_consulta": 1, "id_cita": 1, "fecha_registro": "2025-03-10 10:35:00", "especie": "Perro"}],
+            [{"id_factura": 1, "total": 40.0, "fecha": "2025-03-10", "metodo_pago": "tarjeta"}],
+            [],  # Sin particiones de archivo
+        ]
+        self._cita(99, fecha="2020-01-01")
+        self.kpis.reconstruir(db)
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"pendiente": 1, "completada": 1}})
+        self.assertEqual(self.kpis.duracion_media_por_veterinario(), {7: timedelta(minutes=30)})
+        self.assertEqual(self.kpis.consultas_por_especie("mes"), {"2025-03": {"Perro": 1}})
+        self.assertEqual(self.kpis.ingresos("mes"), {"2025-03": 40.0})
+        self.assertIsNotNone(self.kpis.ultima_reconstruccion)
+        # Tras reconstruir, los cambios siguen aplicándose sobre las filas leídas
+        self.bus.emitir(cambios.CITA, cambios.ELIMINAR, 2)
+        self.assertEqual(self.kpis.citas_por_estado("mes"), {"2025-03": {"completada": 1}})
+
+
+class TestObtenerKPIs(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(modulo_kpis, "_kpis", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: modulo_kpis._kpis and modulo_kpis._kpis.desconectar())
+        entorno = patch.dict(os.environ, {"CLINICA_CAMBIOS_PATH": ""})
+        entorno.start()
+        self.addCleanup(entorno.stop)
+
+    @patch("src.database_conn.db_conn.DatabaseConnection.from_env")
+    def test_sin_conexion_no_guarda_un_agregador_vacio(self, from_env):
+        from_env.return_value.connect.return_value = False
+        with self.assertRaises(ConnectionError):
+            obtener_kpis()
+        self.assertIsNone(modulo_kpis._kpis)
+        # Al recuperarse la conexión, la siguiente llamada sí reconstruye
+        db = DatabaseConnection.sqlite(":memory:")
+        db.connect()
+        self.addCleanup(db.disconnect)
+        crear_esquema(db)
+        kpis = obtener_kpis(db)
+        self.assertIsNotNone(kpis.ultima_reconstruccion)
+        self.assertIs(obtener_kpis(), kpis)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
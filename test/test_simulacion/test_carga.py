@@ -0,0 +1,70 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from src.database_conn.db_conn import DatabaseConnection
+from src.excepciones.excepciones import FranjaOcupadaError
+from src.simulacion.carga import AgendaEnMemoria, SimuladorCarga, main
+
+
+class TestAgendaEnMemoria(unittest.TestCase):
+
+    def test_reservar_franja_ocupada_lanza_error(self):
+        agenda = AgendaEnMemoria()
+        agenda.reservar("2025-01-10", "10:00", "Revisión", 1, 1)
+        with self.assertRaises(FranjaOcupadaError):
+            agenda.reservar("2025-01-10", "10:00", "Vacuna", 2, 1)
+
+    def test_completar_saca_la_cita_de_pendientes(self):
+        agenda = AgendaEnMemoria()
+        cita = agenda.reservar("2025-01-10", "10:00", "Revisión", 1, 1)
+        agenda.completar(cita.id_cita, "10:20")
+        self.assertEqual(agenda.pendientes(1), [])
+        self.assertEqual(cita.estado, "completada")
+
+
+class TestSimuladorCarga(unittest.TestCase):
+
+    def test_informe_cuadra_con_las_operaciones(self):
+        simulador = SimuladorCarga(AgendaEnMemoria(), n_recepcionistas=4, n_veterinarios=2,
+                                   operaciones_por_sesion=100, dias=2, desde="2025-01-10")
+        informe = simulador.ejecutar()
+        reservas = informe.operaciones["reservar"]
+        self.assertEqual(len(reservas.latencias) + reservas.conflictos, 400)
+        self.assertEqual(len(informe.operaciones["completar"].latencias), len(reservas.latencias))
+        self.assertGreater(informe.rendimiento("reservar"), 0)
+        self.assertLessEqual(reservas.percentil(50), reservas.percentil(99))
+
+    def test_main_con_backend_de_base_de_datos(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        ruta = os.path.join(directorio, "carga.db")
+        registro = os.path.join(directorio, "cambios.db")
+        entorno = {"CLINICA_DB_BACKEND": "sqlite", "CLINICA_DB_PATH": ruta, "CLINICA_CAMBIOS_PATH": registro}
+        argumentos = ["--backend", "db", "--recepcionistas", "2", "--veterinarios", "1",
+                      "--operaciones", "5", "--dias", "1", "--desde", "2025-01-10"]
+        db = DatabaseConnection.sqlite(ruta)
+        conteos = []
+        with patch.dict(os.environ, entorno), redirect_stdout(io.StringIO()) as salida:
+            # La segunda ejecución continúa tras los IDs que dejó la primera
+            for semilla in ("1", "2"):
+                main(argumentos + ["--semilla", semilla])
+                db.connect()
+                conteos.append(db.fetch_one("SELECT COUNT(*) AS n FROM citas")["n"])
+                db.disconnect()
+        self.assertIn("reservar", salida.getvalue())
+        self.assertGreater(conteos[0], 0)
+        self.assertGreater(conteos[1], conteos[0])
+        # Las reservas se publicaron en el registro compartido para los demás procesos
+        cambios = DatabaseConnection.sqlite(registro)
+        cambios.connect()
+        self.addCleanup(cambios.disconnect)
+        self.assertGreaterEqual(cambios.fetch_one("SELECT COUNT(*) AS n FROM registro_cambios")["n"], conteos[1])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,66 @@
+import unittest
+from datetime import date, datetime, time, timedelta
+
+from src.utils.fechas import a_texto_hora, limpiar_cache, parsear_fecha, parsear_hora
+
+
+class TestFechas(unittest.TestCase):
+
+    def setUp(self):
+        limpiar_cache()
+
+    def _mensaje_strptime(self, valor, formato):
+        try:
+            datetime.strptime(valor, formato)
+        except (ValueError, TypeError) as e:
+            return type(e), str(e)
+        self.fail(f"strptime aceptó {valor!r}")
+
+    def test_parsear_fecha_canonica(self):
+        self.assertEqual(parsear_fecha("2024-02-29"), date(2024, 2, 29))
+
+    def test_parsear_fecha_sin_relleno_como_strptime(self):
+        self.assertEqual(parsear_fecha("2024-1-5"), date(2024, 1, 5))
+
+    def test_parsear_hora_canonica(self):
+        self.assertEqual(parsear_hora("09:30"), time(9, 30))
+
+    def test_parsear_hora_sin_relleno_como_strptime(self):
+        self.assertEqual(parsear_hora("9:05"), time(9, 5))
+
+    def test_a_texto_hora_siempre_hh_mm(self):
+        casos = (("08:00", "08:00"), ("8:00", "08:00"), ("8:00:00", "08:00"), ("23:59:59", "23:59"),
+                 (time(8, 0), "08:00"), (timedelta(hours=8, minutes=30), "08:30"))
+        for valor, esperado in casos:
+            with self.subTest(valor=valor):
+                self.assertEqual(a_texto_hora(valor), esperado)
+
+    def test_errores_fecha_identicos_a_strptime(self):
+        for valor in ("2023-02-29", "2024-13-01", "2024/01/01", "", "abcd-ef-gh", "2024-01-01 "):
+            tipo, mensaje = self._mensaje_strptime(valor, "%Y-%m-%d")
+            with self.subTest(valor=valor):
+                with self.assertRaises(tipo) as ctx:
+                    parsear_fecha(valor)
+                self.assertEqual(str(ctx.exception), mensaje)
+
+    def test_errores_hora_identicos_a_strptime(self):
+        for valor in ("24:00", "12:60", "1230", "ab:cd", "12:3x"):
+            tipo, mensaje = self._mensaje_strptime(valor, "%H:%M")
+            with self.subTest(valor=valor):
+                with self.assertRaises(tipo) as ctx:
+                    parsear_hora(valor)
+                self.assertEqual(str(ctx.exception), mensaje)
+
+    def test_tipo_no_cadena_lanza_type_error_de_strptime(self):
+        tipo, mensaje = self._mensaje_strptime(None, "%Y-%m-%d")
+        with self.assertRaises(tipo) as ctx:
+            parsear_fecha(None)
+        self.assertEqual(str(ctx.exception), mensaje)
+
+    def test_valores_repetidos_usan_cache(self):
+        primera = parsear_fecha("2025-06-01")
+        self.assertIs(parsear_fecha("2025-06-01"), primera)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils import perfilado
+from src.utils.perfilado import NodoPerfil, desglose, ejecucion, perfilar
+
+
+class Repositorio:
+    @perfilar()
+    def obtener(self, clave):
+        with perfilar("consulta"):
+            return clave
+
+
+class RepositorioCitas(Repositorio):
+    pass
+
+
+@perfilar("calculo")
+def calcular(x):
+    return x * 2
+
+
+class TestPerfilado(unittest.TestCase):
+
+    def setUp(self):
+        perfilado.activar()
+        perfilado.limpiar_historial()
+
+    def tearDown(self):
+        perfilado.activar(False)
+        perfilado.limpiar_historial()
+
+    def test_desactivado_no_registra_nada(self):
+        perfilado.activar(False)
+        with ejecucion("Citas") as actual:
+            self.assertEqual(calcular(2), 4)
+        self.assertIsNone(actual)
+        self.assertEqual(perfilado.ultimas("Citas"), [])
+
+    def test_fuera_de_una_ejecucion_no_mide(self):
+        with perfilar("suelta") as seccion:
+            pass
+        self.assertIsNone(seccion._nodo)
+
+    def test_arbol_por_ejecucion(self):
+        with ejecucion("Citas") as actual:
+            with perfilar("tabla"):
+                RepositorioCitas().obtener(1)
+                RepositorioCitas().obtener(2)
+            calcular(1)
+        raiz = actual.raiz
+        self.assertEqual(set(raiz.hijos), {"tabla", "calculo"})
+        metodo = raiz.hijos["tabla"].hijos["RepositorioCitas.obtener"]
+        self.assertEqual(metodo.llamadas, 2)
+        self.assertEqual(metodo.hijos["consulta"].llamadas, 2)
+        self.assertGreaterEqual(raiz.total, raiz.hijos["tabla"].total)
+        self.assertEqual(perfilado.ultimas("Citas"), [actual])
+
+    def test_acumulado_suma_ejecuciones(self):
+        for _ in range(3):
+            with ejecucion("Facturas"):
+                calcular(1)
+        total = perfilado.acumulado("Facturas")
+        self.assertEqual((total.llamadas, total.hijos["calculo"].llamadas), (3, 3))
+
+    def test_volcado_cprofile(self):
+        directorio = tempfile.mkdtemp()
+        try:
+            with ejecucion("Citas", volcar_en=directorio) as actual:
+                calcular(3)
+            self.assertTrue(os.path.exists(actual.volcado))
+        finally:
+            shutil.rmtree(directorio)
+
+    def test_desglose(self):
+        raiz = NodoPerfil("Citas", total=0.1, llamadas=1)
+        raiz.hijo("tabla").total = 0.075
+        raiz.hijo("despreciable").total = 0.0001
+        lineas = desglose(raiz, ancho=4).splitlines()
+        self.assertEqual(len(lineas), 2)
+        self.assertIn("████", lineas[0])
+        self.assertIn("███ ", lineas[1])
+        self.assertIn("75.0%", lineas[1])
+        self.assertAlmostEqual(raiz.propio, 0.0249)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)